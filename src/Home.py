@@ -4,6 +4,7 @@ Main landing page
 """
 import streamlit as st
 from src.event_manager import EventManager
+from src.main import EVENT_QUEUE
 
 st.set_page_config(
     page_title="SigmaBot",
@@ -13,7 +14,7 @@ st.set_page_config(
 
 # Initialize shared EventManager in session state
 if "event_manager" not in st.session_state:
-    st.session_state.event_manager = EventManager()
+    st.session_state.event_manager = EventManager(queue=EVENT_QUEUE)
 
 # Header
 st.title("📈 SigmaBot")
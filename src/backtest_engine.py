@@ -1,12 +1,26 @@
 """
 Backtest engine - handles all backtesting logic separate from UI.
 """
+import os
+from concurrent.futures import (
+    ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
 from dataclasses import dataclass
-from typing import List, Optional
+from itertools import product
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
-from src.utils.yahoo_finance import download_yf
-from src.signals.strategies import Strategy, CombinedStrategy, EMAStrategy, RSIStrategy
+from src.utils.mmap_store import MmapStore
+from src.utils.providers import DataProvider
+from src.utils.yahoo_finance import download_yf, fetch_many
+from src.signals.strategies import Strategy, Signals, CombinedStrategy, EMAStrategy, RSIStrategy
+from src.signals.indicator_cache import IndicatorCache, fingerprint, get_indicator_cache
 from src.event_manager import EventManager
+from src.instrumentation import timed
+from src import kernels
+
+# Metric columns of run_sweep and _sweep_metrics, in order
+SWEEP_METRICS = ["total_return", "max_drawdown", "sharpe_ratio"]
 
 
 @dataclass
@@ -21,25 +35,96 @@ class BacktestConfig:
     rsi_window: int
     rsi_oversold: int
     rsi_overbought: int
+    # Columns kept in BacktestResult.data; None keeps Close, signal,
+    # indicators and returns, an empty tuple keeps no frame at all
+    output_columns: Optional[Tuple[str, ...]] = None
+    # "vectorized" (signal.shift(1) * return) or "event" (orders, fills, costs)
+    engine: str = "vectorized"
+    # Event engine: exposure per unit of signal as a fraction of equity
+    position_size: float = 1.0
+    initial_capital: float = 10_000.0
+    # Event engine: commission as a fraction of traded notional, with a minimum fee
+    commission: float = 0.0
+    commission_min: float = 0.0
+    # Event engine: fills are this many basis points worse than the open
+    slippage_bps: float = 0.0
 
 
 @dataclass
 class BacktestResult:
-    """Results from a backtest run."""
-    data: pd.DataFrame
+    """Results from a backtest run. ``data`` is None for batch summaries."""
+    data: Optional[pd.DataFrame]
     total_return: float
     buy_hold_return: float
     max_drawdown: float
     sharpe_ratio: float
     symbol: str
     config: BacktestConfig
+    error: Optional[str] = None
+    # Event engine only: one row per fill (bar, quantity, price, fee)
+    fills: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class WalkForwardResult:
+    """Walk-forward results: one row per fold and the stitched out-of-sample curve."""
+    folds: pd.DataFrame
+    equity: pd.Series
+    total_return: float
+    max_drawdown: float
+    sharpe_ratio: float
+    config: BacktestConfig
+
+
+@dataclass
+class PortfolioConfig:
+    """Configuration for a multi-asset portfolio backtest."""
+    symbols: Sequence[str]
+    period: str
+    interval: str
+    use_ema: bool
+    ema_window: int
+    use_rsi: bool
+    rsi_window: int
+    rsi_oversold: int
+    rsi_overbought: int
+    # "equal", "inverse_volatility" or "signal"
+    weighting: str = "equal"
+    # Target weights are reset every this many bars and drift in between
+    rebalance_every: int = 1
+    # Lookback in bars for the inverse-volatility weights
+    volatility_window: int = 20
+    # Clip short signals to flat
+    long_only: bool = False
+
+
+@dataclass
+class PortfolioResult:
+    """Portfolio-level results; weights are the targets set at each rebalance."""
+    equity: pd.Series
+    drawdown: pd.Series
+    weights: pd.DataFrame
+    total_return: float
+    max_drawdown: float
+    sharpe_ratio: float
+    config: PortfolioConfig
 
 
 class BacktestEngine:
     """Engine for running backtests with various strategies."""
     
-    def __init__(self, event_manager: Optional[EventManager] = None):
+    def __init__(
+        self,
+        event_manager: Optional[EventManager] = None,
+        indicator_cache: Optional[IndicatorCache] = None,
+        price_store: Optional[MmapStore] = None,
+        provider: Optional[DataProvider] = None,
+    ):
         self.event_manager = event_manager or EventManager()
+        self.indicators = indicator_cache or get_indicator_cache()
+        self.price_store = price_store or MmapStore()
+        # None uses the process-wide default provider
+        self.provider = provider
     
     def run_backtest(self, config: BacktestConfig) -> BacktestResult:
         """
@@ -54,12 +139,74 @@ class BacktestEngine:
         Raises:
             ValueError: If no data available or no strategies selected
         """
-        # Download data
-        data = download_yf(config.symbol, period=config.period, interval=config.interval)
+        data = self._load_data(config)
+        return self._run_on_data(config, data)
+    
+    def run_many(
+        self,
+        configs: Iterable[BacktestConfig],
+        max_workers: Optional[int] = None,
+    ) -> Iterator[BacktestResult]:
+        """
+        Run independent backtests on a process pool, yielding as they finish.
         
-        if data.empty:
-            raise ValueError(f"No data available for {config.symbol}")
+        Open and Close prices are loaded once per (symbol, period, interval)
+        and written to the memory-mapped price store; workers map the same
+        files read-only, so only configs, file paths and small summaries
+        are pickled. Yielded results carry metrics but no ``data`` frame;
+        configs whose data could not be loaded or whose run failed are yielded
+        with ``error`` set and NaN metrics.
+        
+        Args:
+            configs: BacktestConfigs to run
+            max_workers: Worker processes (defaults to the CPU count)
+            
+        Yields:
+            BacktestResult summaries in completion order
+        """
+        configs = list(configs)
+        # (symbol, period, interval) -> price store version directory
+        versions: Dict[Tuple[str, str, str], str] = {}
+        errors: Dict[Tuple[str, str, str], str] = {}
         
+        # Load each distinct series once, concurrently, into the price store
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        for config in configs:
+            groups.setdefault((config.period, config.interval), []).append(config.symbol)
+        for (period, interval), symbols in groups.items():
+            loaded, failed = fetch_many(symbols, period, interval, provider=self.provider)
+            for symbol, message in failed.items():
+                errors[(symbol, period, interval)] = message
+            for symbol, summary in loaded.items():
+                # Each group gets its own version, so groups with different
+                # periods for the same symbol never see each other's rows;
+                # unchanged bars reuse the version an earlier call wrote
+                path = self.price_store.write(
+                    symbol, interval, summary["data"][["Open", "Close"]]
+                )
+                versions[(symbol, period, interval)] = str(path)
+        
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            for config in configs:
+                key = (config.symbol, config.period, config.interval)
+                if key not in versions:
+                    yield _failed_result(config, errors.get(key, "No data"))
+                    continue
+                pending[pool.submit(_run_mapped, config, versions[key])] = config
+                # Bound the number of queued tasks
+                if len(pending) >= 2 * workers:
+                    yield from _collect(pending, FIRST_COMPLETED)
+            yield from _collect(pending, ALL_COMPLETED)
+    
+    def _run_on_data(
+        self,
+        config: BacktestConfig,
+        data: pd.DataFrame,
+        output_columns: Optional[Sequence[str]] = None,
+    ) -> BacktestResult:
+        """Run strategies, returns and metrics for a configuration on loaded data."""
         # Initialize strategies
         strategies = self._build_strategies(config)
         
@@ -68,31 +215,427 @@ class BacktestEngine:
         
         # Apply combined strategy
         combined_strategy = CombinedStrategy(strategies=strategies)
-        data = combined_strategy.generate_signals(data)
+        signals = combined_strategy.generate_signals(data)
         
         # Calculate returns
-        data = self._calculate_returns(data)
+        fills = None
+        if config.engine == "event":
+            returns, fills = self._simulate_orders(data, signals.signal, config)
+        elif config.engine == "vectorized":
+            returns = self._calculate_returns(data["Close"], signals.signal)
+        else:
+            raise ValueError(f"Unknown engine: {config.engine}")
         
         # Calculate metrics
-        metrics = self._calculate_metrics(data, config.interval)
+        metrics = self._calculate_metrics(returns, config.interval)
+        
+        if output_columns is None:
+            output_columns = config.output_columns
         
         return BacktestResult(
-            data=data,
+            data=self._result_frame(data["Close"], signals, returns, output_columns),
             total_return=metrics['total_return'],
             buy_hold_return=metrics['buy_hold_return'],
             max_drawdown=metrics['max_drawdown'],
             sharpe_ratio=metrics['sharpe_ratio'],
             symbol=config.symbol,
-            config=config
+            config=config,
+            fills=fills
+        )
+    
+    def run_sweep(
+        self,
+        config: BacktestConfig,
+        ema_windows: Optional[Sequence[int]] = None,
+        rsi_windows: Optional[Sequence[int]] = None,
+        rsi_oversold: Optional[Sequence[int]] = None,
+        rsi_overbought: Optional[Sequence[int]] = None,
+        sort_by: str = "sharpe_ratio",
+        chunk_size: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Evaluate every combination of strategy parameters on one price series.
+        
+        The price series is loaded once, each distinct EMA and RSI window is
+        computed once, and signals and returns for all combinations are
+        evaluated as 2-D arrays with one column per parameter set. Ranges left
+        as None fall back to the single value in ``config``; parameters of a
+        strategy that is switched off in ``config`` are ignored.
+        
+        Args:
+            config: BacktestConfig providing data settings and defaults
+            ema_windows: EMA windows to try
+            rsi_windows: RSI windows to try
+            rsi_oversold: RSI oversold thresholds to try
+            rsi_overbought: RSI overbought thresholds to try
+            sort_by: Metric column to rank by, best (highest) first
+            chunk_size: Parameter sets evaluated per block (bounds memory)
+            
+        Returns:
+            DataFrame with one row per parameter set and the columns
+            total_return, max_drawdown and sharpe_ratio, best first
+            
+        Raises:
+            ValueError: If no data available or no strategies selected
+        """
+        if not (config.use_ema or config.use_rsi):
+            raise ValueError("At least one strategy must be selected")
+        
+        data = self._load_data(config)
+        params, blocks = self._sweep_returns(
+            config, data, ema_windows, rsi_windows, rsi_oversold, rsi_overbought, chunk_size
+        )
+        metrics = [self._sweep_metrics(block, config.interval) for block in blocks]
+        table = pd.concat([
+            pd.DataFrame(params),
+            pd.DataFrame(np.concatenate(metrics), columns=SWEEP_METRICS),
+        ], axis=1)
+        
+        return table.sort_values(sort_by, ascending=False).reset_index(drop=True)
+    
+    def run_portfolio(
+        self,
+        config: PortfolioConfig,
+        prices: Optional[pd.DataFrame] = None,
+    ) -> PortfolioResult:
+        """
+        Backtest one strategy across several assets as a single portfolio.
+        
+        Close prices are aligned on their common index (one column per
+        symbol) and signals, weights and returns are evaluated on the
+        (time x asset) array. The weights chosen at a rebalance bar's close
+        are held from the next bar and drift with prices until the next
+        rebalance.
+        
+        Args:
+            config: PortfolioConfig with symbols, strategy and weighting
+            prices: Aligned Close prices to use instead of downloading
+            
+        Returns:
+            PortfolioResult with equity, drawdown, weights and metrics
+            
+        Raises:
+            ValueError: If no data available, no strategies selected or
+                the weighting scheme is unknown
+        """
+        if not (config.use_ema or config.use_rsi):
+            raise ValueError("At least one strategy must be selected")
+        if config.weighting not in ("equal", "inverse_volatility", "signal"):
+            raise ValueError(f"Unknown weighting: {config.weighting}")
+        
+        if prices is None:
+            prices = self._load_prices(config)
+        if prices.empty:
+            raise ValueError("No overlapping data for the selected symbols")
+        close = prices.to_numpy(dtype=np.float64)
+        
+        signal = self._signal_matrix(close, config)
+        if config.long_only:
+            np.maximum(signal, 0.0, out=signal)
+        
+        returns = np.zeros_like(close)
+        returns[1:] = close[1:] / close[:-1] - 1
+        weights = self._portfolio_weights(signal, returns, config)
+        
+        growth = _drifting_growth(returns, weights, max(1, config.rebalance_every))
+        equity = pd.Series(growth, index=prices.index, name="equity")
+        drawdown = kernels.drawdown(growth)
+        portfolio_returns = np.empty_like(growth)
+        portfolio_returns[0] = np.nan
+        portfolio_returns[1:] = growth[1:] / growth[:-1] - 1
+        
+        rebalance = np.arange(len(close)) % max(1, config.rebalance_every) == 0
+        held = pd.DataFrame(
+            np.where(rebalance[:, None], weights, np.nan),
+            index=prices.index, columns=prices.columns,
+        ).ffill()
+        
+        return PortfolioResult(
+            equity=equity,
+            drawdown=pd.Series(drawdown, index=prices.index, name="drawdown"),
+            weights=held,
+            total_return=(growth[-1] - 1) * 100,
+            max_drawdown=np.nanmin(drawdown) * 100,
+            sharpe_ratio=kernels.sharpe(
+                portfolio_returns,
+                periods_per_year=252 if config.interval == "1d" else None,
+            ),
+            config=config,
+        )
+    
+    def _load_prices(self, config: PortfolioConfig) -> pd.DataFrame:
+        """Download Close prices for all symbols aligned on their common index."""
+        loaded, _ = fetch_many(
+            config.symbols, config.period, config.interval, provider=self.provider
+        )
+        columns = [
+            loaded[symbol]["data"]["Close"].rename(symbol)
+            for symbol in dict.fromkeys(config.symbols) if symbol in loaded
+        ]
+        if not columns:
+            raise ValueError("No data available for the selected symbols")
+        return pd.concat(columns, axis=1).dropna()
+    
+    def _signal_matrix(self, close: np.ndarray, config: PortfolioConfig) -> np.ndarray:
+        """Combined strategy votes for every asset, as in CombinedStrategy."""
+        signal = np.zeros_like(close)
+        buffer = np.empty(len(close))
+        for j in range(close.shape[1]):
+            column = close[:, j]
+            if config.use_ema:
+                ema = kernels.ema(column, config.ema_window, out=buffer)
+                signal[:, j] += (column > ema).astype(np.float64) - (column < ema)
+            if config.use_rsi:
+                rsi = kernels.rsi(column, config.rsi_window, out=buffer)
+                signal[:, j] += np.where(
+                    rsi > config.rsi_overbought, -1.0,
+                    np.where(rsi < config.rsi_oversold, 1.0, 0.0),
+                )
+        return signal
+    
+    def _portfolio_weights(
+        self, signal: np.ndarray, returns: np.ndarray, config: PortfolioConfig
+    ) -> np.ndarray:
+        """Target weights per bar and asset from the signal matrix."""
+        n_assets = signal.shape[1]
+        if config.weighting == "equal":
+            return signal / n_assets
+        if config.weighting == "signal":
+            gross = np.abs(signal).sum(axis=1, keepdims=True)
+            return np.divide(signal, gross, out=np.zeros_like(signal), where=gross > 0)
+        
+        # Inverse volatility: 1/sigma budgets normalised to sum to one;
+        # bars without a full lookback fall back to equal budgets
+        volatility = pd.DataFrame(returns).rolling(config.volatility_window).std().to_numpy()
+        with np.errstate(divide="ignore"):
+            inverse = np.where(volatility > 0, 1.0 / volatility, np.nan)
+        total = np.nansum(inverse, axis=1, keepdims=True)
+        budget = np.where(
+            np.isnan(inverse).any(axis=1, keepdims=True) | (total == 0),
+            1.0 / n_assets,
+            inverse / np.where(total > 0, total, 1.0),
+        )
+        return signal * budget
+    
+    def run_walk_forward(
+        self,
+        config: BacktestConfig,
+        train_bars: int,
+        test_bars: int,
+        step: Optional[int] = None,
+        ema_windows: Optional[Sequence[int]] = None,
+        rsi_windows: Optional[Sequence[int]] = None,
+        rsi_oversold: Optional[Sequence[int]] = None,
+        rsi_overbought: Optional[Sequence[int]] = None,
+        objective: str = "sharpe_ratio",
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> WalkForwardResult:
+        """
+        Optimize parameters on rolling train windows and evaluate each choice
+        on the following, unseen test window.
+        
+        Indicators and per-parameter strategy returns are computed once over
+        the full history (as in run_sweep), so every fold sees warmed-up
+        indicator state and overlapping windows share all the work; folds
+        only slice the return matrix. Folds are scored in parallel on a
+        thread pool, which the NumPy reductions release the GIL for.
+        
+        Args:
+            config: BacktestConfig providing data settings and defaults
+            train_bars: Bars in each in-sample window
+            test_bars: Bars in each out-of-sample window
+            step: Bars between fold starts (defaults to test_bars); above
+                test_bars, the bars between test windows are left out
+            ema_windows: EMA windows to try
+            rsi_windows: RSI windows to try
+            rsi_oversold: RSI oversold thresholds to try
+            rsi_overbought: RSI overbought thresholds to try
+            objective: Metric maximized on each train window
+            chunk_size: Parameter sets evaluated per block (bounds memory)
+            max_workers: Threads scoring folds (defaults to the CPU count)
+            
+        Returns:
+            WalkForwardResult with one row per fold and the stitched
+            out-of-sample equity curve
+            
+        Raises:
+            ValueError: If no data available, no strategies selected or the
+                history is shorter than one train and test window
+        """
+        if not (config.use_ema or config.use_rsi):
+            raise ValueError("At least one strategy must be selected")
+        if objective not in SWEEP_METRICS:
+            raise ValueError(f"Unknown objective: {objective}")
+        
+        data = self._load_data(config)
+        step = step or test_bars
+        starts = range(0, len(data) - train_bars - test_bars + 1, step)
+        if not starts:
+            raise ValueError("Not enough data for one train/test fold")
+        
+        # Out-of-sample rows each fold contributes to the stitched curve:
+        # its test window, cut short where the next fold's test window begins
+        folds = []
+        for start in starts:
+            test_start = start + train_bars
+            test_end = min(test_start + test_bars, test_start + step)
+            if start == starts[-1]:
+                test_end = test_start + test_bars
+            folds.append((start, test_start, test_end))
+        
+        params, blocks = self._sweep_returns(
+            config, data, ema_windows, rsi_windows, rsi_oversold, rsi_overbought, chunk_size
+        )
+        column = SWEEP_METRICS.index(objective)
+        best_score = np.full(len(folds), -np.inf)
+        best_index = np.zeros(len(folds), dtype=np.int64)
+        best_returns: List[Optional[np.ndarray]] = [None] * len(folds)
+        
+        def score(fold: int, block: np.ndarray, offset: int) -> None:
+            start, test_start, test_end = folds[fold]
+            scores = self._sweep_metrics(block[start:test_start], config.interval)[:, column]
+            j = int(np.argmax(np.nan_to_num(scores, nan=-np.inf)))
+            if scores[j] > best_score[fold]:
+                best_score[fold] = scores[j]
+                best_index[fold] = offset + j
+                best_returns[fold] = block[test_start:test_end, j].copy()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            offset = 0
+            for block in blocks:
+                # Each fold only touches its own slots, so no locking is needed
+                list(pool.map(lambda fold: score(fold, block, offset), range(len(folds))))
+                offset += block.shape[1]
+        
+        index = data.index
+        rows = []
+        for fold, (start, test_start, test_end) in enumerate(folds):
+            test_returns = best_returns[fold]
+            test_metrics = self._sweep_metrics(test_returns[:, None], config.interval)[0]
+            rows.append({
+                "train_start": index[start],
+                "test_start": index[test_start],
+                "test_end": index[test_end - 1],
+                **{name: values[best_index[fold]] for name, values in params.items()},
+                f"train_{objective}": best_score[fold],
+                **dict(zip(SWEEP_METRICS, test_metrics)),
+            })
+        
+        # Stitch the chosen out-of-sample returns into one curve; with
+        # step > test_bars the test windows leave gaps the curve skips over
+        returns = np.concatenate(best_returns)
+        test_rows = np.concatenate([np.arange(test, end) for _, test, end in folds])
+        equity = pd.Series(
+            np.cumprod(1 + np.nan_to_num(returns)),
+            index=index[test_rows],
+            name="equity",
+        )
+        total_return, max_drawdown, sharpe_ratio = self._sweep_metrics(
+            returns[:, None], config.interval
+        )[0]
+        
+        return WalkForwardResult(
+            folds=pd.DataFrame(rows),
+            equity=equity,
+            total_return=total_return,
+            max_drawdown=max_drawdown,
+            sharpe_ratio=sharpe_ratio,
+            config=config,
         )
     
+    def _sweep_returns(
+        self,
+        config: BacktestConfig,
+        data: pd.DataFrame,
+        ema_windows: Optional[Sequence[int]],
+        rsi_windows: Optional[Sequence[int]],
+        rsi_oversold: Optional[Sequence[int]],
+        rsi_overbought: Optional[Sequence[int]],
+        chunk_size: Optional[int],
+    ) -> Tuple[Dict[str, np.ndarray], Iterator[np.ndarray]]:
+        """
+        Parameter grid and strategy returns for every combination.
+        
+        Returns:
+            Tuple of the parameter columns (one entry per combination) and
+            an iterator of (time x combinations) strategy return blocks in
+            grid order
+        """
+        close = data["Close"].to_numpy(dtype=np.float64)
+        key = fingerprint(data["Close"])
+        
+        ema_windows = list(ema_windows or [config.ema_window]) if config.use_ema else [0]
+        rsi_windows = list(rsi_windows or [config.rsi_window]) if config.use_rsi else [0]
+        oversold = list(rsi_oversold or [config.rsi_oversold]) if config.use_rsi else [0]
+        overbought = list(rsi_overbought or [config.rsi_overbought]) if config.use_rsi else [0]
+        
+        # One column per distinct indicator window
+        ema_signals = np.zeros((len(close), len(ema_windows)), dtype=np.int8)
+        if config.use_ema:
+            for j, window in enumerate(ema_windows):
+                ema = self.indicators.ema(data["Close"], window, key=key).to_numpy()
+                ema_signals[:, j] = (close > ema).astype(np.int8) - (close < ema)
+        rsi = np.full((len(close), len(rsi_windows)), np.nan)
+        if config.use_rsi:
+            for j, window in enumerate(rsi_windows):
+                rsi[:, j] = self.indicators.rsi(data["Close"], window, key=key).to_numpy()
+        
+        grid = np.array(list(product(
+            range(len(ema_windows)), range(len(rsi_windows)), oversold, overbought
+        )))
+        ema_idx, rsi_idx = grid[:, 0], grid[:, 1]
+        
+        returns = np.empty_like(close)
+        returns[0] = np.nan
+        returns[1:] = close[1:] / close[:-1] - 1
+        
+        chunk_size = chunk_size or max(1, 8_000_000 // max(len(close), 1))
+        
+        def blocks() -> Iterator[np.ndarray]:
+            for lo in range(0, len(grid), chunk_size):
+                hi = min(lo + chunk_size, len(grid))
+                signal = ema_signals[:, ema_idx[lo:hi]].astype(np.float64)
+                if config.use_rsi:
+                    block = rsi[:, rsi_idx[lo:hi]]
+                    signal += np.where(
+                        block > grid[lo:hi, 3], -1.0, np.where(block < grid[lo:hi, 2], 1.0, 0.0)
+                    )
+                strategy_returns = np.empty_like(signal)
+                strategy_returns[0] = np.nan
+                strategy_returns[1:] = signal[:-1] * returns[1:, None]
+                yield strategy_returns
+        
+        params = {}
+        if config.use_ema:
+            params["ema_window"] = np.asarray(ema_windows)[ema_idx]
+        if config.use_rsi:
+            params["rsi_window"] = np.asarray(rsi_windows)[rsi_idx]
+            params["rsi_oversold"] = grid[:, 2]
+            params["rsi_overbought"] = grid[:, 3]
+        return params, blocks()
+    
+    def _load_data(self, config: BacktestConfig) -> pd.DataFrame:
+        """Download price data for a configuration."""
+        data = download_yf(
+            config.symbol, period=config.period, interval=config.interval, provider=self.provider
+        )
+        
+        if data.empty:
+            raise ValueError(f"No data available for {config.symbol}")
+        return data
+    
     def _build_strategies(self, config: BacktestConfig) -> List[Strategy]:
         """Build list of strategies based on configuration."""
         strategies = []
         
         if config.use_ema:
             strategies.append(
-                EMAStrategy(ema_window=config.ema_window, event_manager=self.event_manager)
+                EMAStrategy(
+                    ema_window=config.ema_window,
+                    event_manager=self.event_manager,
+                    indicator_cache=self.indicators
+                )
             )
         
         if config.use_rsi:
@@ -101,40 +644,109 @@ class BacktestEngine:
                     rsi_window=config.rsi_window,
                     overbought=config.rsi_overbought,
                     oversold=config.rsi_oversold,
-                    event_manager=self.event_manager
+                    event_manager=self.event_manager,
+                    indicator_cache=self.indicators
                 )
             )
         
         return strategies
     
-    def _calculate_returns(self, data: pd.DataFrame) -> pd.DataFrame:
+    @timed("engine.calculate_returns")
+    def _calculate_returns(self, close: pd.Series, signal: pd.Series) -> pd.DataFrame:
         """Calculate returns and cumulative returns."""
-        data["return"] = data["Close"].pct_change()
-        data["strategy_return"] = data["signal"].shift(1) * data["return"]
-        data["cum_return"] = (1 + data["return"]).cumprod()
-        data["cum_strategy"] = (1 + data["strategy_return"]).cumprod()
-        return data
+        returns = close.pct_change()
+        strategy_returns = signal.shift(1) * returns
+        return pd.DataFrame({
+            "return": returns,
+            "strategy_return": strategy_returns,
+            "cum_return": (1 + returns).cumprod(),
+            "cum_strategy": (1 + strategy_returns).cumprod(),
+        })
+    
+    @timed("engine.simulate_orders")
+    def _simulate_orders(
+        self, data: pd.DataFrame, signal: pd.Series, config: BacktestConfig
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Event-driven simulation: the signal at a bar's close becomes a target
+        exposure, filled at the next bar's open with slippage and commission.
+        
+        Returns:
+            Tuple of the returns frame (as _calculate_returns, plus position
+            and equity) and the fills frame
+        """
+        close = data["Close"].to_numpy(dtype=np.float64)
+        open_ = data["Open"].to_numpy(dtype=np.float64) if "Open" in data else close
+        target = signal.to_numpy(dtype=np.float64) * config.position_size
+        
+        fill_bars, quantities, prices, fees, units_after, cash_after = _fill_orders(
+            open_, target, config.initial_capital,
+            config.commission, config.commission_min, config.slippage_bps / 10_000,
+        )
+        
+        # Holdings are constant between fills, so mark equity in one pass
+        last_fill = np.searchsorted(fill_bars, np.arange(len(close)), side="right") - 1
+        has_fill = last_fill >= 0
+        position = np.where(has_fill, units_after[last_fill], 0.0)
+        cash = np.where(has_fill, cash_after[last_fill], config.initial_capital)
+        equity = pd.Series(cash + position * close, index=data.index)
+        
+        returns = data["Close"].pct_change()
+        strategy_returns = equity.pct_change()
+        returns_frame = pd.DataFrame({
+            "return": returns,
+            "strategy_return": strategy_returns,
+            "cum_return": (1 + returns).cumprod(),
+            "cum_strategy": equity / config.initial_capital,
+            "position": position,
+            "equity": equity,
+        })
+        fills = pd.DataFrame({
+            "bar": fill_bars,
+            "quantity": quantities,
+            "price": prices,
+            "fee": fees,
+        }, index=data.index[fill_bars])
+        return returns_frame, fills
     
+    def _result_frame(
+        self,
+        close: pd.Series,
+        signals: Signals,
+        returns: pd.DataFrame,
+        output_columns: Optional[Sequence[str]],
+    ) -> Optional[pd.DataFrame]:
+        """Assemble only the requested columns into BacktestResult.data."""
+        available = {
+            "Close": close,
+            "signal": signals.signal,
+            **signals.indicators,
+            **{name: returns[name] for name in returns.columns},
+        }
+        if output_columns is None:
+            output_columns = list(available)
+        if not output_columns:
+            return None
+        return pd.DataFrame(
+            {name: available[name] for name in output_columns if name in available},
+            index=close.index,
+        )
+    
+    @timed("engine.calculate_metrics")
     def _calculate_metrics(self, data: pd.DataFrame, interval: str) -> dict:
         """Calculate performance metrics."""
-        total_return = (data["cum_strategy"].iloc[-1] - 1) * 100
+        cum_strategy = data["cum_strategy"].to_numpy(dtype=np.float64)
+        total_return = (cum_strategy[-1] - 1) * 100
         buy_hold_return = (data["cum_return"].iloc[-1] - 1) * 100
         
         # Calculate max drawdown
-        cummax = data["cum_strategy"].cummax()
-        drawdown = (data["cum_strategy"] - cummax) / cummax
-        max_drawdown = drawdown.min() * 100
+        max_drawdown = np.nanmin(kernels.drawdown(cum_strategy)) * 100
         
         # Calculate Sharpe ratio (annualized for daily data)
-        mean_return = data["strategy_return"].mean()
-        std_return = data["strategy_return"].std()
-        
-        if std_return > 0:
-            sharpe_ratio = mean_return / std_return
-            if interval == "1d":
-                sharpe_ratio *= (252 ** 0.5)  # Annualize for daily data
-        else:
-            sharpe_ratio = 0.0
+        sharpe_ratio = kernels.sharpe(
+            data["strategy_return"].to_numpy(dtype=np.float64),
+            periods_per_year=252 if interval == "1d" else None,
+        )
         
         return {
             'total_return': total_return,
@@ -142,6 +754,24 @@ class BacktestEngine:
             'max_drawdown': max_drawdown,
             'sharpe_ratio': sharpe_ratio
         }
+    
+    def _sweep_metrics(self, strategy_returns: np.ndarray, interval: str) -> np.ndarray:
+        """Column-wise metrics matching _calculate_metrics for a (time x params) matrix."""
+        cum_strategy = np.cumprod(1 + np.nan_to_num(strategy_returns), axis=0)
+        total_return = (cum_strategy[-1] - 1) * 100
+        
+        cummax = np.maximum.accumulate(cum_strategy, axis=0)
+        max_drawdown = ((cum_strategy - cummax) / cummax).min(axis=0) * 100
+        
+        mean_return = np.nanmean(strategy_returns, axis=0)
+        std_return = np.nanstd(strategy_returns, axis=0, ddof=1)
+        sharpe_ratio = np.divide(
+            mean_return, std_return, out=np.zeros_like(mean_return), where=std_return > 0
+        )
+        if interval == "1d":
+            sharpe_ratio *= (252 ** 0.5)  # Annualize for daily data
+        
+        return np.column_stack([total_return, max_drawdown, sharpe_ratio])
 
 
 def run_simple_backtest(
@@ -182,3 +812,119 @@ def run_simple_backtest(
     
     engine = BacktestEngine()
     return engine.run_backtest(config)
+
+
+def _drifting_growth(returns: np.ndarray, weights: np.ndarray, every: int) -> np.ndarray:
+    """
+    Portfolio growth of 1 unit when ``weights`` are set at the close of every
+    ``every``-th bar and left to drift with asset returns until the next one.
+    
+    Within a holding segment the value is ``1 + sum(w * (G - 1))`` where G is
+    each asset's compounded growth since the rebalance bar; segments are
+    chained by multiplying in the value reached at each rebalance.
+    """
+    n_bars = len(returns)
+    log_growth = np.cumsum(np.log1p(returns), axis=0)
+    
+    # Rebalance bar whose weights are held over each bar (bar 0 holds nothing)
+    start = (np.arange(n_bars) - 1) // every * every
+    start[0] = 0
+    held = weights[start]
+    held[0] = 0.0
+    
+    segment = 1 + (held * np.expm1(log_growth - log_growth[start])).sum(axis=1)
+    # Value at each rebalance bar carries into the following segment
+    rebalance = np.arange(every, n_bars, every)
+    carried = np.ones(n_bars)
+    carried[rebalance] = segment[rebalance]
+    chain = np.cumprod(carried)
+    # A rebalance bar still belongs to the segment it closes
+    return np.where(np.arange(n_bars) % every == 0, chain / carried, chain) * segment
+
+
+def _fill_orders(
+    open_: np.ndarray,
+    target: np.ndarray,
+    initial_capital: float,
+    commission: float,
+    commission_min: float,
+    slippage: float,
+) -> Tuple[np.ndarray, ...]:
+    """
+    Walk the order book for the event engine.
+    
+    An order is created whenever the target exposure changes at a bar's close
+    and filled at the next bar's open, so the loop runs once per order rather
+    than once per bar. Position sizes are fractional.
+    
+    Returns:
+        Arrays of fill bar, signed quantity, fill price, fee, and the units and
+        cash held after each fill
+    """
+    order_bars = np.flatnonzero(np.diff(target, prepend=0.0))
+    order_bars = order_bars[order_bars + 1 < len(open_)]
+    
+    count = len(order_bars)
+    fill_bars = order_bars + 1
+    quantities = np.zeros(count)
+    prices = np.zeros(count)
+    fees = np.zeros(count)
+    units_after = np.zeros(count)
+    cash_after = np.zeros(count)
+    
+    units, cash = 0.0, initial_capital
+    for i in range(count):
+        price = open_[fill_bars[i]]
+        equity = cash + units * price
+        desired = target[order_bars[i]] * max(equity, 0.0) / price
+        quantity = desired - units
+        if quantity != 0.0:
+            fill_price = price * (1 + slippage) if quantity > 0 else price * (1 - slippage)
+            fee = max(commission_min, commission * abs(quantity) * fill_price)
+            cash -= quantity * fill_price + fee
+            units = desired
+            quantities[i], prices[i], fees[i] = quantity, fill_price, fee
+        units_after[i], cash_after[i] = units, cash
+    
+    filled = quantities != 0.0
+    return (
+        fill_bars[filled], quantities[filled], prices[filled], fees[filled],
+        units_after[filled], cash_after[filled],
+    )
+
+
+def _run_mapped(config: BacktestConfig, path: str) -> BacktestResult:
+    """
+    Worker entry point for run_many: run one config on the .npy files of a
+    price store version, mapped read-only so workers share the page cache.
+    """
+    prices = MmapStore.open_path(path)
+    
+    result = BacktestEngine()._run_on_data(config, prices.to_frame(), output_columns=())
+    result.fills = None
+    return result
+
+
+def _collect(pending: dict, return_when: str) -> Iterator[BacktestResult]:
+    """Yield finished run_many futures and drop them from ``pending``."""
+    done, _ = wait(pending, return_when=return_when)
+    for future in done:
+        config = pending.pop(future)
+        try:
+            yield future.result()
+        except Exception as e:
+            yield _failed_result(config, str(e))
+
+
+def _failed_result(config: BacktestConfig, error: str) -> BacktestResult:
+    """Summary for a config that could not be run."""
+    return BacktestResult(
+        data=None,
+        total_return=float("nan"),
+        buy_hold_return=float("nan"),
+        max_drawdown=float("nan"),
+        sharpe_ratio=float("nan"),
+        symbol=config.symbol,
+        config=config,
+        error=error
+    )
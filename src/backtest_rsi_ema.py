@@ -1,9 +1,10 @@
-import matplotlib.pyplot as plt
 from src.backtest_engine import run_simple_backtest
 
 
 def backtest():
     """Run backtest using the backtest engine and display results with matplotlib."""
+    import matplotlib.pyplot as plt
+
     # Run backtest using the engine
     result = run_simple_backtest(
         symbol="BTC-USD",
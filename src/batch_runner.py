@@ -0,0 +1,190 @@
+"""
+Batch backtests from a config file, streamed to JSON lines or Parquet.
+
+    sigmabott backtest --config nightly.toml --workers 8 --output results.parquet
+
+Config files hold one BacktestConfig per entry; fields left out fall back to
+``defaults`` in the file and then to CONFIG_DEFAULTS:
+
+    TOML   [defaults] table plus [[backtest]] tables
+    JSON   a list of objects, or {"defaults": {...}, "backtests": [...]}
+    CSV    a header row of field names; empty cells use the defaults
+
+``use_ema``/``use_rsi`` default to whether the window is positive. Configs are
+read and run BATCH_SIZE at a time and each result is written as soon as it
+finishes, so memory stays flat however many configs the file holds.
+"""
+import csv
+import json
+import math
+import sys
+import tomllib
+from dataclasses import asdict, fields
+from itertools import batched
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO
+
+from src.backtest_engine import BacktestConfig, BacktestEngine, BacktestResult
+
+CONFIG_DEFAULTS = {
+    "period": "6mo",
+    "interval": "1h",
+    "ema_window": 20,
+    "rsi_window": 14,
+    "rsi_oversold": 30,
+    "rsi_overbought": 70,
+}
+# Configs handed to run_many at a time
+BATCH_SIZE = 1000
+# Parquet rows buffered per row group
+ROW_GROUP_SIZE = 1024
+
+_FIELD_TYPES = {f.name: f.type for f in fields(BacktestConfig) if f.name != "output_columns"}
+METRICS = ("total_return", "buy_hold_return", "max_drawdown", "sharpe_ratio")
+
+
+def _coerce(name: str, value):
+    """Convert a config value (a string for CSV) to the field's type."""
+    kind = _FIELD_TYPES[name]
+    if kind is bool and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered not in ("true", "false", "1", "0", "yes", "no"):
+            raise ValueError(f"{name}: expected a boolean, got {value!r}")
+        return lowered in ("true", "1", "yes")
+    return kind(value)
+
+
+def make_config(entry: dict, defaults: Optional[dict] = None) -> BacktestConfig:
+    """Build a BacktestConfig from one config file entry."""
+    values = {**CONFIG_DEFAULTS, **(defaults or {})}
+    values.update({key: value for key, value in entry.items() if value not in ("", None)})
+    unknown = set(values) - set(_FIELD_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown config fields: {', '.join(sorted(unknown))}")
+    if "symbol" not in values:
+        raise ValueError(f"Config without symbol: {entry}")
+    values = {name: _coerce(name, value) for name, value in values.items()}
+    values.setdefault("use_ema", values["ema_window"] > 0)
+    values.setdefault("use_rsi", values["rsi_window"] > 0)
+    return BacktestConfig(**values, output_columns=())
+
+
+def load_configs(path) -> Iterator[BacktestConfig]:
+    """Read BacktestConfigs from a TOML, JSON or CSV file (CSV is streamed)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield make_config(row)
+        return
+
+    if suffix == ".toml":
+        with open(path, "rb") as f:
+            document = tomllib.load(f)
+        entries = document.get("backtest", [])
+    elif suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        if isinstance(document, list):
+            document = {"backtests": document}
+        entries = document.get("backtests", [])
+    else:
+        raise ValueError(f"Unsupported config file: {path} (use .toml, .json or .csv)")
+    for entry in entries:
+        yield make_config(entry, document.get("defaults"))
+
+
+def result_record(result: BacktestResult) -> dict:
+    """Flat row for a result: its config fields, metrics and error."""
+    record = asdict(result.config)
+    del record["output_columns"]
+    for metric in METRICS:
+        value = getattr(result, metric)
+        record[metric] = None if value is None or math.isnan(value) else float(value)
+    record["error"] = result.error
+    return record
+
+
+class JsonLinesWriter:
+    """One JSON object per line, flushed per result."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, record: dict) -> None:
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class ParquetWriter:
+    """Parquet file with a fixed schema, written ROW_GROUP_SIZE rows at a time."""
+
+    def __init__(self, path, row_group_size: int = ROW_GROUP_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_types = {bool: pa.bool_(), int: pa.int64(), float: pa.float64(), str: pa.string()}
+        columns = [(name, arrow_types[kind]) for name, kind in _FIELD_TYPES.items()]
+        columns += [(metric, pa.float64()) for metric in METRICS] + [("error", pa.string())]
+        self.schema = pa.schema(columns)
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.row_group_size = row_group_size
+        self.rows = []
+
+    def write(self, record: dict) -> None:
+        self.rows.append(record)
+        if len(self.rows) >= self.row_group_size:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        self.writer.close()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+
+        if self.rows:
+            self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+
+def open_writer(output: Optional[str], fmt: Optional[str] = None):
+    """JSON lines to stdout (output None or "-") or a file; Parquet by format or suffix."""
+    if fmt is None:
+        fmt = "parquet" if output and Path(output).suffix.lower() == ".parquet" else "jsonl"
+    if fmt == "parquet":
+        if not output or output == "-":
+            raise ValueError("Parquet output needs a file path")
+        return ParquetWriter(output)
+    if fmt != "jsonl":
+        raise ValueError(f"Unknown output format: {fmt}")
+    if not output or output == "-":
+        return JsonLinesWriter(sys.stdout)
+    return JsonLinesWriter(open(output, "w", encoding="utf-8"))
+
+
+def run_batch(
+    configs: Iterable[BacktestConfig],
+    writer,
+    max_workers: Optional[int] = None,
+    engine: Optional[BacktestEngine] = None,
+) -> tuple[int, int]:
+    """
+    Run configs through BacktestEngine.run_many and write each result.
+
+    Returns:
+        (results written, results with an error)
+    """
+    engine = engine or BacktestEngine()
+    written = failed = 0
+    for batch in batched(configs, BATCH_SIZE):
+        for result in engine.run_many(batch, max_workers=max_workers):
+            writer.write(result_record(result))
+            written += 1
+            failed += result.error is not None
+    return written, failed
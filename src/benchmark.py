@@ -0,0 +1,351 @@
+"""
+Benchmark suite for the data pipeline, strategies and backtest engine.
+
+Every case runs in its own process on a synthetic series so peak RSS is
+attributable to that case. Results are appended to a JSON history file and
+compared with the median of the previous runs; the command exits non-zero
+when a case regresses by more than the threshold.
+
+Import times of the entry points are measured with ``-X importtime`` in a
+fresh interpreter and checked against IMPORT_BUDGETS_S; modules listed in
+LAZY_IMPORTS must not be pulled in at import time at all.
+
+    uv run sigmabott-bench --sizes 10k,1m
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def synthetic_ohlcv(n: int, seed: int = 0, freq: str = "min") -> pd.DataFrame:
+    """Random-walk OHLCV bars with a tz-aware DatetimeIndex."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    index = pd.date_range("2000-01-01", periods=n, freq=freq, tz="UTC", name="Datetime")
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + spread,
+        "Low": np.minimum(open_, close) - spread,
+        "Close": close,
+        "Volume": rng.integers(1, 10_000, n).astype(np.float64),
+    }, index=index)
+
+
+def _fake_provider(data: pd.DataFrame, cacheable: bool = True):
+    """DataProvider serving a synthetic frame from memory for any symbol."""
+    from src.utils.providers import DataProvider
+
+    class FakeProvider(DataProvider):
+        name = "fake"
+
+        def _download(self, symbols, start, end, interval):
+            frame = data if start is None else data[data.index >= start]
+            return {symbol: frame for symbol in symbols}
+
+    provider = FakeProvider()
+    provider.cacheable = cacheable
+    return provider
+
+
+def _case_download_cold(data, workdir):
+    from src.utils.yahoo_finance import download_yf
+    provider = _fake_provider(data)
+    return lambda: download_yf("BENCH", period="max", interval="1m",
+                               outdir=tempfile.mkdtemp(dir=workdir), provider=provider)
+
+
+def _case_download_warm(data, workdir):
+    from src.utils.yahoo_finance import download_yf
+    provider = _fake_provider(data)
+    download_yf("BENCH", period="max", interval="1m", outdir=workdir, provider=provider)
+    return lambda: download_yf("BENCH", period="max", interval="1m", outdir=workdir,
+                               provider=provider)
+
+
+def _case_parquet_write(data, workdir):
+    from src.utils import parquet_cache
+    return lambda: parquet_cache.write_parquet_cache(data, str(workdir / "bench"), symbols="BENCH")
+
+
+def _case_parquet_read(data, workdir):
+    from src.utils import parquet_cache
+    parquet_cache.write_parquet_cache(data, str(workdir / "bench"), symbols="BENCH")
+    return lambda: parquet_cache.read_parquet_cache(str(workdir / "bench"))
+
+
+def _strategy_case(build):
+    def case(data, workdir):
+        from src.event_manager import EventManager
+        from src.signals.indicator_cache import IndicatorCache
+
+        def run():
+            # A fresh cache per run so the indicator is actually computed
+            build(EventManager(), IndicatorCache()).generate_signals(data)
+        return run
+    return case
+
+
+def _build_ema(em, cache):
+    from src.signals.strategies import EMAStrategy
+    return EMAStrategy(20, em, indicator_cache=cache)
+
+
+def _build_rsi(em, cache):
+    from src.signals.strategies import RSIStrategy
+    return RSIStrategy(14, 70, 30, em, indicator_cache=cache)
+
+
+def _build_sma(em, cache):
+    from src.signals.strategies import SMAStrategy
+    return SMAStrategy(200, em, indicator_cache=cache)
+
+
+def _build_combined(em, cache):
+    from src.signals.strategies import CombinedStrategy
+    return CombinedStrategy([_build_ema(em, cache), _build_rsi(em, cache)])
+
+
+def _case_run_backtest(data, workdir):
+    from src.backtest_engine import BacktestConfig, BacktestEngine
+    from src.signals.indicator_cache import IndicatorCache
+    config = BacktestConfig(
+        symbol="BENCH", period="max", interval="1m",
+        use_ema=True, ema_window=20, use_rsi=True, rsi_window=14,
+        rsi_oversold=30, rsi_overbought=70,
+    )
+
+    provider = _fake_provider(data, cacheable=False)
+
+    def run():
+        engine = BacktestEngine(indicator_cache=IndicatorCache(), provider=provider)
+        engine.run_backtest(config)
+    return run
+
+
+CASES = {
+    "download_yf.cold": _case_download_cold,
+    "download_yf.warm": _case_download_warm,
+    "parquet_cache.write": _case_parquet_write,
+    "parquet_cache.read": _case_parquet_read,
+    "EMAStrategy.generate_signals": _strategy_case(_build_ema),
+    "RSIStrategy.generate_signals": _strategy_case(_build_rsi),
+    "SMAStrategy.generate_signals": _strategy_case(_build_sma),
+    "CombinedStrategy.generate_signals": _strategy_case(_build_combined),
+    "BacktestEngine.run_backtest": _case_run_backtest,
+}
+
+
+def _measure(case: str, n: int, repeat: int, conn) -> None:
+    """Child-process body: time a case, then trace its allocations once."""
+    try:
+        with tempfile.TemporaryDirectory() as workdir, \
+                contextlib.redirect_stdout(io.StringIO()):
+            run = CASES[case](synthetic_ohlcv(n), Path(workdir))
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+
+            tracemalloc.start()
+            run()
+            _, alloc_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        peak_rss = None
+        if resource is not None:
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            scale = 1 if sys.platform == "darwin" else 1024
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        conn.send({
+            "wall_s": min(timings),
+            "peak_rss_mb": peak_rss / 2**20 if peak_rss else None,
+            "alloc_peak_mb": alloc_peak / 2**20,
+        })
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_case(case: str, n: int, repeat: int = 3) -> dict:
+    """Run one benchmark case in a fresh process and return its measurements."""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_measure, args=(case, n, repeat, child))
+    process.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        result = {"error": "benchmark process died (out of memory?)"}
+    process.join()
+    return result
+
+
+# Cumulative import time allowed per module, in seconds
+IMPORT_BUDGETS_S = {
+    "src.main": 0.1,
+    "src.utils.yahoo_finance": 0.6,
+    "src.signals.strategies": 0.6,
+    "src.backtest_engine": 0.8,
+}
+# Heavy or network-touching dependencies that must only load on first use
+LAZY_IMPORTS = ("yfinance", "numba", "matplotlib", "ta", "streamlit", "plotly")
+
+
+def import_time(module: str, repeat: int = 3) -> tuple[float, set]:
+    """Best cumulative import time of ``module`` and the modules it imports."""
+    best, imported = float("inf"), set()
+    for _ in range(repeat):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, check=True,
+        ).stderr
+        for line in stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2].strip()
+            imported.add(name)
+            if name == module:
+                best = min(best, int(parts[1]) / 1e6)
+    return best, imported
+
+
+def check_imports(repeat: int = 3) -> tuple[dict, list]:
+    """Measure IMPORT_BUDGETS_S modules; returns (results, budget violations)."""
+    results, violations = {}, []
+    for module, budget in IMPORT_BUDGETS_S.items():
+        seconds, imported = import_time(module, repeat)
+        results[f"import[{module}]"] = {"wall_s": seconds, "peak_rss_mb": None, "alloc_peak_mb": None}
+        if seconds > budget:
+            violations.append(f"{module} imports in {seconds:.3f} s (budget {budget:.3f} s)")
+        eager = sorted(m for m in LAZY_IMPORTS if m in imported)
+        if eager:
+            violations.append(f"{module} imports {', '.join(eager)} eagerly")
+    return results, violations
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Absolute changes below these are treated as noise, whatever the ratio
+NOISE_FLOOR = {"wall_s": 0.002, "peak_rss_mb": 5.0, "alloc_peak_mb": 1.0}
+
+
+def find_regressions(results: dict, history: list, threshold: float, window: int = 5) -> list:
+    """Compare results with the median of the last ``window`` recorded runs."""
+    regressions = []
+    for name, current in results.items():
+        for metric, floor in NOISE_FLOOR.items():
+            previous = [
+                run["results"][name][metric]
+                for run in history[-window:]
+                if run["results"].get(name, {}).get(metric) is not None
+            ]
+            if not previous or current.get(metric) is None:
+                continue
+            baseline = statistics.median(previous)
+            if (current[metric] > baseline * (1 + threshold)
+                    and current[metric] - baseline > floor):
+                regressions.append((name, metric, baseline, current[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SigmaBot benchmark suite")
+    parser.add_argument("--sizes", default="10k,1m,10m",
+                        help=f"Comma-separated series sizes ({', '.join(SIZES)} or a bar count)")
+    parser.add_argument("--cases", default=None,
+                        help="Comma-separated case names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--history", default="bench_history.json", help="JSON history file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown versus the recorded median (0.2 = 20%%)")
+    parser.add_argument("--no-record", action="store_true", help="Do not append to the history")
+    parser.add_argument("--no-imports", action="store_true",
+                        help="Skip the import-time budget check")
+    args = parser.parse_args(argv)
+
+    sizes = [SIZES.get(s, None) or int(s) for s in args.sizes.split(",")]
+    cases = args.cases.split(",") if args.cases else list(CASES)
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    history_path = Path(args.history)
+    history = json.loads(history_path.read_text()) if history_path.exists() else []
+
+    results = {}
+    for n in sizes:
+        for case in cases:
+            name = f"{case}[{n}]"
+            result = run_case(case, n, args.repeat)
+            results[name] = result
+            if "error" in result:
+                print(f"{name:<48} ERROR {result['error']}")
+                continue
+            rss = f"{result['peak_rss_mb']:9.1f}" if result["peak_rss_mb"] else "      n/a"
+            print(f"{name:<48} {result['wall_s'] * 1000:10.2f} ms  rss {rss} MB  "
+                  f"alloc {result['alloc_peak_mb']:9.1f} MB")
+
+    violations = []
+    if not args.no_imports:
+        import_results, violations = check_imports(args.repeat)
+        for name, result in import_results.items():
+            results[name] = result
+            print(f"{name:<48} {result['wall_s'] * 1000:10.2f} ms")
+
+    measured = {name: r for name, r in results.items() if "error" not in r}
+    regressions = find_regressions(measured, history, args.threshold)
+
+    if not args.no_record:
+        history.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "results": measured,
+        })
+        history_path.write_text(json.dumps(history, indent=2))
+
+    for name, metric, baseline, current in regressions:
+        print(f"REGRESSION {name} {metric}: {baseline:.4g} -> {current:.4g}")
+    for violation in violations:
+        print(f"IMPORT BUDGET {violation}")
+    errors = len(results) - len(measured)
+    return 1 if regressions or errors or violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
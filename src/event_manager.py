@@ -1,6 +1,244 @@
+import itertools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+# Seconds an observer worker waits for a new call before its thread exits
+OBSERVER_IDLE_S = 60.0
+
+
+class _ObserverWorker:
+    """Daemon thread running one observer's calls, one at a time."""
+
+    def __init__(self, observer, on_idle):
+        self.observer = observer
+        self.closed = False
+        self._on_idle = on_idle
+        self._call = None
+        self._busy = False
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name="event-observer", daemon=True).start()
+
+    def submit(self, event, data):
+        """Future for the call, or None while the previous call is still running."""
+        with self._cond:
+            if self._busy or self.closed:
+                return None
+            self._busy = True
+            future = Future()
+            self._call = (event, data, future)
+            self._cond.notify_all()
+            return future
+
+    def idle(self):
+        with self._cond:
+            return not self._busy
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._call is not None or self.closed, timeout=OBSERVER_IDLE_S
+                )
+                call, self._call = self._call, None
+                closed = self.closed
+            if call is None:
+                if closed:
+                    return
+                # Idle: let the queue drop this worker (it re-checks under its lock)
+                self._on_idle(self)
+                continue
+            event, data, future = call
+            error = None
+            try:
+                self.observer.update(event, data)
+            except Exception as e:
+                error = e
+            # Free before resolving, so the next event is not skipped
+            with self._cond:
+                self._busy = False
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+class EventQueue:
+    """
+    Bounded event queue drained by a background worker thread.
+
+    When the queue is full, ``policy`` decides what happens:
+        "block"        notify() waits for space
+        "drop_newest"  the new event is discarded
+        "drop_oldest"  the oldest pending event is discarded
+        "coalesce"     a pending event of the same type from the same source
+                       is replaced by the new one; otherwise the oldest is dropped
+
+    With ``observer_timeout`` set, every observer runs on its own daemon
+    thread and a call that takes longer is abandoned, so one slow observer
+    cannot hold up delivery to the others. Until the abandoned call returns,
+    events for that observer are skipped (counted in ``skipped``).
+    """
+
+    POLICIES = ("block", "drop_newest", "drop_oldest", "coalesce")
+
+    def __init__(self, maxsize=1000, policy="coalesce", observer_timeout=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {self.POLICIES}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.observer_timeout = observer_timeout
+        self.dropped = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.delivered = 0
+
+        self._order = deque()
+        # sequence number -> (coalesce key, observers, event, data)
+        self._pending = {}
+        # coalesce key -> sequence number of its latest pending event
+        self._latest = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._worker = None
+        # observer -> its worker thread, with observer_timeout set
+        self._observer_workers = {}
+        self._workers_lock = threading.Lock()
+
+    def put(self, observers, event, data=None, source=None):
+        """
+        Enqueue one event for delivery to ``observers``.
+
+        ``source`` identifies the sender for the coalesce policy; it is kept
+        in the key itself, so it must be hashable and stays alive while queued.
+        """
+        key = (source, event)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("EventQueue is closed")
+            while len(self._order) >= self.maxsize:
+                if self.policy == "block":
+                    self._cond.wait()
+                elif self.policy == "drop_newest":
+                    self.dropped += 1
+                    return
+                elif self.policy == "coalesce" and key in self._latest:
+                    self._pending[self._latest[key]] = (key, observers, event, data)
+                    self.coalesced += 1
+                    return
+                else:
+                    self._pop(self._order.popleft())
+                    self.dropped += 1
+            seq = next(self._counter)
+            self._order.append(seq)
+            self._pending[seq] = (key, observers, event, data)
+            self._latest[key] = seq
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._order)
+
+    def join(self, timeout=None):
+        """Wait until every queued event has been delivered."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._order and not self._busy, timeout=timeout
+            )
+
+    def close(self):
+        """Stop delivering: queued events are discarded and worker threads exit."""
+        with self._cond:
+            self._closed = True
+            self._order.clear()
+            self._pending.clear()
+            self._latest.clear()
+            self._cond.notify_all()
+        with self._workers_lock:
+            workers, self._observer_workers = self._observer_workers, {}
+        for worker in workers.values():
+            worker.close()
+
+    def _pop(self, seq):
+        key, observers, event, data = self._pending.pop(seq)
+        if self._latest.get(key) == seq:
+            del self._latest[key]
+        return observers, event, data
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="event-queue", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._order or self._closed)
+                if self._closed:
+                    return
+                observers, event, data = self._pop(self._order.popleft())
+                self._busy = True
+                self._cond.notify_all()
+            try:
+                for observer in observers:
+                    self._deliver(observer, event, data)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _deliver(self, observer, event, data):
+        try:
+            if self.observer_timeout is None:
+                observer.update(event, data)
+            else:
+                with self._workers_lock:
+                    worker = self._observer_workers.get(observer)
+                    if worker is None or worker.closed:
+                        worker = self._observer_workers[observer] = _ObserverWorker(
+                            observer, self._retire
+                        )
+                    future = worker.submit(event, data)
+                if future is None:
+                    self.skipped += 1
+                    return
+                future.result(timeout=self.observer_timeout)
+            self.delivered += 1
+        except TimeoutError:
+            self.timeouts += 1
+            logging.warning(f"Observer {observer!r} timed out on {event!r}")
+        except Exception:
+            logging.exception(f"Observer {observer!r} failed on {event!r}")
+
+    def _retire(self, worker):
+        """Drop an idle observer worker, so observers that are gone can be freed."""
+        with self._workers_lock:
+            if worker.idle() and self._observer_workers.get(worker.observer) is worker:
+                del self._observer_workers[worker.observer]
+                worker.close()
+
+
 class EventManager:
-    def __init__(self):
+    def __init__(self, queue=None):
+        """
+        Args:
+            queue (EventQueue | None): Deliver events asynchronously through this
+                queue. Without one, notify() calls every observer synchronously.
+        """
         self._observers = []
+        self.queue = queue
 
     def subscribe(self, observer):
         self._observers.append(observer)
@@ -8,7 +246,19 @@ class EventManager:
     def unsubscribe(self, observer):
         self._observers.remove(observer)
 
-    def notify(self, event, data=None):
+    def notify(self, event, data=None, source=None):
+        """
+        Args:
+            event (str): Event type
+            data: Payload passed to every observer
+            source (str | None): Stable name of the sender (e.g. the strategy);
+                a full coalescing queue only replaces events with the same
+                type, manager and source
+        """
+        if self.queue is not None:
+            if self._observers:
+                self.queue.put(tuple(self._observers), event, data, source=(self, source))
+            return
         for observer in self._observers:
             observer.update(event, data)
 
@@ -1,11 +1,9 @@
 import pandas as pd
-import yfinance as yf
-import matplotlib.pyplot as plt
-from ta.trend import EMAIndicator
-from ta.momentum import RSIIndicator
 
 
 def close_value(asset):
+    import yfinance as yf
+
     data = yf.download(
         asset, period="1wk", interval="1h", group_by="column", progress=False
     )
@@ -15,6 +13,11 @@ def close_value(asset):
 
 
 def plot_indicators():
+    # Tunge avhengigheter lastes først når plottet faktisk lages
+    import matplotlib.pyplot as plt
+    from ta.trend import EMAIndicator
+    from ta.momentum import RSIIndicator
+
     data = close_value("BTC-USD")
     close = pd.to_numeric(data["Close"], errors="coerce")
 
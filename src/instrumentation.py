@@ -0,0 +1,214 @@
+"""
+Lightweight timing and I/O instrumentation for the hot paths.
+
+    from src.instrumentation import timed, get_instrumentation
+
+    @timed("engine.calculate_returns", kind="compute")
+    def _calculate_returns(...): ...
+
+    with timed("yahoo.fetch", kind="network"):
+        ...
+
+Every stage keeps a log-bucketed latency histogram plus bytes read and
+written. Caches report hits and misses. Each measurement is also emitted as
+an "instrumentation" event on ``Instrumentation.event_manager``, which does
+nothing while no observer is subscribed. The diagnostics page reads
+``snapshot()``.
+
+``kind`` groups stages ("network", "disk", "compute", or "io" for entry points
+that mix them) so a slow page can be attributed to one of them.
+"""
+import bisect
+import contextlib
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from src.event_manager import EventManager, Observer
+
+# Histogram bucket upper edges in seconds: 1 µs to 100 s, 10 buckets per decade
+BUCKET_EDGES = [10 ** (exponent / 10) for exponent in range(-60, 21)]
+
+
+class Histogram:
+    """Latency histogram with fixed log-spaced buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_EDGES, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-th percentile (0-100), capped at max."""
+        if not self.count:
+            return math.nan
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                edge = BUCKET_EDGES[bucket] if bucket < len(BUCKET_EDGES) else self.max
+                return min(max(edge, self.min), self.max)
+        return self.max
+
+
+class _Stage:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.latency = Histogram()
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class _Timer(contextlib.ContextDecorator):
+    def __init__(self, instrumentation: "Instrumentation", stage: str, kind: str):
+        self.instrumentation = instrumentation
+        self.stage = stage
+        self.kind = kind
+
+    def __enter__(self):
+        # Start times live on the thread, keyed by timer, so a decorator's
+        # timer can be shared by threads and re-entered by recursion
+        starts = self._starts()
+        starts.setdefault(id(self), []).append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        starts = self._starts()
+        stack = starts[id(self)]
+        elapsed = time.perf_counter() - stack.pop()
+        if not stack:
+            del starts[id(self)]
+        self.instrumentation.record(self.stage, elapsed, kind=self.kind)
+        return False
+
+    def _starts(self) -> dict:
+        local = self.instrumentation._local
+        if not hasattr(local, "starts"):
+            local.starts = {}
+        return local.starts
+
+
+class Instrumentation:
+    def __init__(self, event_manager: Optional[EventManager] = None):
+        self.event_manager = event_manager or EventManager()
+        self._stages: Dict[str, _Stage] = {}
+        self._caches: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def timed(self, stage: str, kind: str = "compute") -> _Timer:
+        """Context manager and decorator recording the wall time of ``stage``."""
+        return _Timer(self, stage, kind)
+
+    def record(self, stage: str, seconds: float, kind: str = "compute") -> None:
+        with self._lock:
+            self._stage(stage, kind).latency.record(seconds)
+        self.event_manager.notify(
+            "instrumentation", {"type": "timing", "stage": stage, "kind": kind, "seconds": seconds}
+        )
+
+    def add_bytes(self, stage: str, read: int = 0, written: int = 0, kind: str = "disk") -> None:
+        with self._lock:
+            entry = self._stage(stage, kind)
+            entry.bytes_read += read
+            entry.bytes_written += written
+        self.event_manager.notify(
+            "instrumentation", {"type": "bytes", "stage": stage, "read": read, "written": written}
+        )
+
+    def cache_access(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            counts = self._caches.setdefault(cache, [0, 0])
+            counts[0 if hit else 1] += 1
+        self.event_manager.notify("instrumentation", {"type": "cache", "cache": cache, "hit": hit})
+
+    def snapshot(self) -> dict:
+        """Current statistics per stage (times in seconds) and per cache."""
+        with self._lock:
+            stages = {
+                name: {
+                    "kind": stage.kind,
+                    "count": stage.latency.count,
+                    "total": stage.latency.total,
+                    "mean": stage.latency.mean,
+                    "p50": stage.latency.percentile(50),
+                    "p95": stage.latency.percentile(95),
+                    "p99": stage.latency.percentile(99),
+                    "max": stage.latency.max,
+                    "bytes_read": stage.bytes_read,
+                    "bytes_written": stage.bytes_written,
+                }
+                for name, stage in self._stages.items()
+            }
+            caches = {
+                name: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else math.nan,
+                }
+                for name, (hits, misses) in self._caches.items()
+            }
+        return {"stages": stages, "caches": caches}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._caches.clear()
+
+    def _stage(self, stage: str, kind: str) -> _Stage:
+        entry = self._stages.get(stage)
+        if entry is None:
+            entry = self._stages[stage] = _Stage(kind)
+        return entry
+
+
+class RecentEvents(Observer):
+    """Observer keeping the most recent instrumentation events."""
+
+    def __init__(self, maxlen: int = 200):
+        self.events = deque(maxlen=maxlen)
+
+    def update(self, event, data):
+        if event == "instrumentation":
+            self.events.append({"time": time.time(), **data})
+
+
+_default = Instrumentation()
+_recent: Optional[RecentEvents] = None
+_recent_lock = threading.Lock()
+
+
+def get_instrumentation() -> Instrumentation:
+    """Process-wide instrumentation used by the module-level helpers."""
+    return _default
+
+
+def timed(stage: str, kind: str = "compute") -> _Timer:
+    """Time a block or function on the process-wide instrumentation."""
+    return _default.timed(stage, kind)
+
+
+def recent_events() -> RecentEvents:
+    """Process-wide RecentEvents observer, subscribed on first use."""
+    global _recent
+    with _recent_lock:
+        if _recent is None:
+            _recent = RecentEvents()
+            _default.event_manager.subscribe(_recent)
+        return _recent
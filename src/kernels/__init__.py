@@ -0,0 +1,19 @@
+"""
+Allocation-free numeric kernels for indicators and return math.
+
+All kernels take raw float64 arrays (and an optional ``out`` buffer) and are
+JIT-compiled with numba when it is installed.
+"""
+from ._jit import HAVE_NUMBA
+from .indicators import ema, rolling_mean, rsi
+from .returns import cumulative_returns, drawdown, sharpe
+
+__all__ = [
+    "HAVE_NUMBA",
+    "ema",
+    "rsi",
+    "rolling_mean",
+    "cumulative_returns",
+    "drawdown",
+    "sharpe",
+]
@@ -0,0 +1,45 @@
+"""
+Optional numba support for the kernels.
+
+numba is not a dependency. When it is installed (and SIGMABOTT_DISABLE_NUMBA
+is not set) the loop kernels are JIT-compiled; otherwise the public kernels
+fall back to vectorized NumPy/pandas implementations of the same math.
+
+numba takes a few hundred milliseconds to import, so it is only located here;
+the import and compilation happen on a kernel's first call.
+"""
+import functools
+import importlib.util
+import os
+
+HAVE_NUMBA = (
+    not os.environ.get("SIGMABOTT_DISABLE_NUMBA")
+    and importlib.util.find_spec("numba") is not None
+)
+
+
+class _LazyJit:
+    """A function compiled with numba.njit the first time it is called."""
+
+    def __init__(self, func, options: dict):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.options = options
+        self._compiled = None
+
+    def __call__(self, *args):
+        if self._compiled is None:
+            if HAVE_NUMBA:
+                from numba import njit
+
+                self._compiled = njit(**self.options)(self.func)
+            else:
+                self._compiled = self.func
+        return self._compiled(*args)
+
+
+def njit(*args, **kwargs):
+    """Lazy stand-in for numba.njit (the loops must not call each other)."""
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return _LazyJit(args[0], {})
+    return lambda func: _LazyJit(func, kwargs)
@@ -0,0 +1,133 @@
+"""
+Indicator kernels on raw float64 arrays: EMA, Wilder RSI and rolling mean.
+
+Results match ``ta.trend.EMAIndicator``, ``ta.momentum.RSIIndicator`` and
+``Series.rolling(window).mean()`` including NaN handling. Every kernel accepts
+an ``out`` array so callers can reuse buffers.
+"""
+import numpy as np
+import pandas as pd
+
+from ._jit import HAVE_NUMBA, njit
+
+
+def _prepare(x, out):
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(x)
+    return x, out
+
+
+@njit(cache=True, nogil=True)
+def _ewm_loop(x, alpha, min_periods, out):
+    # pandas' adjust=False, ignore_na=False recursion
+    n = len(x)
+    if n == 0:
+        return out
+    old_wt_factor = 1.0 - alpha
+    weighted = x[0]
+    nobs = 1 if weighted == weighted else 0
+    old_wt = 1.0
+    out[0] = weighted if nobs >= min_periods else np.nan
+    for i in range(1, n):
+        cur = x[i]
+        is_obs = cur == cur
+        if is_obs:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _rsi_loop(x, window, out):
+    # ta maps undefined price changes (first bar, NaN prices) to zero movement
+    n = len(x)
+    if n == 0:
+        return out
+    alpha = 1.0 / window
+    avg_up = 0.0
+    avg_down = 0.0
+    for i in range(n):
+        diff = x[i] - x[i - 1] if i > 0 else np.nan
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        if i == 0:
+            avg_up, avg_down = up, down
+        else:
+            avg_up = (1 - alpha) * avg_up + alpha * up
+            avg_down = (1 - alpha) * avg_down + alpha * down
+        if i + 1 < window:
+            out[i] = np.nan
+        elif avg_down == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _rolling_mean_loop(x, window, out):
+    # Kahan-compensated running sum, NaNs inside the window give NaN
+    total = 0.0
+    comp = 0.0
+    nobs = 0
+    for i in range(len(x)):
+        value = x[i]
+        if value == value:
+            nobs += 1
+            y = value - comp
+            t = total + y
+            comp = (t - total) - y
+            total = t
+        if i >= window:
+            old = x[i - window]
+            if old == old:
+                nobs -= 1
+                y = -old - comp
+                t = total + y
+                comp = (t - total) - y
+                total = t
+        out[i] = total / window if nobs == window else np.nan
+    return out
+
+
+def ema(x, window: int, out=None) -> np.ndarray:
+    """EMA with span ``window``, NaN until ``window`` observations."""
+    x, out = _prepare(x, out)
+    if HAVE_NUMBA:
+        return _ewm_loop(x, 2.0 / (window + 1), window, out)
+    out[:] = pd.Series(x).ewm(span=window, min_periods=window, adjust=False).mean()
+    return out
+
+
+def rsi(x, window: int, out=None) -> np.ndarray:
+    """Wilder RSI, NaN for the first ``window - 1`` bars."""
+    x, out = _prepare(x, out)
+    if HAVE_NUMBA:
+        return _rsi_loop(x, window, out)
+    diff = np.diff(x, prepend=np.nan)
+    up = pd.Series(np.where(diff > 0, diff, 0.0))
+    down = pd.Series(np.where(diff < 0, -diff, 0.0))
+    ewm = dict(alpha=1 / window, min_periods=window, adjust=False)
+    avg_up = up.ewm(**ewm).mean().to_numpy()
+    avg_down = down.ewm(**ewm).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:] = np.where(avg_down == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_down))
+    return out
+
+
+def rolling_mean(x, window: int, out=None) -> np.ndarray:
+    """Simple moving average, NaN unless the full window is observed."""
+    x, out = _prepare(x, out)
+    if HAVE_NUMBA:
+        return _rolling_mean_loop(x, window, out)
+    out[:] = pd.Series(x).rolling(window).mean()
+    return out
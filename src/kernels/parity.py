@@ -0,0 +1,65 @@
+"""
+Numerical parity check of the kernels against ta and pandas.
+
+    python -m src.kernels.parity
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+from ta.trend import EMAIndicator
+
+from . import HAVE_NUMBA, cumulative_returns, drawdown, ema, rolling_mean, rsi, sharpe
+
+
+def _max_error(actual, expected) -> float:
+    actual, expected = np.asarray(actual), np.asarray(expected, dtype=np.float64)
+    if not np.array_equal(np.isnan(actual), np.isnan(expected)):
+        return float("inf")
+    mask = ~np.isnan(expected)
+    if not mask.any():
+        return 0.0
+    return float(np.max(np.abs(actual[mask] - expected[mask]) / np.maximum(1.0, np.abs(expected[mask]))))
+
+
+def check_parity(n: int = 100_000, seed: int = 0, windows=(2, 5, 14, 20, 200)) -> dict:
+    """Return the worst relative error per kernel on a random walk with NaN gaps."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[rng.choice(n, n // 1000, replace=False)] = np.nan
+    series = pd.Series(close)
+
+    errors = {}
+    for window in windows:
+        errors[f"ema[{window}]"] = _max_error(
+            ema(close, window), EMAIndicator(series, window=window).ema_indicator()
+        )
+        errors[f"rsi[{window}]"] = _max_error(
+            rsi(close, window), RSIIndicator(series, window=window).rsi()
+        )
+        errors[f"rolling_mean[{window}]"] = _max_error(
+            rolling_mean(close, window), series.rolling(window).mean()
+        )
+
+    returns = series.pct_change()
+    equity = (1 + returns).cumprod()
+    errors["cumulative_returns"] = _max_error(cumulative_returns(returns.to_numpy()), equity)
+    errors["drawdown"] = _max_error(
+        drawdown(equity.to_numpy()), (equity - equity.cummax()) / equity.cummax()
+    )
+    errors["sharpe"] = _max_error([sharpe(returns.to_numpy())], [returns.mean() / returns.std()])
+    return errors
+
+
+def main(tolerance: float = 1e-9) -> int:
+    errors = check_parity()
+    print(f"numba: {'yes' if HAVE_NUMBA else 'no'}")
+    for name, error in errors.items():
+        status = "ok" if error <= tolerance else "FAIL"
+        print(f"{name:<22} {error:.3e} {status}")
+    return 0 if all(error <= tolerance for error in errors.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Return-math kernels on raw float64 arrays: cumulative returns, drawdown and
+Sharpe ratio. NaN returns are skipped the way pandas' cumprod/cummax/mean/std
+skip them.
+"""
+import numpy as np
+
+from ._jit import HAVE_NUMBA, njit
+
+
+@njit(cache=True, nogil=True)
+def _cumulative_loop(returns, out):
+    growth = 1.0
+    for i in range(len(returns)):
+        r = returns[i]
+        if r == r:
+            growth *= 1.0 + r
+            out[i] = growth
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _drawdown_loop(equity, out):
+    peak = np.nan
+    for i in range(len(equity)):
+        value = equity[i]
+        if value == value:
+            if not (peak >= value):
+                peak = value
+            out[i] = (value - peak) / peak
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _sharpe_loop(returns):
+    # Welford mean/variance over non-NaN values, ddof=1
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(len(returns)):
+        r = returns[i]
+        if r == r:
+            count += 1
+            delta = r - mean
+            mean += delta / count
+            m2 += delta * (r - mean)
+    if count < 2:
+        return 0.0
+    std = np.sqrt(m2 / (count - 1))
+    return mean / std if std > 0 else 0.0
+
+
+def cumulative_returns(returns, out=None) -> np.ndarray:
+    """Growth of 1 unit, ``(1 + returns).cumprod()``."""
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(returns)
+    if HAVE_NUMBA:
+        return _cumulative_loop(returns, out)
+    np.cumprod(1.0 + np.nan_to_num(returns), out=out)
+    out[np.isnan(returns)] = np.nan
+    return out
+
+
+def drawdown(equity, out=None) -> np.ndarray:
+    """Fractional drawdown from the running peak (0 at new highs, negative below)."""
+    equity = np.ascontiguousarray(equity, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(equity)
+    if HAVE_NUMBA:
+        return _drawdown_loop(equity, out)
+    peak = np.fmax.accumulate(equity)
+    np.divide(equity - peak, peak, out=out)
+    return out
+
+
+def sharpe(returns, periods_per_year: float | None = None) -> float:
+    """Mean over standard deviation (ddof=1), annualized by sqrt(periods_per_year)."""
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    if HAVE_NUMBA:
+        ratio = _sharpe_loop(returns)
+    else:
+        valid = returns[~np.isnan(returns)]
+        std = valid.std(ddof=1) if len(valid) > 1 else 0.0
+        ratio = valid.mean() / std if std > 0 else 0.0
+    if periods_per_year:
+        ratio *= periods_per_year ** 0.5
+    return float(ratio)
@@ -8,4 +8,9 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 class Logger(Observer):
     def update(self, event, data):
         if event == "signal_generated":
-            logging.info(f"Signal generated by {data['strategy']}: {data['data'].tail(1)}")
\ No newline at end of file
+            signal = data["data"]
+            # Lazy %-formatting: nothing is rendered unless INFO is enabled
+            logging.info(
+                "Signal generated by %s: %s", data["strategy"],
+                signal.iloc[-1] if len(signal) else None,
+            )
\ No newline at end of file
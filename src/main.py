@@ -1,19 +1,118 @@
 """
 SigmaBot - Main entry point
-Launches Streamlit GUI
+
+    sigmabott [gui]          launch the Streamlit GUI (default)
+    sigmabott backtest ...   run backtests headless, one JSON line per result
+
+Only the standard library and the event module are imported here; the engine,
+pandas and Streamlit are imported by the command that needs them, so pages
+importing EVENT_QUEUE and the CLI both start quickly.
 """
+import argparse
+import atexit
+import os
 import sys
-import subprocess
-import queue
+from pathlib import Path
+
+from src.event_manager import EventQueue
 
 # Create a global event queue (can be used by Streamlit pages)
-EVENT_QUEUE = queue.Queue()
+EVENT_QUEUE = EventQueue(maxsize=10_000, policy="coalesce", observer_timeout=1.0)
+atexit.register(EVENT_QUEUE.close)
+
+HOME_PAGE = Path(__file__).with_name("Home.py")
+COMMANDS = ("gui", "backtest")
+
+
+def run_gui(args) -> int:
+    """Launch the Streamlit GUI in this process."""
+    from streamlit.web import cli as streamlit_cli
+
+    sys.argv = ["streamlit", "run", str(HOME_PAGE), *args.streamlit_args]
+    return streamlit_cli.main()
+
+
+def run_backtest(args) -> int:
+    """
+    Run the configs in ``--config`` (or one config from the flags) and
+    stream a JSON line or Parquet row per result. Exits non-zero if any
+    config failed.
+    """
+    from src.batch_runner import load_configs, make_config, open_writer, run_batch
+
+    if args.config:
+        configs = load_configs(args.config)
+    else:
+        configs = [make_config({
+            "symbol": args.symbol,
+            "period": args.period,
+            "interval": args.interval,
+            "ema_window": args.ema_window,
+            "rsi_window": args.rsi_window,
+            "rsi_oversold": args.rsi_oversold,
+            "rsi_overbought": args.rsi_overbought,
+        })]
+
+    writer = open_writer(args.output, args.format)
+    try:
+        written, failed = run_batch(configs, writer, max_workers=args.workers)
+    finally:
+        writer.close()
+    print(f"{written} backtests, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sigmabott", description=__doc__.split("\n\n")[0].strip())
+    # Read by src.utils.providers.get_default_provider in this process and
+    # in Streamlit's script runs
+    parser.add_argument("--provider", default=None,
+                        help='market data source: "yahoo" (default), "synthetic[:seed]" or "local:DIR"')
+    commands = parser.add_subparsers(dest="command")
+
+    gui = commands.add_parser("gui", help="launch the Streamlit GUI (default)")
+    gui.add_argument("streamlit_args", nargs=argparse.REMAINDER, help="passed on to streamlit run")
+    gui.set_defaults(handler=run_gui)
+
+    backtest = commands.add_parser("backtest", help="run backtests without the GUI")
+    backtest.add_argument("--config", help="TOML, JSON or CSV file with one backtest per entry")
+    backtest.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    backtest.add_argument("--output", default="-", help="result file, or - for stdout")
+    backtest.add_argument("--format", choices=("jsonl", "parquet"), default=None,
+                          help="output format (default: from the --output suffix, else jsonl)")
+    # Single backtest when no --config is given
+    backtest.add_argument("--symbol", default="BTC-USD")
+    backtest.add_argument("--period", default="6mo")
+    backtest.add_argument("--interval", default="1h")
+    backtest.add_argument("--ema-window", type=int, default=20, help="0 disables EMA")
+    backtest.add_argument("--rsi-window", type=int, default=14, help="0 disables RSI")
+    backtest.add_argument("--rsi-oversold", type=int, default=30)
+    backtest.add_argument("--rsi-overbought", type=int, default=70)
+    backtest.set_defaults(handler=run_backtest)
+    return parser
+
 
+def main(argv=None) -> int:
+    """Dispatch to the GUI or a headless command."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Global options come before the command
+    position = 0
+    while position < len(argv) and argv[position].startswith("--provider"):
+        position += 1 if "=" in argv[position] else 2
+    if position >= len(argv) or argv[position] not in (*COMMANDS, "-h", "--help"):
+        argv.insert(position, "gui")
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.provider:
+        from src.utils.providers import provider_from_spec
 
-def main():
-    """Launch Streamlit GUI."""
-    subprocess.run([sys.executable, "-m", "streamlit", "run", "src/Home.py"])
+        try:
+            provider_from_spec(args.provider)
+        except ValueError as e:
+            parser.error(str(e))
+        os.environ["SIGMABOTT_PROVIDER"] = args.provider
+    return args.handler(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
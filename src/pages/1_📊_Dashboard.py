@@ -3,12 +3,18 @@ Dashboard - Sanntidsovervåking av marked
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime
-from src.utils.yahoo_finance import download_yf, get_symbol_data
+from src.utils.providers import get_default_provider
+from src.utils.shared_cache import get_shared_cache
+from src.utils.yahoo_finance import CACHE_MAX_AGE_S, download_since, get_symbol_data, fetch_many
 from src.signals.strategies import SMAStrategy
+from src.signals.indicator_cache import get_indicator_cache
+from src.signals.live import LiveBars
+from src.utils.downsample import lttb, max_points, ohlc
 from src.main import EVENT_QUEUE
 from src.event_manager import EventManager
 
@@ -44,16 +50,21 @@ st.sidebar.header("⚙️ Dashboardinnstillinger")
 
 # Initialize shared EventManager in session state
 if "event_manager" not in st.session_state:
-    st.session_state.event_manager = EventManager()
+    st.session_state.event_manager = EventManager(queue=EVENT_QUEUE)
 
 # Main content
 st.markdown("### Markedsoversikt")
 
-osebx = get_symbol_data("OSEBX.OL", "200d", "1d")
+try:
+    osebx = get_symbol_data("OSEBX.OL", "200d", "1d", shared_cache=get_shared_cache())
+except Exception as e:
+    osebx = None
+    st.warning(f"Kunne ikke laste OSEBX: {e}")
 
-# Use the shared EventManager from session state
-osebx_sma = SMAStrategy(200, st.session_state.event_manager).generate_signals(osebx["data"])
-signal(True)  # Eksempelbruk
+if osebx is not None:
+    # Use the shared EventManager from session state
+    osebx_sma = SMAStrategy(200, st.session_state.event_manager).generate_signals(osebx["data"])
+    signal(True)  # Eksempelbruk
 
 
 # Example of sending an event to the EventManager
@@ -92,14 +103,35 @@ period = st.sidebar.selectbox(
 
 # Refresh button
 if st.sidebar.button("🔄 Oppdater data", type="primary"):
-    st.cache_data.clear()
+    for symbol in symbols:
+        get_shared_cache().invalidate(symbol)
+    # Neste innlasting henter nye barer selv om bar-lageret er ferskt
+    st.session_state.refresh_data = True
+    st.session_state.pop("live_bars", None)
     st.rerun()
 
+# Live mode
+st.sidebar.subheader("🔴 Live")
+live_mode = st.sidebar.toggle("Live-modus", value=False)
+live_refresh_s = st.sidebar.number_input(
+    "Oppdater hvert (sekunder)", min_value=5, max_value=600, value=30, step=5, disabled=not live_mode
+)
+live_window = st.sidebar.number_input(
+    "Barer i live-grafen", min_value=50, max_value=2000, value=300, step=50, disabled=not live_mode
+)
+
 st.sidebar.markdown("---")
 st.sidebar.caption("Data oppdateres ved hver oppdatering")
+st.sidebar.caption(f"Datakilde: {get_default_provider().key}")
 
 
 
+# Hent hele overvåkningslisten samtidig, én gang for både metrics og faner
+watchlist_data, watchlist_errors = fetch_many(
+    symbols, period, interval, shared_cache=get_shared_cache(),
+    max_age_s=0 if st.session_state.pop("refresh_data", False) else CACHE_MAX_AGE_S,
+)
+
 # Create columns for metrics
 metric_cols = st.columns(len(symbols))
 
@@ -107,7 +139,7 @@ metric_cols = st.columns(len(symbols))
 # Display metrics for each symbol
 for idx, symbol in enumerate(symbols):
     with metric_cols[idx]:
-        symbol_data = get_symbol_data(symbol, period, interval)
+        symbol_data = watchlist_data.get(symbol)
         if symbol_data:
             st.metric(
                 symbol,
@@ -116,112 +148,162 @@ for idx, symbol in enumerate(symbols):
                 delta_color="normal"
             )
         else:
-            st.metric(symbol, "N/A", "Error")
+            st.metric(symbol, "N/A", "Error", help=watchlist_errors.get(symbol))
 
 st.markdown("---")
 
 # Detailed view
 st.markdown("### Detaljerte grafer")
 
-# Tabs for each symbol
-tabs = st.tabs(symbols)
+def price_figure(symbol: str, data: pd.DataFrame, sma_200: pd.Series, uirevision=None) -> go.Figure:
+    """Candlestick, volum og SMA 200 for ett symbol, nedsamplet til grafbredden."""
+    points = max_points()
+    trigger = lttb((data['Close'] > sma_200).astype(int) * data['Close'], points)
+    sma_200 = lttb(sma_200, points)
+    close = lttb(data['Close'], points)
+    data = ohlc(data, max_points(points_per_px=0.5))
+
+    fig = make_subplots(
+        rows=3, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        subplot_titles=(f'{symbol} Pris', 'Volum', "Pris og SMA 200"),
+        row_heights=[0.7, 0.3, 1]
+    )
 
-for idx, symbol in enumerate(symbols):
-    with tabs[idx]:
-        symbol_data = get_symbol_data(symbol, period, interval)
-
-        if symbol_data and symbol_data["data"] is not None:
-            data = symbol_data["data"]
-
-            # Create price chart
-            fig = make_subplots(
-                rows=3, cols=1,
-                shared_xaxes=True,
-                vertical_spacing=0.03,
-                subplot_titles=(f'{symbol} Pris', 'Volum', "Pris og SMA 200"),
-                row_heights=[0.7, 0.3, 1]
-            )
+    # Candlestick chart
+    fig.add_trace(
+        go.Candlestick(
+            x=data.index,
+            open=data['Open'],
+            high=data['High'],
+            low=data['Low'],
+            close=data['Close'],
+            name='Pris'
+        ),
+        row=1, col=1
+    )
 
-            # Candlestick chart
-            fig.add_trace(
-                go.Candlestick(
-                    x=data.index,
-                    open=data['Open'],
-                    high=data['High'],
-                    low=data['Low'],
-                    close=data['Close'],
-                    name='Pris'
-                ),
-                row=1, col=1
-            )
+    # Volume chart
+    colors = np.where(data['Close'].to_numpy() < data['Open'].to_numpy(), 'red', 'green')
+
+    fig.add_trace(
+        go.Bar(
+            x=data.index,
+            y=data['Volume'],
+            name='Volum',
+            marker_color=colors
+        ),
+        row=2, col=1
+    )
 
-            # Volume chart
-            colors = ['red' if close < open else 'green'
-                     for close, open in zip(data['Close'], data['Open'])]
-
-            fig.add_trace(
-                go.Bar(
-                    x=data.index,
-                    y=data['Volume'],
-                    name='Volum',
-                    marker_color=colors
-                ),
-                row=2, col=1
-            )
+    # Plot Close price
+    fig.add_trace(go.Scatter(
+        x=close.index,
+        y=close,
+        name="Sluttkurs",
+        line=dict(color='yellow')
+    ), row=3, col=1)
+
+    # Plot 200 SMA
+    fig.add_trace(go.Scatter(
+        x=sma_200.index,
+        y=sma_200,
+        name="SMA 200",
+        line=dict(color='green', dash='dash')
+    ), row=3, col=1)
+
+    # Plot trigger line
+    fig.add_trace(go.Scatter(
+        x=trigger.index,
+        y=trigger,
+        name="Trigger",
+        line=dict(color='red')
+    ), row=3, col=1)
+
+    fig.update_layout(
+        height=1200,
+        showlegend=False,
+        xaxis_rangeslider_visible=False,
+        hovermode='x unified',
+        # Beholder zoom og panorering når grafen tegnes på nytt i live-modus
+        uirevision=uirevision
+    )
 
-            # Calculate 200 SMA
-            data['SMA_200'] = data['Close'].rolling(window=200).mean()
-            data['trigger'] = data['Close'] > data['SMA_200']
-
-            # Plot Close price
-            fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data["Close"],
-                name="Sluttkurs",
-                line=dict(color='yellow')
-            ), row=3, col=1)
-
-            # Plot 200 SMA
-            fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data['SMA_200'],
-                name="SMA 200",
-                line=dict(color='green', dash='dash')
-            ), row=3, col=1)
-
-            # Plot trigger line
-            fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data['trigger'].astype(int) * data['Close'],
-                name="Trigger",
-                line=dict(color='red')
-            ), row=3, col=1)
-
-            fig.update_layout(
-                height=1200,
-                showlegend=False,
-                xaxis_rangeslider_visible=False,
-                hovermode='x unified'
+    fig.update_yaxes(title_text="Pris", row=1, col=1)
+    fig.update_yaxes(title_text="Volum", row=2, col=1)
+    fig.update_yaxes(title_text="Strategi", row=3, col=1)
+    return fig
+
+
+def symbol_stats(data: pd.DataFrame):
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Nåværende pris", f"${data['Close'].iloc[-1]:.2f}")
+    with col2:
+        st.metric("Periode høy", f"${data['High'].max():.2f}")
+    with col3:
+        st.metric("Periode lav", f"${data['Low'].min():.2f}")
+    with col4:
+        st.metric("Datapunkter", len(data))
+
+
+def live_charts():
+    """
+    Henter bare nye barer for hvert symbol, legger dem til i sesjonens
+    LiveBars og oppdaterer SMA 200 inkrementelt. Kun dette fragmentet kjøres
+    på nytt ved hvert tick, ikke hele siden, og bare de siste live_window
+    barene tegnes.
+    """
+    states = st.session_state.setdefault("live_bars", {})
+    tabs = st.tabs(symbols)
+    for idx, symbol in enumerate(symbols):
+        with tabs[idx]:
+            key = (symbol, period, interval)
+            state = states.get(key)
+            if state is None:
+                symbol_data = watchlist_data.get(symbol)
+                if not symbol_data:
+                    st.error(f"Kunne ikke laste data for {symbol}: {watchlist_errors.get(symbol, 'ukjent feil')}")
+                    continue
+                state = states[key] = LiveBars(symbol_data["data"], sma_window=200)
+            else:
+                try:
+                    state.update(download_since(symbol, interval, state.last_ts, max_age_s=live_refresh_s))
+                except Exception as e:
+                    st.warning(f"Live-oppdatering feilet for {symbol}: {e}")
+
+            data = state.data.iloc[-live_window:]
+            st.plotly_chart(
+                price_figure(symbol, data, state.sma.iloc[-live_window:], uirevision=symbol),
+                use_container_width=True,
+                key=f"live_{symbol}"
             )
+            symbol_stats(state.data)
+            st.caption(f"Siste bar: {state.last_ts} · oppdatert {datetime.now().strftime('%H:%M:%S')}")
 
-            fig.update_yaxes(title_text="Pris", row=1, col=1)
-            fig.update_yaxes(title_text="Volum", row=2, col=1)
-            fig.update_yaxes(title_text="Strategi", row=3, col=1)
-
-            st.plotly_chart(fig, use_container_width=True)
-
-            # Stats
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Nåværende pris", f"${symbol_data['price']:.2f}")
-            with col2:
-                st.metric("Periode høy", f"${symbol_data['high']:.2f}")
-            with col3:
-                st.metric("Periode lav", f"${symbol_data['low']:.2f}")
-            with col4:
-                st.metric("Datapunkter", len(data))
-        else:
-            st.error(f"Kunne ikke laste data for {symbol}")
+
+if live_mode:
+    st.fragment(run_every=live_refresh_s)(live_charts)()
+else:
+    # Tabs for each symbol
+    tabs = st.tabs(symbols)
+
+    for idx, symbol in enumerate(symbols):
+        with tabs[idx]:
+            symbol_data = watchlist_data.get(symbol)
+
+            if symbol_data and symbol_data["data"] is not None:
+                data = symbol_data["data"]
+
+                # Calculate 200 SMA (data er delt mellom sesjoner og endres ikke)
+                sma_200 = get_indicator_cache().sma(data['Close'], 200)
+                st.plotly_chart(price_figure(symbol, data, sma_200), use_container_width=True)
+
+                # Stats
+                symbol_stats(data)
+            else:
+                st.error(f"Kunne ikke laste data for {symbol}: {watchlist_errors.get(symbol, 'ukjent feil')}")
 
 
 st.markdown("---")
@@ -4,15 +4,21 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from src.backtest_engine import BacktestEngine, BacktestConfig
 from src.event_manager import EventManager
+from src.main import EVENT_QUEUE
+from src.utils.downsample import decimate, lttb, max_points
 
 st.set_page_config(page_title="SigmaBot Backtesting", page_icon="🔬", layout="wide")
 
 # Initialize shared EventManager in session state
 if "event_manager" not in st.session_state:
-    st.session_state.event_manager = EventManager()
+    st.session_state.event_manager = EventManager(queue=EVENT_QUEUE)
 
 st.title("🔬 SigmaBot - Strategibacktesting")
 
+# Punkter per linje og per markørsett som sendes til nettleseren
+CHART_POINTS = max_points()
+MARKER_POINTS = max_points(points_per_px=0.25)
+
 # Sidebar for configuration
 st.sidebar.header("⚙️ Konfigurasjon")
 
@@ -49,6 +55,21 @@ if use_rsi:
 else:
     rsi_window, rsi_oversold, rsi_overbought = 14, 30, 70
 
+st.sidebar.markdown("---")
+st.sidebar.header("💱 Handel")
+
+engine_mode = st.sidebar.selectbox(
+    "Backtestmotor",
+    options=["vectorized", "event"],
+    format_func=lambda m: {"vectorized": "Vektorisert (raskest)", "event": "Hendelsesdrevet (ordre og kostnader)"}[m],
+)
+if engine_mode == "event":
+    position_size = st.sidebar.slider("Posisjonsstørrelse (andel av egenkapital)", 0.1, 1.0, 1.0, 0.05)
+    commission_pct = st.sidebar.number_input("Kurtasje (%)", 0.0, 1.0, 0.1, 0.01)
+    slippage_bps = st.sidebar.number_input("Slippage (bps)", 0.0, 100.0, 5.0, 0.5)
+else:
+    position_size, commission_pct, slippage_bps = 1.0, 0.0, 0.0
+
 st.sidebar.markdown("---")
 
 # Run backtest button
@@ -65,7 +86,11 @@ if st.sidebar.button("🚀 Kjør Backtest", type="primary"):
                 use_rsi=use_rsi,
                 rsi_window=rsi_window,
                 rsi_oversold=rsi_oversold,
-                rsi_overbought=rsi_overbought
+                rsi_overbought=rsi_overbought,
+                engine=engine_mode,
+                position_size=position_size,
+                commission=commission_pct / 100,
+                slippage_bps=slippage_bps
             )
             
             # Run backtest
@@ -86,6 +111,74 @@ if st.sidebar.button("🚀 Kjør Backtest", type="primary"):
             st.error(f"Feil ved kjøring av backtest: {str(e)}")
             st.stop()
 
+# Parameter sweep
+with st.sidebar.expander("🧪 Parametersøk"):
+    sweep_ema = st.slider("EMA-vinduer", 5, 200, (10, 50), disabled=not use_ema)
+    sweep_ema_step = st.number_input("EMA-steg", 1, 50, 5, disabled=not use_ema)
+    sweep_rsi = st.slider("RSI-vinduer", 5, 30, (7, 21), disabled=not use_rsi)
+    sweep_oversold = st.slider("RSI Oversolgt-område", 10, 40, (20, 35), disabled=not use_rsi)
+    sweep_overbought = st.slider("RSI Overkjøpt-område", 60, 90, (65, 80), disabled=not use_rsi)
+    sweep_level_step = st.number_input("RSI-nivåsteg", 1, 10, 5, disabled=not use_rsi)
+    run_sweep = st.button("Kjør parametersøk")
+    st.markdown("**Walk-forward**")
+    wf_train = st.number_input("Treningsperioder", 20, 10_000, 250, step=10)
+    wf_test = st.number_input("Testperioder", 5, 5_000, 50, step=5)
+    run_wf = st.button("Kjør walk-forward")
+
+if run_sweep or run_wf:
+    with st.spinner(f"Kjører parametersøk for {symbol}..."):
+        try:
+            config = BacktestConfig(
+                symbol=symbol,
+                period=period,
+                interval=interval,
+                use_ema=use_ema,
+                ema_window=ema_window,
+                use_rsi=use_rsi,
+                rsi_window=rsi_window,
+                rsi_oversold=rsi_oversold,
+                rsi_overbought=rsi_overbought
+            )
+            grid = dict(
+                ema_windows=range(sweep_ema[0], sweep_ema[1] + 1, sweep_ema_step),
+                rsi_windows=range(sweep_rsi[0], sweep_rsi[1] + 1),
+                rsi_oversold=range(sweep_oversold[0], sweep_oversold[1] + 1, sweep_level_step),
+                rsi_overbought=range(sweep_overbought[0], sweep_overbought[1] + 1, sweep_level_step),
+            )
+            if run_sweep:
+                st.session_state.sweep = BacktestEngine().run_sweep(config, **grid)
+            else:
+                st.session_state.walk_forward = BacktestEngine().run_walk_forward(
+                    config, train_bars=int(wf_train), test_bars=int(wf_test), **grid
+                )
+        except ValueError as e:
+            st.error(f"Konfigurasjonsfeil: {str(e)}")
+            st.stop()
+        except Exception as e:
+            st.error(f"Feil ved parametersøk: {str(e)}")
+            st.stop()
+
+if hasattr(st.session_state, 'sweep'):
+    st.subheader(f"Parametersøk – {len(st.session_state.sweep)} kombinasjoner")
+    st.dataframe(st.session_state.sweep.head(50), use_container_width=True)
+    st.markdown("---")
+
+if hasattr(st.session_state, 'walk_forward'):
+    wf = st.session_state.walk_forward
+    st.subheader(f"Walk-forward – {len(wf.folds)} perioder")
+    wf1, wf2, wf3 = st.columns(3)
+    wf1.metric("Avkastning utenfor utvalg", f"{wf.total_return:.2f}%")
+    wf2.metric("Maksimal drawdown", f"{wf.max_drawdown:.2f}%")
+    wf3.metric("Sharpe Ratio", f"{wf.sharpe_ratio:.2f}")
+    wf_equity = lttb(wf.equity, CHART_POINTS)
+    fig_wf = go.Figure(go.Scatter(
+        x=wf_equity.index, y=wf_equity, name="Utenfor utvalg", line=dict(color='green')
+    ))
+    fig_wf.update_layout(yaxis_title="Kumulativ avkastning", hovermode='x unified', height=300)
+    st.plotly_chart(fig_wf, use_container_width=True)
+    st.dataframe(wf.folds, use_container_width=True)
+    st.markdown("---")
+
 # Display results if available
 if hasattr(st.session_state, 'result'):
     result = st.session_state.result
@@ -114,16 +207,18 @@ if hasattr(st.session_state, 'result'):
         # Create plotly figure for cumulative returns
         fig = go.Figure()
         
+        cum_strategy = lttb(data["cum_strategy"], CHART_POINTS)
         fig.add_trace(go.Scatter(
-            x=data.index,
-            y=data["cum_strategy"],
+            x=cum_strategy.index,
+            y=cum_strategy,
             name="Strategi",
             line=dict(color='green', width=2)
         ))
         
+        cum_return = lttb(data["cum_return"], CHART_POINTS)
         fig.add_trace(go.Scatter(
-            x=data.index,
-            y=data["cum_return"],
+            x=cum_return.index,
+            y=cum_return,
             name="Kjøp & hold",
             line=dict(color='blue', width=2, dash='dash')
         ))
@@ -140,11 +235,11 @@ if hasattr(st.session_state, 'result'):
         # Drawdown chart
         st.subheader("Strategi drawdown")
         cummax = data["cum_strategy"].cummax()
-        drawdown = (data["cum_strategy"] - cummax) / cummax * 100
+        drawdown = lttb((data["cum_strategy"] - cummax) / cummax * 100, CHART_POINTS)
         
         fig_dd = go.Figure()
         fig_dd.add_trace(go.Scatter(
-            x=data.index,
+            x=drawdown.index,
             y=drawdown,
             fill='tozeroy',
             name="Drawdown",
@@ -173,15 +268,16 @@ if hasattr(st.session_state, 'result'):
         )
         
         # Price and signals
+        close = lttb(data["Close"], CHART_POINTS)
         fig.add_trace(go.Scatter(
-            x=data.index,
-            y=data["Close"],
+            x=close.index,
+            y=close,
             name="Sluttkurs",
             line=dict(color='black')
         ), row=1, col=1)
         
         # Buy signals
-        buy_signals = data[data["signal"] == 1]
+        buy_signals = decimate(data[data["signal"] > 0], MARKER_POINTS)
         fig.add_trace(go.Scatter(
             x=buy_signals.index,
             y=buy_signals["Close"],
@@ -191,7 +287,7 @@ if hasattr(st.session_state, 'result'):
         ), row=1, col=1)
         
         # Sell signals
-        sell_signals = data[data["signal"] == -1]
+        sell_signals = decimate(data[data["signal"] < 0], MARKER_POINTS)
         fig.add_trace(go.Scatter(
             x=sell_signals.index,
             y=sell_signals["Close"],
@@ -202,25 +298,27 @@ if hasattr(st.session_state, 'result'):
         
         # EMA if available
         if use_ema and f"EMA{ema_window}" in data.columns:
+            ema = lttb(data[f"EMA{ema_window}"], CHART_POINTS)
             fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data[f"EMA{ema_window}"],
+                x=ema.index,
+                y=ema,
                 name=f"EMA{ema_window}",
                 line=dict(color='orange', dash='dash')
             ), row=2, col=1)
             
             fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data["Close"],
+                x=close.index,
+                y=close,
                 name="Sluttkurs",
                 line=dict(color='black')
             ), row=2, col=1)
         
         # RSI if available
         if use_rsi and "RSI" in data.columns:
+            rsi = lttb(data["RSI"], CHART_POINTS)
             fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data["RSI"],
+                x=rsi.index,
+                y=rsi,
                 name="RSI",
                 line=dict(color='purple')
             ), row=3, col=1)
@@ -246,6 +344,10 @@ if hasattr(st.session_state, 'result'):
             use_container_width=True
         )
         
+        if result.fills is not None:
+            st.subheader(f"Handler ({len(result.fills)})")
+            st.dataframe(result.fills.tail(100), use_container_width=True)
+        
         # Download button
         csv = data.to_csv()
         st.download_button(
@@ -8,12 +8,21 @@ import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime
 from itertools import combinations
-from src.utils.yahoo_finance import get_symbol_data
+from src.utils.providers import get_default_provider
+from src.utils.shared_cache import get_shared_cache
+from src.utils.yahoo_finance import CACHE_MAX_AGE_S, fetch_many
+from src.backtest_engine import BacktestEngine, PortfolioConfig
+from src.signals.correlation import get_correlation_engine
+from src.utils.downsample import decimate, lttb, max_points
 
 st.set_page_config(page_title="Sammenligning - SigmaBott", page_icon="📈", layout="wide")
 
 st.markdown("### Aksjesammenligning og korrelasjon")
 
+# Punkter per linje og i spredningsplottet som sendes til nettleseren
+CHART_POINTS = max_points()
+SCATTER_POINTS = max_points(points_per_px=1)
+
 # ── Sidebar ──────────────────────────────────────────────────────────────────
 st.sidebar.header("⚙️ Sammenligningsinnstillinger")
 
@@ -46,11 +55,15 @@ rolling_window = st.sidebar.slider(
 )
 
 if st.sidebar.button("🔄 Oppdater data", type="primary"):
-    st.cache_data.clear()
+    for symbol in symbols:
+        get_shared_cache().invalidate(symbol)
+    # Neste innlasting henter nye barer selv om bar-lageret er ferskt
+    st.session_state.refresh_data = True
     st.rerun()
 
 st.sidebar.markdown("---")
 st.sidebar.caption("Data oppdateres ved hver oppdatering")
+st.sidebar.caption(f"Datakilde: {get_default_provider().key}")
 
 # ── Validation ────────────────────────────────────────────────────────────────
 if len(symbols) < 2:
@@ -58,15 +71,11 @@ if len(symbols) < 2:
     st.stop()
 
 # ── Load data ─────────────────────────────────────────────────────────────────
-raw: dict = {}
-errors: list = []
-
-for sym in symbols:
-    d = get_symbol_data(sym, period, interval)
-    if d and d["data"] is not None:
-        raw[sym] = d
-    else:
-        errors.append(sym)
+raw, failed = fetch_many(
+    symbols, period, interval, shared_cache=get_shared_cache(),
+    max_age_s=0 if st.session_state.pop("refresh_data", False) else CACHE_MAX_AGE_S,
+)
+errors = [sym for sym in dict.fromkeys(symbols) if sym in failed]
 
 if errors:
     st.warning(f"Kunne ikke laste data for: {', '.join(errors)}. De er utelatt.")
@@ -87,6 +96,10 @@ if combined.empty:
 
 returns = combined.pct_change().dropna()
 
+# Delt mellom sesjoner; bare nye barer legges til løpende summer
+correlation = get_correlation_engine(valid_symbols, interval, period, rolling_window)
+correlation.update(returns)
+
 # ── Metrics row ───────────────────────────────────────────────────────────────
 metric_cols = st.columns(len(valid_symbols))
 for idx, sym in enumerate(valid_symbols):
@@ -111,9 +124,9 @@ COLORS = [
 fig_price = go.Figure()
 for i, sym in enumerate(valid_symbols):
     col = COLORS[i % len(COLORS)]
-    norm = combined[sym] / combined[sym].iloc[0] * 100
+    norm = lttb(combined[sym] / combined[sym].iloc[0] * 100, CHART_POINTS)
     fig_price.add_trace(go.Scatter(
-        x=combined.index, y=norm,
+        x=norm.index, y=norm,
         name=sym,
         line=dict(color=col),
     ))
@@ -126,21 +139,32 @@ fig_price.update_layout(
 st.plotly_chart(fig_price, use_container_width=True)
 
 # ── Plot 2: Korrelasjonsmatrise (heatmap) ─────────────────────────────────────
-st.markdown("#### Korrelasjonsmatrise (hele perioden)")
+matrix_view = st.radio(
+    "Korrelasjonsmatrise",
+    options=["Hele perioden", f"Siste {rolling_window} perioder"],
+    horizontal=True,
+    label_visibility="collapsed",
+)
+st.markdown(f"#### Korrelasjonsmatrise ({matrix_view.lower()})")
 
-corr_matrix = returns.corr()
+if matrix_view == "Hele perioden":
+    corr_matrix = correlation.correlation()
+else:
+    corr_matrix = correlation.rolling_correlation()
 z = corr_matrix.values
 labels = corr_matrix.columns.tolist()
 
+# Tallene i cellene blir uleselige (og tunge) for store univers
 annotations = []
-for i, row in enumerate(labels):
-    for j, col in enumerate(labels):
-        annotations.append(dict(
-            x=col, y=row,
-            text=f"{z[i][j]:.2f}",
-            showarrow=False,
-            font=dict(color="white" if abs(z[i][j]) > 0.5 else "black", size=13),
-        ))
+if len(labels) <= 15:
+    for i, row in enumerate(labels):
+        for j, col in enumerate(labels):
+            annotations.append(dict(
+                x=col, y=row,
+                text=f"{z[i][j]:.2f}",
+                showarrow=False,
+                font=dict(color="white" if abs(z[i][j]) > 0.5 else "black", size=13),
+            ))
 
 fig_heat = go.Figure(go.Heatmap(
     z=z,
@@ -151,7 +175,7 @@ fig_heat = go.Figure(go.Heatmap(
     colorbar=dict(title="Korrelasjon"),
 ))
 fig_heat.update_layout(
-    height=max(300, 80 * len(labels)),
+    height=min(max(300, 80 * len(labels)), 1200),
     annotations=annotations,
     xaxis=dict(side="bottom"),
 )
@@ -170,21 +194,24 @@ sym_x, sym_y = [s.strip() for s in selected_pair.split("/")]
 # ── Plot 3: Rullerende korrelasjon ────────────────────────────────────────────
 st.markdown(f"##### Rullerende {rolling_window}-perioders korrelasjon  —  {sym_x} vs {sym_y}")
 
-rolling_corr = returns[sym_x].rolling(rolling_window).corr(returns[sym_y])
-last_rolling = rolling_corr.dropna().iloc[-1] if not rolling_corr.dropna().empty else float("nan")
-pearson = returns[sym_x].corr(returns[sym_y])
+rolling_corr = correlation.pair_history(sym_x, sym_y)
+last_rolling = correlation.rolling_correlation().loc[sym_x, sym_y]
+pearson = correlation.correlation().loc[sym_x, sym_y]
+m, b_coef = correlation.regression(sym_x, sym_y)
 
-c1, c2 = st.columns(2)
+c1, c2, c3 = st.columns(3)
 c1.metric("Pearson-korrelasjon (hele perioden)", f"{pearson:.4f}")
 c2.metric(f"Rullerende korrelasjon ({rolling_window}p, siste)", f"{last_rolling:.4f}")
+c3.metric(f"Beta {sym_y} mot {sym_x} ({rolling_window}p, siste)", f"{correlation.rolling_beta().loc[sym_y, sym_x]:.2f}")
 
 fig_roll = go.Figure()
 fig_roll.add_hline(y=0,  line_dash="dash", line_color="gray",  opacity=0.5)
 fig_roll.add_hline(y=1,  line_dash="dot",  line_color="green", opacity=0.4)
 fig_roll.add_hline(y=-1, line_dash="dot",  line_color="red",   opacity=0.4)
+rolling_plot = lttb(rolling_corr, CHART_POINTS)
 fig_roll.add_trace(go.Scatter(
-    x=rolling_corr.index,
-    y=rolling_corr,
+    x=rolling_plot.index,
+    y=rolling_plot,
     name=f"Korrelasjon ({rolling_window}p)",
     line=dict(color="#A29BFE"),
     fill="tozeroy",
@@ -201,19 +228,19 @@ st.plotly_chart(fig_roll, use_container_width=True)
 st.markdown(f"##### Korrelasjonsspredning – daglig avkastning  —  {sym_x} vs {sym_y}")
 
 x_vals = returns[sym_x].values
-y_vals = returns[sym_y].values
-m, b_coef = np.polyfit(x_vals, y_vals, 1)
 x_line = np.linspace(x_vals.min(), x_vals.max(), 200)
 y_line = m * x_line + b_coef
 
+# Trendlinjen bruker alle punktene, plottet bare et jevnt utvalg
+scatter_points = decimate(returns[[sym_x, sym_y]], SCATTER_POINTS)
 fig_scatter = go.Figure()
 fig_scatter.add_trace(go.Scatter(
-    x=returns[sym_x],
-    y=returns[sym_y],
+    x=scatter_points[sym_x],
+    y=scatter_points[sym_y],
     mode="markers",
     marker=dict(size=5, color="#4C9BE8", opacity=0.6),
     name="Daglig avkastning",
-    text=returns.index.strftime("%Y-%m-%d"),
+    text=scatter_points.index.strftime("%Y-%m-%d"),
     hovertemplate=(
         "%{text}<br>"
         + sym_x + ": %{x:.2%}<br>"
@@ -237,6 +264,65 @@ fig_scatter.update_layout(
 )
 st.plotly_chart(fig_scatter, use_container_width=True)
 
+st.markdown("---")
+
+# ── Porteføljebacktest ────────────────────────────────────────────────────────
+with st.expander("💼 Porteføljebacktest"):
+    p1, p2, p3, p4 = st.columns(4)
+    weighting_labels = {
+        "Lik vekt": "equal",
+        "Invers volatilitet": "inverse_volatility",
+        "Signalvektet": "signal",
+    }
+    weighting = p1.selectbox("Vekting", options=list(weighting_labels))
+    rebalance_every = p2.number_input("Rebalanser hver (perioder)", min_value=1, value=5, step=1)
+    portfolio_ema = p3.number_input("EMA-vindu", min_value=2, value=20, step=1)
+    long_only = p4.checkbox("Kun long", value=True)
+
+    portfolio = BacktestEngine().run_portfolio(
+        PortfolioConfig(
+            symbols=valid_symbols,
+            period=period,
+            interval=interval,
+            use_ema=True,
+            ema_window=int(portfolio_ema),
+            use_rsi=False,
+            rsi_window=14,
+            rsi_oversold=30,
+            rsi_overbought=70,
+            weighting=weighting_labels[weighting],
+            rebalance_every=int(rebalance_every),
+            long_only=long_only,
+        ),
+        prices=combined,
+    )
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Total avkastning", f"{portfolio.total_return:.2f}%")
+    m2.metric("Maks drawdown", f"{portfolio.max_drawdown:.2f}%")
+    m3.metric("Sharpe ratio", f"{portfolio.sharpe_ratio:.2f}")
+
+    fig_portfolio = go.Figure()
+    equity_plot = lttb(portfolio.equity * 100, CHART_POINTS)
+    drawdown_plot = lttb(portfolio.drawdown * 100, CHART_POINTS)
+    fig_portfolio.add_trace(go.Scatter(
+        x=equity_plot.index, y=equity_plot,
+        name="Portefølje", line=dict(color="#55EFC4"),
+    ))
+    fig_portfolio.add_trace(go.Scatter(
+        x=drawdown_plot.index, y=drawdown_plot,
+        name="Drawdown (%)", line=dict(color="#E17055"), yaxis="y2",
+    ))
+    fig_portfolio.update_layout(
+        height=350,
+        yaxis=dict(title="Indeksert verdi (base = 100)"),
+        yaxis2=dict(title="Drawdown (%)", overlaying="y", side="right"),
+        hovermode="x unified",
+        legend=dict(orientation="h", y=1.02, x=0),
+    )
+    st.plotly_chart(fig_portfolio, use_container_width=True)
+    st.dataframe(portfolio.weights.tail(10).style.format("{:.2%}"), use_container_width=True)
+
 st.markdown("---")
 st.caption(f"Sist oppdatert: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 st.caption("**For å avslutte og returnere til terminalen:** Trykk `Ctrl+C` i terminalvinduet")
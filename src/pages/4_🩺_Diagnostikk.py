@@ -0,0 +1,131 @@
+"""
+Diagnostikk - Tidsbruk, I/O og cache-treff for de varme kodestiene
+"""
+
+import time
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from src.instrumentation import get_instrumentation, recent_events
+from src.main import EVENT_QUEUE
+from src.signals.indicator_cache import get_indicator_cache
+from src.utils.providers import get_default_provider
+from src.utils.scheduler import DownloadScheduler
+from src.utils.shared_cache import get_shared_cache
+
+st.set_page_config(page_title="Diagnostikk - SigmaBott", page_icon="🩺", layout="wide")
+
+st.markdown("### Diagnostikk")
+st.caption("Målinger for hele prosessen, på tvers av alle sesjoner.")
+
+instrumentation = get_instrumentation()
+# Begynner å samle siste hendelser første gang siden åpnes
+events = recent_events()
+
+# ── Sidebar ──────────────────────────────────────────────────────────────────
+st.sidebar.header("🩺 Diagnostikk")
+if st.sidebar.button("🔄 Oppdater", type="primary"):
+    st.rerun()
+if st.sidebar.button("🧹 Nullstill målinger"):
+    instrumentation.reset()
+    events.events.clear()
+    st.rerun()
+
+snapshot = instrumentation.snapshot()
+stages = pd.DataFrame.from_dict(snapshot["stages"], orient="index")
+
+# ── Tid per type ──────────────────────────────────────────────────────────────
+st.markdown("#### Tid per type")
+KIND_LABELS = {"network": "Nettverk", "disk": "Disk", "compute": "Beregning", "io": "Inngangspunkter"}
+if stages.empty:
+    st.info("Ingen målinger ennå. Åpne Dashboard, Backtest eller Sammenligning og kom tilbake.")
+else:
+    totals = stages.groupby("kind")["total"].sum()
+    kind_cols = st.columns(len(KIND_LABELS))
+    for col, (kind, label) in zip(kind_cols, KIND_LABELS.items()):
+        col.metric(label, f"{totals.get(kind, 0.0):.3f} s")
+
+    # ── Per steg ──────────────────────────────────────────────────────────────
+    st.markdown("#### Per steg")
+    table = pd.DataFrame({
+        "Type": stages["kind"].map(KIND_LABELS).fillna(stages["kind"]),
+        "Antall": stages["count"],
+        "Snitt (ms)": stages["mean"] * 1000,
+        "p50 (ms)": stages["p50"] * 1000,
+        "p95 (ms)": stages["p95"] * 1000,
+        "p99 (ms)": stages["p99"] * 1000,
+        "Maks (ms)": stages["max"] * 1000,
+        "Totalt (s)": stages["total"],
+        "Lest (MB)": stages["bytes_read"] / 1e6,
+        "Skrevet (MB)": stages["bytes_written"] / 1e6,
+    }).sort_values("Totalt (s)", ascending=False)
+    st.dataframe(table.style.format(precision=2), use_container_width=True)
+
+    KIND_COLORS = {"network": "#4C9BE8", "disk": "#F4A261", "compute": "#55EFC4", "io": "#A29BFE"}
+    fig = go.Figure(go.Bar(
+        x=table.index,
+        y=table["p95 (ms)"],
+        marker_color=[KIND_COLORS.get(kind, "gray") for kind in stages.loc[table.index, "kind"]],
+        text=table["Type"],
+    ))
+    fig.update_layout(height=350, yaxis_title="p95 (ms)", yaxis_type="log")
+    st.plotly_chart(fig, use_container_width=True)
+
+# ── Cacher ────────────────────────────────────────────────────────────────────
+st.markdown("#### Cacher")
+shared = get_shared_cache()
+indicators = get_indicator_cache()
+cache_rows = {
+    name: {"Treff": stats["hits"], "Bom": stats["misses"], "Sammenslått": None}
+    for name, stats in snapshot["caches"].items()
+}
+cache_rows["shared_cache"] = {"Treff": shared.hits, "Bom": shared.misses, "Sammenslått": shared.collapsed}
+cache_rows["indicator_cache"] = {"Treff": indicators.hits, "Bom": indicators.misses, "Sammenslått": None}
+caches = pd.DataFrame.from_dict(cache_rows, orient="index")
+lookups = caches["Treff"] + caches["Bom"]
+caches["Treffrate"] = (caches["Treff"] / lookups.where(lookups > 0)).map(
+    lambda rate: f"{rate:.1%}" if pd.notna(rate) else "–"
+)
+st.dataframe(caches, use_container_width=True)
+
+c1, c2, c3, c4, c5 = st.columns(5)
+c1.metric("Hendelser levert", EVENT_QUEUE.delivered)
+c2.metric("Slått sammen", EVENT_QUEUE.coalesced)
+c3.metric("Forkastet", EVENT_QUEUE.dropped)
+c4.metric("Tidsavbrudd", EVENT_QUEUE.timeouts)
+c5.metric("Hoppet over", EVENT_QUEUE.skipped)
+
+# ── Nedlastinger ──────────────────────────────────────────────────────────────
+provider = get_default_provider()
+if isinstance(provider, DownloadScheduler):
+    st.markdown("#### Nedlastinger")
+    d1, d2 = st.columns(2)
+    d1.metric("Kall mot kilden", provider.batches)
+    d2.metric("Slått sammen", provider.coalesced)
+    downloads = pd.DataFrame.from_dict(provider.stats(), orient="index")
+    if downloads.empty:
+        st.caption("Ingen nedlastinger ennå.")
+    else:
+        now = time.monotonic()
+        st.dataframe(pd.DataFrame({
+            "Forespørsler": downloads["requests"],
+            "Feil": downloads["failures"],
+            "Feil på rad": downloads["consecutive_failures"],
+            "Siste feil": downloads["last_error"],
+            "Siden siste feil (s)": now - pd.to_numeric(downloads["last_failure"]),
+        }).sort_values("Feil", ascending=False), use_container_width=True)
+
+# ── Siste hendelser ───────────────────────────────────────────────────────────
+st.markdown("#### Siste målinger")
+recent = pd.DataFrame(list(events.events)[-50:][::-1])
+if recent.empty:
+    st.caption("Ingen hendelser siden siden ble åpnet.")
+else:
+    recent["time"] = pd.to_datetime(recent["time"], unit="s")
+    st.dataframe(recent, use_container_width=True)
+
+st.markdown("---")
+st.caption(f"Sist oppdatert: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
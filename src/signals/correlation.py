@@ -0,0 +1,233 @@
+"""
+Running-sum correlation engine for a universe of return series.
+
+CorrelationEngine keeps, for all N symbols at once, the sums Σx and the
+cross-product matrix Σxxᵀ over the whole period and over the trailing
+window. New bars are folded in at O(N²) each and bars that fall out of the
+window or the period are subtracted, so refreshing a page with a few new
+bars never rescans the history. Full-period and rolling correlation and
+beta matrices are read straight from the sums.
+
+Engines are cached per (symbols, interval, period, window) with
+``get_correlation_engine`` so every session viewing the same universe
+shares one.
+"""
+import threading
+from collections import OrderedDict
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class _Moments:
+    """Count, sums and cross-product sums of a set of return rows."""
+
+    def __init__(self, n_symbols: int):
+        self.count = 0
+        self.sum = np.zeros(n_symbols)
+        self.cross = np.zeros((n_symbols, n_symbols))
+
+    def add(self, rows: np.ndarray, sign: float = 1.0) -> None:
+        if len(rows):
+            self.count += int(sign) * len(rows)
+            self.sum += sign * rows.sum(axis=0)
+            self.cross += sign * (rows.T @ rows)
+
+    def reset(self, rows: np.ndarray) -> None:
+        self.count = 0
+        self.sum[:] = 0.0
+        self.cross[:] = 0.0
+        self.add(rows)
+
+    def covariance(self) -> np.ndarray:
+        if self.count < 2:
+            return np.full_like(self.cross, np.nan)
+        return (self.cross - np.outer(self.sum, self.sum) / self.count) / (self.count - 1)
+
+    def correlation(self) -> np.ndarray:
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return np.clip(corr, -1.0, 1.0)
+
+    def beta(self) -> np.ndarray:
+        """beta[i, j]: slope of symbol i's returns regressed on symbol j's."""
+        cov = self.covariance()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return cov / np.diag(cov)[None, :]
+
+
+class CorrelationEngine:
+    def __init__(self, symbols: Sequence[str], window: int):
+        self.symbols = list(symbols)
+        self.window = window
+        self.returns = pd.DataFrame(columns=self.symbols, dtype=np.float64)
+        self._full = _Moments(len(self.symbols))
+        self._rolling = _Moments(len(self.symbols))
+        self._since_resum = 0
+        self._lock = threading.Lock()
+
+    def update(self, returns: pd.DataFrame) -> int:
+        """
+        Bring the engine in line with ``returns`` (rows must be complete).
+
+        Rows newer than the last seen bar are added; rows before the first
+        bar of ``returns`` (the period moved on) are dropped from the sums.
+        The last seen bar may still be in progress: if ``returns`` has a
+        different row for it, the old row is swapped out of the sums. If
+        earlier rows differ (e.g. history adjusted for a split or dividend),
+        the sums are rebuilt from ``returns``.
+
+        Returns:
+            Number of bars added (a revised last bar does not count)
+        """
+        returns = returns[self.symbols]
+        if returns.empty:
+            return 0
+        with self._lock:
+            # Drop bars that left the period
+            if len(self.returns):
+                expired = self.returns.index < returns.index[0]
+                if expired.any():
+                    self._full.add(self.returns[expired].to_numpy(dtype=np.float64), sign=-1.0)
+                    self.returns = self.returns[~expired]
+                    # The window may have lost rows too
+                    self._rolling.reset(self.returns.iloc[-self.window:].to_numpy(dtype=np.float64))
+                    self._since_resum = 0
+
+            revised = False
+            if len(self.returns):
+                last = self.returns.index[-1]
+                seen = returns[returns.index <= last]
+                if not self._matches(seen.iloc[:-1], self.returns.iloc[:-1]):
+                    return self._rebuild(returns)
+                new = returns[returns.index >= last]
+                if len(new) and new.index[0] == last:
+                    old_row = self.returns.iloc[-1:].to_numpy(dtype=np.float64)
+                    if np.array_equal(old_row, new.iloc[:1].to_numpy(dtype=np.float64)):
+                        new = new.iloc[1:]
+                    else:
+                        self._revise_last(old_row)
+                        revised = True
+            else:
+                new = returns
+            if new.empty:
+                return 0
+
+            new_rows = new.to_numpy(dtype=np.float64)
+            self._full.add(new_rows)
+            self.returns = pd.concat([self.returns, new]) if len(self.returns) else new.copy()
+
+            # Slide the window: add the new bars, subtract those that left it.
+            # Re-sum from the stored rows once per window to bound drift.
+            self._since_resum += len(new_rows)
+            tail = self.returns.iloc[-self.window:].to_numpy(dtype=np.float64)
+            if self._since_resum >= self.window:
+                self._rolling.reset(tail)
+                self._since_resum = 0
+            else:
+                self._rolling.add(new_rows)
+                if len(self.returns) > self.window:
+                    left = self.returns.iloc[-self.window - len(new_rows):-self.window]
+                    self._rolling.add(left.to_numpy(dtype=np.float64), sign=-1.0)
+            return len(new_rows) - int(revised)
+
+    @staticmethod
+    def _matches(incoming: pd.DataFrame, stored: pd.DataFrame) -> bool:
+        """True if ``incoming`` holds exactly the stored bars with the same values."""
+        return incoming.index.equals(stored.index) and np.array_equal(
+            incoming.to_numpy(dtype=np.float64), stored.to_numpy(dtype=np.float64)
+        )
+
+    def _rebuild(self, returns: pd.DataFrame) -> int:
+        """Recompute every sum from ``returns``; returns the bars after the old last bar."""
+        added = len(returns)
+        if len(self.returns):
+            added = int((returns.index > self.returns.index[-1]).sum())
+        self.returns = returns.copy()
+        rows = self.returns.to_numpy(dtype=np.float64)
+        self._full.reset(rows)
+        self._rolling.reset(rows[-self.window:])
+        self._since_resum = 0
+        return added
+
+    def _revise_last(self, old_row: np.ndarray) -> None:
+        """Take the last stored bar out of the sums so its revision can be added."""
+        self._full.add(old_row, sign=-1.0)
+        self._rolling.add(old_row, sign=-1.0)
+        self.returns = self.returns.iloc[:-1]
+        # Refill the window with the bar that slid out when the old row came in
+        first = len(self.returns) - self.window
+        if first >= 0:
+            self._rolling.add(self.returns.iloc[first:first + 1].to_numpy(dtype=np.float64))
+
+    def correlation(self) -> pd.DataFrame:
+        """Pearson correlation over the whole period."""
+        return self._frame(self._full.correlation())
+
+    def rolling_correlation(self) -> pd.DataFrame:
+        """Pearson correlation over the last ``window`` bars."""
+        return self._frame(self._rolling.correlation())
+
+    def beta(self) -> pd.DataFrame:
+        """Full-period beta; row symbol regressed on column symbol."""
+        return self._frame(self._full.beta())
+
+    def rolling_beta(self) -> pd.DataFrame:
+        """Beta over the last ``window`` bars; row symbol on column symbol."""
+        return self._frame(self._rolling.beta())
+
+    def regression(self, x: str, y: str) -> Tuple[float, float]:
+        """Slope and intercept of y's returns on x's over the whole period."""
+        i, j = self.symbols.index(x), self.symbols.index(y)
+        slope = float(self._full.beta()[j, i])
+        count = max(self._full.count, 1)
+        intercept = (self._full.sum[j] - slope * self._full.sum[i]) / count
+        return slope, float(intercept)
+
+    def pair_history(self, x: str, y: str) -> pd.Series:
+        """Rolling correlation of one pair over the whole period, in O(T)."""
+        a = self.returns[x].to_numpy(dtype=np.float64)
+        b = self.returns[y].to_numpy(dtype=np.float64)
+        w = self.window
+
+        def window_sum(values: np.ndarray) -> np.ndarray:
+            total = np.concatenate([[0.0], np.cumsum(values)])
+            out = np.full(len(values), np.nan)
+            out[w - 1:] = total[w:] - total[:-w]
+            return out
+
+        sa, sb = window_sum(a), window_sum(b)
+        cov = window_sum(a * b) - sa * sb / w
+        var_a = window_sum(a * a) - sa * sa / w
+        var_b = window_sum(b * b) - sb * sb / w
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.sqrt(var_a * var_b)
+        return pd.Series(np.clip(corr, -1.0, 1.0), index=self.returns.index)
+
+    def _frame(self, matrix: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(matrix, index=self.symbols, columns=self.symbols)
+
+
+_engines: "OrderedDict[tuple, CorrelationEngine]" = OrderedDict()
+_engines_lock = threading.Lock()
+MAX_ENGINES = 32
+
+
+def get_correlation_engine(
+    symbols: Sequence[str], interval: str, period: str, window: int
+) -> CorrelationEngine:
+    """Process-wide engine for a universe, least-recently-used beyond MAX_ENGINES."""
+    key = (tuple(symbols), interval, period, window)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = CorrelationEngine(symbols, window)
+            while len(_engines) > MAX_ENGINES:
+                _engines.popitem(last=False)
+        else:
+            _engines.move_to_end(key)
+        return engine
@@ -0,0 +1,171 @@
+"""
+Incremental indicators that update in O(1) per appended bar.
+
+Each indicator matches the corresponding full-history computation used by the
+strategies (``ta`` EMA/RSI and pandas rolling mean, as computed by
+``src.kernels``) including NaN prices, returns NaN until it has seen enough
+bars, and can be snapshotted to a plain dict and restored.
+"""
+import math
+from collections import deque
+
+
+class IncrementalEMA:
+    """
+    EMA with ``span=window, adjust=False`` like ``ta.trend.EMAIndicator``.
+
+    NaN prices are handled as pandas does (``ignore_na=False``): the EMA is
+    carried over, and the weight of the old value keeps decaying across the
+    gap, so the next price counts for more.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2 / (window + 1)
+        self.value = math.nan
+        # Weight of value relative to the next price's alpha
+        self.old_weight = 1.0
+        self.count = 0
+
+    def update(self, price: float) -> float:
+        observed = not math.isnan(price)
+        if observed:
+            self.count += 1
+        if not math.isnan(self.value):
+            self.old_weight *= 1 - self.alpha
+            if observed:
+                if self.value != price:
+                    self.value = (self.old_weight * self.value + self.alpha * price) / (
+                        self.old_weight + self.alpha
+                    )
+                self.old_weight = 1.0
+        elif observed:
+            self.value = price
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.value if self.count >= self.window else math.nan
+
+    def snapshot(self) -> dict:
+        return {
+            "window": self.window,
+            "value": self.value,
+            "old_weight": self.old_weight,
+            "count": self.count,
+        }
+
+    @classmethod
+    def restore(cls, state: dict) -> "IncrementalEMA":
+        indicator = cls(state["window"])
+        indicator.value = state["value"]
+        indicator.old_weight = state["old_weight"]
+        indicator.count = state["count"]
+        return indicator
+
+
+class IncrementalRSI:
+    """
+    Wilder RSI like ``ta.momentum.RSIIndicator``.
+
+    Every bar counts, and a change that is undefined (the first bar, a NaN
+    price or the bar after one) is zero up and down movement.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 1 / window
+        self.prev_close = math.nan
+        self.avg_up = math.nan
+        self.avg_down = math.nan
+        self.count = 0
+
+    def update(self, price: float) -> float:
+        diff = price - self.prev_close
+        # NaN compares false, so an undefined change moves neither way
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        if self.count == 0:
+            self.avg_up, self.avg_down = up, down
+        else:
+            self.avg_up += self.alpha * (up - self.avg_up)
+            self.avg_down += self.alpha * (down - self.avg_down)
+        self.count += 1
+        self.prev_close = price
+        return self.current
+
+    @property
+    def current(self) -> float:
+        if self.count < self.window:
+            return math.nan
+        if self.avg_down == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.avg_up / self.avg_down)
+
+    def snapshot(self) -> dict:
+        return {
+            "window": self.window,
+            "prev_close": self.prev_close,
+            "avg_up": self.avg_up,
+            "avg_down": self.avg_down,
+            "count": self.count,
+        }
+
+    @classmethod
+    def restore(cls, state: dict) -> "IncrementalRSI":
+        indicator = cls(state["window"])
+        indicator.prev_close = state["prev_close"]
+        indicator.avg_up = state["avg_up"]
+        indicator.avg_down = state["avg_down"]
+        indicator.count = state["count"]
+        return indicator
+
+
+class IncrementalSMA:
+    """
+    Simple moving average like ``Series.rolling(window).mean()``: NaN until
+    ``window`` bars are seen and while a NaN price is inside the window.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.missing = 0
+        self._since_resum = 0
+
+    def update(self, price: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if math.isnan(old):
+                self.missing -= 1
+            else:
+                self.total -= old
+        self.values.append(price)
+        if math.isnan(price):
+            self.missing += 1
+        else:
+            self.total += price
+
+        # Re-sum once per window so floating-point drift cannot accumulate
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self.total = math.fsum(value for value in self.values if not math.isnan(value))
+            self._since_resum = 0
+        return self.current
+
+    @property
+    def current(self) -> float:
+        if len(self.values) < self.window or self.missing:
+            return math.nan
+        return self.total / self.window
+
+    def snapshot(self) -> dict:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def restore(cls, state: dict) -> "IncrementalSMA":
+        indicator = cls(state["window"])
+        for value in state["values"]:
+            indicator.update(value)
+        return indicator
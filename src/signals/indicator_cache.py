@@ -0,0 +1,125 @@
+"""
+Memoizing indicator layer shared by strategies and the backtest engine.
+
+Series are keyed by (data fingerprint, indicator, params), so two strategies,
+a parameter sweep and the Dashboard asking for the same EMA on the same prices
+compute it once. Entries are evicted least-recently-used once the cached
+series exceed ``max_bytes``.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src import kernels
+
+
+def fingerprint(series: pd.Series) -> str:
+    """Content hash of a series' values and index."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(series.to_numpy(dtype=np.float64)).data)
+    index = series.index
+    if isinstance(index, pd.RangeIndex):
+        digest.update(f"{index.start}:{index.stop}:{index.step}".encode())
+    elif isinstance(index, pd.DatetimeIndex):
+        digest.update(np.ascontiguousarray(index.asi8).data)
+        digest.update(str(index.tz).encode())
+    else:
+        digest.update(pd.util.hash_pandas_object(index, index=False).to_numpy().data)
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, pd.Series]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        close: pd.Series,
+        indicator: str,
+        compute: Callable[[pd.Series], pd.Series],
+        key: Optional[str] = None,
+        **params,
+    ) -> pd.Series:
+        """
+        Return a cached indicator series, computing it on a miss.
+
+        The returned series is shared between callers and must not be mutated.
+
+        Args:
+            close: Input price series
+            indicator: Indicator name used in the cache key
+            compute: Function computing the series from ``close``
+            key: Precomputed fingerprint of ``close`` (saves rehashing)
+            **params: Indicator parameters, part of the cache key
+        """
+        cache_key = (key or fingerprint(close), indicator, tuple(sorted(params.items())))
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return self._entries[cache_key]
+            self.misses += 1
+
+        series = compute(close)
+        with self._lock:
+            if cache_key not in self._entries:
+                self._entries[cache_key] = series
+                self._bytes += series.memory_usage(index=False, deep=False)
+                self._evict()
+        return series
+
+    def ema(self, close: pd.Series, window: int, key: Optional[str] = None) -> pd.Series:
+        return self.get(
+            close, "ema",
+            lambda c: pd.Series(kernels.ema(c.to_numpy(), window), index=c.index),
+            key=key, window=window,
+        )
+
+    def rsi(self, close: pd.Series, window: int, key: Optional[str] = None) -> pd.Series:
+        return self.get(
+            close, "rsi",
+            lambda c: pd.Series(kernels.rsi(c.to_numpy(), window), index=c.index),
+            key=key, window=window,
+        )
+
+    def sma(self, close: pd.Series, window: int, key: Optional[str] = None) -> pd.Series:
+        return self.get(
+            close, "sma",
+            lambda c: pd.Series(kernels.rolling_mean(c.to_numpy(), window), index=c.index),
+            key=key, window=window,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self) -> None:
+        # Always keep the newest entry, even if it alone exceeds the cap
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, series = self._entries.popitem(last=False)
+            self._bytes -= series.memory_usage(index=False, deep=False)
+
+
+_default_cache = IndicatorCache()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Process-wide cache used when a strategy is not given one."""
+    return _default_cache
@@ -0,0 +1,78 @@
+"""
+Rolling bar window with incrementally maintained indicators for live views.
+
+A LiveBars object holds the most recent bars of one symbol together with an
+IncrementalSMA. New bars are merged in with ``update`` and the SMA advances
+only over the bars that arrived; the last bar is treated as still forming,
+so a revised copy of it replaces the old one and the SMA step is redone from
+a snapshot.
+"""
+import math
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.signals.incremental import IncrementalSMA
+
+
+class LiveBars:
+    def __init__(self, data: pd.DataFrame, sma_window: int = 200, max_bars: int = 2000):
+        self.sma_window = sma_window
+        self.max_bars = max_bars
+        self.data = data.iloc[-max_bars:]
+
+        # Warm the SMA over the full history, then keep the state before the
+        # last bar so a revision of that bar can be replayed
+        indicator = IncrementalSMA(sma_window)
+        close = data["Close"].to_numpy(dtype=np.float64)
+        sma = np.empty(len(close))
+        for i, price in enumerate(close[:-1]):
+            sma[i] = indicator.update(price)
+        self._settled = indicator.snapshot()
+        if len(close):
+            sma[-1] = indicator.update(close[-1])
+        self.sma = pd.Series(sma[-max_bars:], index=self.data.index, name=f"SMA_{sma_window}")
+
+    @property
+    def last_ts(self) -> Optional[pd.Timestamp]:
+        return self.data.index[-1] if len(self.data) else None
+
+    def update(self, bars: pd.DataFrame) -> int:
+        """
+        Merge bars at or after the last known bar.
+
+        Returns:
+            Number of bars appended (a revised last bar does not count)
+        """
+        if self.last_ts is not None:
+            bars = bars[bars.index >= self.last_ts]
+        if bars.empty:
+            return 0
+        bars = bars[~bars.index.duplicated(keep="last")]
+
+        revised = self.last_ts is not None and bars.index[0] == self.last_ts
+        kept = self.data.iloc[:-1] if revised else self.data
+        kept_sma = self.sma.iloc[:-1] if revised else self.sma
+
+        indicator = IncrementalSMA.restore(self._settled)
+        if not revised and len(self.data):
+            # The old last bar is final now; fold it into the settled state
+            indicator.update(float(self.data["Close"].iloc[-1]))
+
+        close = bars["Close"].to_numpy(dtype=np.float64)
+        sma = np.empty(len(close))
+        for i, price in enumerate(close[:-1]):
+            sma[i] = indicator.update(price)
+        self._settled = indicator.snapshot()
+        sma[-1] = indicator.update(close[-1])
+
+        self.data = pd.concat([kept, bars]).iloc[-self.max_bars:]
+        self.sma = pd.concat([
+            kept_sma, pd.Series(sma, index=bars.index, name=self.sma.name)
+        ]).iloc[-self.max_bars:]
+        return len(bars) - int(revised)
+
+    @property
+    def current_sma(self) -> float:
+        return float(self.sma.iloc[-1]) if len(self.sma) else math.nan
@@ -1,9 +1,22 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+import numpy as np
 import pandas as pd
-from ta.trend import EMAIndicator
-from ta.momentum import RSIIndicator
 
 from src.event_manager import EventManager
+from src.instrumentation import timed
+from src.signals.indicator_cache import IndicatorCache, get_indicator_cache
+from src.signals.incremental import IncrementalEMA, IncrementalRSI, IncrementalSMA
+
+
+@dataclass
+class Signals:
+    """
+    Output of a strategy: an int8 signal vector plus the indicator series it used.
+    """
+    signal: pd.Series
+    indicators: Dict[str, pd.Series] = field(default_factory=dict)
 
 
 class Strategy(ABC):
@@ -12,84 +25,225 @@ class Strategy(ABC):
     """
 
     @abstractmethod
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+    def generate_signals(self, data: pd.DataFrame) -> Signals:
         """
         Generate trading signals based on the strategy.
 
+        The input frame is not modified.
+
         Args:
             data (pd.DataFrame): The input data containing price information.
 
         Returns:
-            pd.DataFrame: The data with an additional 'signal' column.
+            Signals: int8 signal (1 buy, -1 sell, 0 flat) and indicator series.
+        """
+        pass
+
+    def on_bar(self, close: float) -> int:
+        """
+        Update the strategy's incremental state with one new bar.
+
+        Args:
+            close (float): Close price of the newly appended bar.
+
+        Returns:
+            int: The signal for this bar only.
         """
+        signal = self._step(close)
+        self.event_manager.notify(
+            "signal_updated", {"strategy": self.name, "signal": signal}, source=self.name
+        )
+        return signal
+
+    def warm_up(self, closes: Iterable[float]) -> None:
+        """Feed historical closes through the incremental state without notifying."""
+        for close in closes:
+            self._step(close)
+
+    @abstractmethod
+    def _step(self, close: float) -> int:
+        """Advance the incremental state by one bar and return its signal."""
+        pass
+
+    @abstractmethod
+    def snapshot(self) -> dict:
+        """Return the incremental state as a plain dict."""
+        pass
+
+    @abstractmethod
+    def restore(self, state: dict) -> None:
+        """Restore incremental state produced by snapshot()."""
         pass
 
 
+def _crossover(close: pd.Series, line: pd.Series) -> pd.Series:
+    """Vectorized _crossover_signal, as an int8 series."""
+    signal = (close > line).to_numpy(np.int8) - (close < line).to_numpy(np.int8)
+    return pd.Series(signal, index=close.index, name="signal")
+
+
+def _crossover_signal(close: float, line: float) -> int:
+    """1 above the line, -1 below it, 0 while the line is undefined."""
+    if close > line:
+        return 1
+    if close < line:
+        return -1
+    return 0
+
+
 class EMAStrategy(Strategy):
-    def __init__(self, ema_window: int, event_manager: EventManager):
+    name = "EMA"
+
+    def __init__(
+        self,
+        ema_window: int,
+        event_manager: EventManager,
+        indicator_cache: Optional[IndicatorCache] = None,
+    ):
         self.ema_window = ema_window
         self.event_manager = event_manager
+        self.indicators = indicator_cache or get_indicator_cache()
+        self._ema = IncrementalEMA(ema_window)
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        data[f"EMA{self.ema_window}"] = EMAIndicator(
-            data["Close"], window=self.ema_window
-        ).ema_indicator()
-        data["signal"] = 0
-        data.loc[data["Close"] > data[f"EMA{self.ema_window}"], "signal"] = 1  # Buy
-        data.loc[data["Close"] < data[f"EMA{self.ema_window}"], "signal"] = -1  # Sell
+    @timed("EMAStrategy.generate_signals")
+    def generate_signals(self, data: pd.DataFrame) -> Signals:
+        ema = self.indicators.ema(data["Close"], self.ema_window)
+        signal = _crossover(data["Close"], ema)  # Buy above, sell below
 
         # Notify observers
-        self.event_manager.notify("signal_generated", {"strategy": "EMA", "data": data})
-        return data
+        self.event_manager.notify(
+            "signal_generated", {"strategy": "EMA", "data": signal}, source=self.name
+        )
+        return Signals(signal=signal, indicators={f"EMA{self.ema_window}": ema})
+
+    def _step(self, close: float) -> int:
+        return _crossover_signal(close, self._ema.update(close))
+
+    def snapshot(self) -> dict:
+        return {"ema": self._ema.snapshot()}
+
+    def restore(self, state: dict) -> None:
+        self._ema = IncrementalEMA.restore(state["ema"])
 
 
 class RSIStrategy(Strategy):
+    name = "RSI"
+
     def __init__(
-        self, rsi_window: int, overbought: int, oversold: int, event_manager: EventManager
+        self,
+        rsi_window: int,
+        overbought: int,
+        oversold: int,
+        event_manager: EventManager,
+        indicator_cache: Optional[IndicatorCache] = None,
     ):
         self.rsi_window = rsi_window
         self.overbought = overbought
         self.oversold = oversold
         self.event_manager = event_manager
-
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        data["RSI"] = RSIIndicator(data["Close"], window=self.rsi_window).rsi()
-        data["signal"] = 0
-        data.loc[data["RSI"] < self.oversold, "signal"] = 1  # Buy
-        data.loc[data["RSI"] > self.overbought, "signal"] = -1  # Sell
+        self.indicators = indicator_cache or get_indicator_cache()
+        self._rsi = IncrementalRSI(rsi_window)
+
+    @timed("RSIStrategy.generate_signals")
+    def generate_signals(self, data: pd.DataFrame) -> Signals:
+        rsi = self.indicators.rsi(data["Close"], self.rsi_window)
+        signal = pd.Series(
+            np.where(
+                rsi > self.overbought, -1,  # Sell
+                np.where(rsi < self.oversold, 1, 0),  # Buy
+            ).astype(np.int8),
+            index=data.index,
+            name="signal",
+        )
 
         # Notify observers
-        self.event_manager.notify("signal_generated", {"strategy": "RSI", "data": data})
-        return data
+        self.event_manager.notify(
+            "signal_generated", {"strategy": "RSI", "data": signal}, source=self.name
+        )
+        return Signals(signal=signal, indicators={"RSI": rsi})
+
+    def _step(self, close: float) -> int:
+        rsi = self._rsi.update(close)
+        if rsi > self.overbought:
+            return -1
+        if rsi < self.oversold:
+            return 1
+        return 0
+
+    def snapshot(self) -> dict:
+        return {"rsi": self._rsi.snapshot()}
+
+    def restore(self, state: dict) -> None:
+        self._rsi = IncrementalRSI.restore(state["rsi"])
 
 
 class SMAStrategy(Strategy):
-    def __init__(self, sma_window: int, event_manager: EventManager):
+    name = "SMA"
+
+    def __init__(
+        self,
+        sma_window: int,
+        event_manager: EventManager,
+        indicator_cache: Optional[IndicatorCache] = None,
+    ):
         self.sma_window = sma_window
         self.event_manager = event_manager
+        self.indicators = indicator_cache or get_indicator_cache()
+        self._sma = IncrementalSMA(sma_window)
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+    @timed("SMAStrategy.generate_signals")
+    def generate_signals(self, data: pd.DataFrame) -> Signals:
         # Calculate the SMA
-        data[f"SMA{self.sma_window}"] = data["Close"].rolling(window=self.sma_window).mean()
-        data["signal"] = 0
+        sma = self.indicators.sma(data["Close"], self.sma_window)
 
-        # Generate signals based on SMA
-        data.loc[data["Close"] > data[f"SMA{self.sma_window}"], "signal"] = 1  # Buy
-        data.loc[data["Close"] < data[f"SMA{self.sma_window}"], "signal"] = -1  # Sell
+        # Generate signals based on SMA: buy above, sell below
+        signal = _crossover(data["Close"], sma)
 
         # Notify observers
-        self.event_manager.notify("signal_generated", {"strategy": "SMA", "data": data})
-        return data
+        self.event_manager.notify(
+            "signal_generated", {"strategy": "SMA", "data": signal}, source=self.name
+        )
+        return Signals(signal=signal, indicators={f"SMA{self.sma_window}": sma})
+
+    def _step(self, close: float) -> int:
+        return _crossover_signal(close, self._sma.update(close))
+
+    def snapshot(self) -> dict:
+        return {"sma": self._sma.snapshot()}
+
+    def restore(self, state: dict) -> None:
+        self._sma = IncrementalSMA.restore(state["sma"])
 
 
 class CombinedStrategy(Strategy):
+    name = "Combined"
+
     def __init__(self, strategies: list[Strategy]):
         self.strategies = strategies
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        data["signal"] = 0
+    @timed("CombinedStrategy.generate_signals")
+    def generate_signals(self, data: pd.DataFrame) -> Signals:
+        combined = np.zeros(len(data), dtype=np.int8)
+        indicators = {}
         for strategy in self.strategies:
-            data = strategy.generate_signals(data)
-            # Combine signals using logical OR (adjust logic as needed)
-            data["signal"] += data.get("signal", 0)
-        return data
\ No newline at end of file
+            signals = strategy.generate_signals(data)
+            # Combine signals by summing each strategy's vote
+            combined += signals.signal.to_numpy()
+            indicators.update(signals.indicators)
+        return Signals(
+            signal=pd.Series(combined, index=data.index, name="signal"),
+            indicators=indicators,
+        )
+
+    def on_bar(self, close: float) -> int:
+        return sum(strategy.on_bar(close) for strategy in self.strategies)
+
+    def _step(self, close: float) -> int:
+        return sum(strategy._step(close) for strategy in self.strategies)
+
+    def snapshot(self) -> dict:
+        return {"strategies": [strategy.snapshot() for strategy in self.strategies]}
+
+    def restore(self, state: dict) -> None:
+        for strategy, sub_state in zip(self.strategies, state["strategies"]):
+            strategy.restore(sub_state)
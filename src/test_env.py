@@ -1,8 +1,13 @@
-import pandas as pd
-import yfinance as yf
-import matplotlib.pyplot as plt
+def main():
+    """Laster ned en måned BTC-USD og plotter sluttkursen (sjekk av miljøet)."""
+    import yfinance as yf
+    import matplotlib.pyplot as plt
 
-data = yf.download("BTC-USD", period="1mo", interval="1h")
-print(data.head())
-data["Close"].plot(title="BTC/USDT - siste måned")
-plt.show()
+    data = yf.download("BTC-USD", period="1mo", interval="1h")
+    print(data.head())
+    data["Close"].plot(title="BTC/USDT - siste måned")
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
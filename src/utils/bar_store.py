@@ -0,0 +1,221 @@
+"""
+Partisjonert, append-only lager for OHLCV-barer.
+
+Layout på disk:
+    <root>/symbol=<symbol>/interval=<interval>/month=<YYYY-MM>/part-<fetched_ns>.parquet
+    <root>/symbol=<symbol>/interval=<interval>/_meta.json
+
+Hver skriving legger til nye filer i månedspartisjonene den berører, eksisterende
+filer skrives aldri om (unntatt ved compact(), som append() kjører når en måned
+har samlet over COMPACT_PARTS filer). Lesing går gjennom pyarrow.dataset slik at
+både månedspartisjoner og row groups utenfor tidsvinduet hoppes over.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.instrumentation import get_instrumentation, timed
+
+TS_COLUMN = "ts"
+FETCHED_COLUMN = "fetched_at"
+META_FILE = "_meta.json"
+# Partfiler i en måned før append() slår dem sammen
+COMPACT_PARTS = 32
+
+# Katalog for symbol/intervall -> lås rundt les-flett-skriv av metadata og compact
+_locks: dict[str, threading.RLock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.RLock:
+    key = os.path.abspath(path)
+    with _locks_guard:
+        return _locks.setdefault(key, threading.RLock())
+
+
+class BarStore:
+    def __init__(self, root: str | Path = "data", row_group_size: int = 8192):
+        self.root = Path(root)
+        self.row_group_size = row_group_size
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / f"symbol={quote(symbol, safe='')}" / f"interval={interval}"
+
+    def meta(self, symbol: str, interval: str) -> dict:
+        """Returnerer metadata for symbol/intervall, eller {} hvis ingenting er lagret."""
+        path = self._dir(symbol, interval) / META_FILE
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text())
+
+    def _lock(self, symbol: str, interval: str) -> threading.RLock:
+        return _lock_for(self._dir(symbol, interval))
+
+    def update_meta(self, symbol: str, interval: str, **meta) -> dict:
+        """
+        Fletter inn nøkler i metadatafilen og skriver den atomisk.
+
+        Låsen gjør at samtidige oppdateringer i prosessen ikke mister
+        hverandres nøkler; den midlertidige filen er unik per skriver.
+        """
+        path = self._dir(symbol, interval) / META_FILE
+        with self._lock(symbol, interval):
+            merged = {**self.meta(symbol, interval), **meta}
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{META_FILE}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+            try:
+                tmp.write_text(json.dumps(merged, default=str))
+                tmp.replace(path)
+            finally:
+                tmp.unlink(missing_ok=True)
+        return merged
+
+    @timed("bar_store.append", kind="disk")
+    def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Legger til barer uten å røre eksisterende filer.
+
+        Overlappende tidsstempler er lov; ved lesing vinner raden som ble
+        skrevet sist (høyest fetched_at).
+
+        Returns:
+            int: antall rader skrevet
+        """
+        if df.empty:
+            return 0
+
+        index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        fetched_at = time.time_ns()
+        utc = index.tz_convert("UTC")
+        table = table.append_column(TS_COLUMN, pa.array(utc))
+        table = table.append_column(
+            FETCHED_COLUMN, pa.array([fetched_at] * len(df), pa.int64())
+        )
+
+        months = utc.strftime("%Y-%m")
+        base = self._dir(symbol, interval)
+        crowded = []
+        for month in months.unique():
+            part = table.filter(pa.array(months == month))
+            outdir = base / f"month={month}"
+            outdir.mkdir(parents=True, exist_ok=True)
+            path = outdir / f"part-{fetched_at}.parquet"
+            pq.write_table(part, path, row_group_size=self.row_group_size)
+            get_instrumentation().add_bytes("bar_store.append", written=path.stat().st_size)
+            if sum(1 for _ in outdir.glob("part-*.parquet")) > COMPACT_PARTS:
+                crowded.append(outdir)
+
+        with self._lock(symbol, interval):
+            last_ts = self.meta(symbol, interval).get("last_ts")
+            new_last = index[-1].isoformat()
+            if last_ts is None or pd.Timestamp(new_last) > pd.Timestamp(last_ts):
+                last_ts = new_last
+            self.update_meta(
+                symbol,
+                interval,
+                last_ts=last_ts,
+                tz=str(df.index.tz) if df.index.tz is not None else None,
+                index_name=df.index.name,
+            )
+        for month_dir in crowded:
+            self._compact_month(symbol, interval, month_dir)
+        return len(df)
+
+    @timed("bar_store.read", kind="disk")
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Leser barer i [start, end] med predikat-pushdown.
+
+        Returns:
+            DataFrame indeksert på tidsstempel (tom hvis ingenting er lagret)
+        """
+        base = self._dir(symbol, interval)
+        if not base.exists():
+            return pd.DataFrame()
+
+        dataset = ds.dataset(base, format="parquet", partitioning="hive")
+        expr = None
+        if start is not None:
+            start = _to_utc(start)
+            expr = (ds.field("month") >= start.strftime("%Y-%m")) & (
+                ds.field(TS_COLUMN) >= pa.scalar(start, pa.timestamp("ns", "UTC"))
+            )
+        if end is not None:
+            end = _to_utc(end)
+            cond = (ds.field("month") <= end.strftime("%Y-%m")) & (
+                ds.field(TS_COLUMN) <= pa.scalar(end, pa.timestamp("ns", "UTC"))
+            )
+            expr = cond if expr is None else expr & cond
+
+        wanted = None
+        if columns is not None:
+            wanted = [*columns, TS_COLUMN, FETCHED_COLUMN]
+        table = dataset.to_table(columns=wanted, filter=expr)
+        get_instrumentation().add_bytes("bar_store.read", read=table.nbytes)
+        if table.num_rows == 0:
+            return pd.DataFrame()
+
+        df = table.to_pandas()
+        df = df.sort_values([TS_COLUMN, FETCHED_COLUMN], kind="stable")
+        df = df.drop_duplicates(TS_COLUMN, keep="last")
+        df = df.drop(columns=[FETCHED_COLUMN, "month"], errors="ignore")
+
+        meta = self.meta(symbol, interval)
+        index = pd.DatetimeIndex(df.pop(TS_COLUMN))
+        if meta.get("tz"):
+            index = index.tz_convert(meta["tz"])
+        df.index = index.rename(meta.get("index_name"))
+        return df
+
+    def compact(self, symbol: str, interval: str) -> None:
+        """Slår sammen partfilene i hver måned til én fil uten duplikater."""
+        base = self._dir(symbol, interval)
+        for month_dir in sorted(base.glob("month=*")):
+            self._compact_month(symbol, interval, month_dir)
+
+    def _compact_month(self, symbol: str, interval: str, month_dir: Path) -> None:
+        with self._lock(symbol, interval):
+            parts = sorted(month_dir.glob("part-*.parquet"))
+            if len(parts) < 2:
+                return
+            df = pq.read_table(parts, partitioning=None).to_pandas()
+            df = df.sort_values([TS_COLUMN, FETCHED_COLUMN], kind="stable")
+            df = df.drop_duplicates(TS_COLUMN, keep="last")
+            out = month_dir / f"part-{df[FETCHED_COLUMN].max()}.parquet"
+            tmp = month_dir / f"_compact.{uuid.uuid4().hex}.tmp"
+            try:
+                pq.write_table(
+                    pa.Table.from_pandas(df, preserve_index=False),
+                    tmp,
+                    row_group_size=self.row_group_size,
+                )
+                # Den sammenslåtte filen må ligge på plass før de gamle fjernes;
+                # dør vi imellom, gir lesingen samme rader via fetched_at
+                tmp.replace(out)
+            finally:
+                tmp.unlink(missing_ok=True)
+            for part in parts:
+                if part != out:
+                    part.unlink(missing_ok=True)
+
+
+def _to_utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
@@ -0,0 +1,119 @@
+"""
+Nedsampling av serier før de sendes til Plotly.
+
+- lttb(): Largest-Triangle-Three-Buckets for linjer; beholder topper og bunner
+  slik at formen på kurven er lik originalen.
+- ohlc(): slår sammen påfølgende barer til større candles (open først, high
+  maks, low min, close sist, volum sum).
+- decimate(): jevn tynning av markører (kjøp/salg, spredningsplott).
+
+Antall punkter styres av max_points(), som regner ut et passende antall fra
+bredden på grafen i piksler.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# Bredden de fleste grafene tegnes med (use_container_width på en bred side)
+DEFAULT_WIDTH_PX = 1600
+# Flere punkter enn ~2 per piksel kan ikke ses uansett
+POINTS_PER_PX = 2
+
+
+def max_points(width_px: int = DEFAULT_WIDTH_PX, points_per_px: float = POINTS_PER_PX) -> int:
+    """Antall punkter en graf med gitt bredde har nytte av."""
+    return max(3, int(width_px * points_per_px))
+
+
+def _x_values(index: pd.Index) -> np.ndarray:
+    """Numerisk x-akse for arealberegningen (tid i ns eller posisjon)."""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype=np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def lttb_indices(y, n_out: int, x=None) -> np.ndarray:
+    """
+    Posisjonene LTTB beholder av y (NaN-verdier hoppes over).
+
+    Args:
+        y: Verdier
+        n_out (int): Maks antall punkter som returneres (minst 3)
+        x: x-verdier (standard: posisjon)
+    Returns:
+        np.ndarray: stigende posisjoner i y
+    """
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    n_out = max(3, n_out)
+    if len(valid) <= n_out:
+        return valid
+
+    xv = (np.asarray(x, dtype=np.float64) if x is not None else np.arange(len(y), dtype=np.float64))[valid]
+    yv = y[valid]
+    n = len(valid)
+
+    # Første og siste punkt beholdes, resten deles i n_out - 2 bøtter
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xv[hi:next_hi].mean()
+        avg_y = yv[hi:next_hi].mean()
+        area = np.abs(
+            (xv[a] - avg_x) * (yv[lo:hi] - yv[a]) - (xv[a] - xv[lo:hi]) * (avg_y - yv[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return valid[keep]
+
+
+def lttb(series: pd.Series, n_out: int | None = None) -> pd.Series:
+    """Nedsampler en linje med LTTB; korte serier returneres uendret."""
+    n_out = n_out or max_points()
+    if len(series) <= n_out:
+        return series
+    return series.iloc[lttb_indices(series.to_numpy(dtype=np.float64), n_out, _x_values(series.index))]
+
+
+def ohlc(data: pd.DataFrame, n_out: int | None = None) -> pd.DataFrame:
+    """
+    Slår sammen påfølgende barer slik at det blir høyst n_out candles.
+
+    Hver ny bar får tidsstempelet til den første baren den dekker.
+    Kolonner utenom OHLCV beholdes ikke.
+    """
+    n_out = n_out or max_points()
+    n = len(data)
+    if n <= n_out:
+        return data
+
+    size = math.ceil(n / n_out)
+    starts = np.arange(0, n, size)
+    ends = np.append(starts[1:], n) - 1
+    out = {}
+    if "Open" in data:
+        out["Open"] = data["Open"].to_numpy(dtype=np.float64)[starts]
+    if "High" in data:
+        out["High"] = np.fmax.reduceat(data["High"].to_numpy(dtype=np.float64), starts)
+    if "Low" in data:
+        out["Low"] = np.fmin.reduceat(data["Low"].to_numpy(dtype=np.float64), starts)
+    if "Close" in data:
+        out["Close"] = data["Close"].to_numpy(dtype=np.float64)[ends]
+    if "Volume" in data:
+        out["Volume"] = np.add.reduceat(np.nan_to_num(data["Volume"].to_numpy(dtype=np.float64)), starts)
+    return pd.DataFrame(out, index=data.index[starts])
+
+
+def decimate(data, n_out: int | None = None):
+    """Beholder hvert k-te element slik at høyst n_out punkter gjenstår."""
+    n_out = n_out or max_points()
+    if len(data) <= n_out:
+        return data
+    return data.iloc[::math.ceil(len(data) / n_out)]
@@ -0,0 +1,191 @@
+"""
+Minnemappede OHLCV-kolonner som flere prosesser kan åpne uten kopiering.
+
+Layout på disk:
+    <root>/symbol=<symbol>/interval=<interval>/CURRENT
+    <root>/symbol=<symbol>/interval=<interval>/v-<written_ns>/index.npy
+    <root>/symbol=<symbol>/interval=<interval>/v-<written_ns>/<kolonne>.npy
+    <root>/symbol=<symbol>/interval=<interval>/v-<written_ns>/_meta.json
+
+Hver skriving lager en ny versjonskatalog og peker CURRENT atomisk på den, så
+lesere ser aldri en halvskrevet versjon. Har en eksisterende versjon de samme
+dataene (samme fingeravtrykk), gjenbrukes den i stedet. Kolonnene åpnes med
+np.load(mmap_mode="r"): alle prosesser på maskinen deler de samme sidene i
+OS-ets sidecache i stedet for å holde hver sin kopi. Indikatorkjernene tar
+arrayene direkte; to_frame() gir en tynn pandas-visning for UI-et.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+CURRENT_FILE = "CURRENT"
+META_FILE = "_meta.json"
+INDEX_FILE = "index.npy"
+# Gamle versjoner slettes først når de er så gamle, slik at prosesser som
+# nettopp har fått en versjonssti rekker å åpne den
+KEEP_OLD_VERSIONS_S = 3600
+
+
+class PriceArrays:
+    """Skrivebeskyttede, minnemappede kolonner for ett symbol/intervall."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        meta = json.loads((self.path / META_FILE).read_text())
+        self.tz = meta.get("tz")
+        self.index_name = meta.get("index_name")
+        # int64 nanosekunder siden epoch, UTC
+        self.index = np.load(self.path / INDEX_FILE, mmap_mode="r")
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r")
+            for name in meta["columns"]
+        }
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def between(self, start=None, end=None) -> "PriceArrays":
+        """Returnerer en visning av radene i [start, end] uten å kopiere."""
+        lo = 0 if start is None else int(np.searchsorted(self.index, _to_ns(start), "left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.index, _to_ns(end), "right"))
+        view = object.__new__(PriceArrays)
+        view.path, view.tz, view.index_name = self.path, self.tz, self.index_name
+        view.index = self.index[lo:hi]
+        view.columns = {name: values[lo:hi] for name, values in self.columns.items()}
+        return view
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Tynn DataFrame-visning over de mappede arrayene (ingen kopi av kolonnene)."""
+        index = pd.DatetimeIndex(np.asarray(self.index).view("M8[ns]"), name=self.index_name)
+        index = index.tz_localize("UTC")
+        if self.tz:
+            index = index.tz_convert(self.tz)
+        names = list(self.columns) if columns is None else list(columns)
+        return pd.DataFrame(
+            {name: self.columns[name] for name in names}, index=index, copy=False
+        )
+
+
+class MmapStore:
+    def __init__(self, root: str | Path = "data/mmap"):
+        self.root = Path(root)
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / f"symbol={quote(symbol, safe='')}" / f"interval={interval}"
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame) -> Path:
+        """
+        Skriver alle numeriske kolonner i df som en ny versjon og gjør den gjeldende.
+
+        Har en versjon allerede de samme dataene, blir den gjeldende i stedet
+        og ingenting skrives.
+
+        Returns:
+            Path: versjonskatalogen, som kan gis til andre prosesser via open_path()
+        """
+        base = self._dir(symbol, interval)
+
+        index = df.index
+        if not isinstance(index, pd.DatetimeIndex):
+            index = pd.DatetimeIndex(index)
+        tz = str(index.tz) if index.tz is not None else None
+        utc = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+        index_ns = utc.as_unit("ns").asi8
+        columns = [name for name in df.columns if pd.api.types.is_numeric_dtype(df[name])]
+        arrays = {name: df[name].to_numpy(dtype=np.float64) for name in columns}
+        meta = {"columns": columns, "tz": tz, "index_name": df.index.name}
+        meta["fingerprint"] = _fingerprint(meta, index_ns, arrays)
+
+        version = self._find(base, meta["fingerprint"])
+        if version is None:
+            version = base / f"v-{time.time_ns()}"
+            version.mkdir(parents=True)
+            np.save(version / INDEX_FILE, index_ns)
+            for name, values in arrays.items():
+                np.save(version / f"{name}.npy", values)
+            (version / META_FILE).write_text(json.dumps(meta))
+        else:
+            # Nylig brukt: skal ikke slettes av _prune den neste timen
+            os.utime(version)
+
+        tmp = base / f"{CURRENT_FILE}.{version.name}.tmp"
+        tmp.write_text(version.name)
+        tmp.replace(base / CURRENT_FILE)
+        self._prune(base, keep=version.name)
+        return version
+
+    def open(self, symbol: str, interval: str) -> Optional[PriceArrays]:
+        """Åpner gjeldende versjon, eller None hvis ingenting er skrevet."""
+        base = self._dir(symbol, interval)
+        try:
+            version = (base / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            return None
+        return PriceArrays(base / version)
+
+    @staticmethod
+    def open_path(path: str | Path) -> PriceArrays:
+        """Åpner en bestemt versjon, f.eks. en sti fra write() i en annen prosess."""
+        return PriceArrays(Path(path))
+
+    def _find(self, base: Path, fingerprint: str) -> Optional[Path]:
+        """Versjonen med dette fingeravtrykket, gjeldende versjon først."""
+        try:
+            current = (base / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            current = None
+        versions = sorted(base.glob("v-*"), key=lambda path: path.name != current)
+        for path in versions:
+            try:
+                meta = json.loads((path / META_FILE).read_text())
+            except (FileNotFoundError, ValueError):
+                continue
+            if meta.get("fingerprint") == fingerprint:
+                return path
+        return None
+
+    def _prune(self, base: Path, keep: str) -> None:
+        """
+        Sletter versjoner som ikke er skrevet eller gjenbrukt den siste timen;
+        åpne memmaps beholder dataene sine til de lukkes.
+        """
+        cutoff = time.time_ns() - KEEP_OLD_VERSIONS_S * 1_000_000_000
+        for path in base.glob("v-*"):
+            if path.name == keep:
+                continue
+            try:
+                used = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if used < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _fingerprint(meta: dict, index_ns: np.ndarray, arrays: Dict[str, np.ndarray]) -> str:
+    """Hash av indeks, kolonner og metadata; like data gir samme fingeravtrykk."""
+    digest = hashlib.blake2b(json.dumps(meta).encode(), digest_size=16)
+    digest.update(np.ascontiguousarray(index_ns).data)
+    for values in arrays.values():
+        digest.update(np.ascontiguousarray(values).data)
+    return digest.hexdigest()
+
+
+def _to_ns(ts) -> int:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.tz_convert("UTC").as_unit("ns").value
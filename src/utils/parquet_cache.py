@@ -1,10 +1,22 @@
 from typing import Any
 
+import json
+import logging
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+from src.instrumentation import get_instrumentation, timed
 
+logger = logging.getLogger(__name__)
+
+# Nøkkel i Parquet-skjemaets metadata der cache-metadata lagres
+META_KEY = b"sigmabott"
+
+
+@timed("parquet_cache.read", kind="disk")
 def read_parquet_cache(path: str, max_age_s: int = 0):
     """
     Leser en Parquet-fil hvis den finnes og er fersk nok.
@@ -16,12 +28,17 @@ def read_parquet_cache(path: str, max_age_s: int = 0):
     Returns:
         DataFrame | None  (None hvis ingen gyldig cache)
     """
+    instrumentation = get_instrumentation()
     in_path = Path(path).with_suffix(".parquet")
     if not in_path.exists():
+        instrumentation.cache_access("parquet_cache", hit=False)
         return None
 
-    df: pd.DataFrame = pd.read_parquet(in_path)  # type: ignore[reportUnknownMemberType]
-    meta = df.attrs or {}
+    table = pq.read_table(in_path)
+    instrumentation.add_bytes("parquet_cache.read", read=in_path.stat().st_size)
+    meta = json.loads((table.schema.metadata or {}).get(META_KEY, b"{}"))
+    df: pd.DataFrame = table.to_pandas()
+    df.attrs.update(meta)
     last_fetch = meta.get("last_fetch")
 
     if max_age_s and last_fetch:
@@ -29,30 +46,38 @@ def read_parquet_cache(path: str, max_age_s: int = 0):
         siste = datetime.fromisoformat(last_fetch)
         age = naa - siste
 
-        print(
-            f"last_fetch: {siste}, now: {naa}, and age: {age} max age {timedelta(seconds=max_age_s)}"
+        logger.debug(
+            "last_fetch: %s, now: %s, age: %s, max age: %s",
+            siste, naa, age, timedelta(seconds=max_age_s),
         )
         if age > timedelta(seconds=max_age_s):
+            instrumentation.cache_access("parquet_cache", hit=False)
             return None
+    instrumentation.cache_access("parquet_cache", hit=True)
     return df
 
 
+@timed("parquet_cache.write", kind="disk")
 def write_parquet_cache(
     df: pd.DataFrame, path: str, **meta: str | float | int | Any
 ) -> None:
     """
     Skriver DataFrame til Parquet med metadata.
 
+    Metadata legges i skjemaet til Arrow-tabellen, så DataFrame-en kopieres ikke.
+
     Eksempel:
         write_parquet_cache(df, "data/BTC-USD_1h.parquet", symbols="BTC-USD", interval="1h")
     """
     outpath = Path(path).with_suffix(".parquet")
     outpath.parent.mkdir(parents=True, exist_ok=True)
 
-    df = df.copy()
     meta["last_fetch"] = datetime.now(timezone.utc).isoformat()
-    for k, v in meta.items():  # type: ignore
-        df.attrs[k] = v
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), META_KEY: json.dumps(meta, default=str)}
+    )
 
-    df.to_parquet(outpath, index=True)
-    print(f"💾 Lagret {outpath.name} ({len(df)} rader)")
+    pq.write_table(table, outpath)
+    get_instrumentation().add_bytes("parquet_cache.write", written=outpath.stat().st_size)
+    logger.debug("Lagret %s (%d rader)", outpath.name, len(df))
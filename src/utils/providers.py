@@ -0,0 +1,329 @@
+"""
+Kilder for OHLCV-barer bak ett felles, batchet grensesnitt.
+
+    provider.fetch(["BTC-USD", "ETH-USD"], start, end, "1h")
+        -> {"BTC-USD": DataFrame, "ETH-USD": DataFrame}
+
+Implementasjoner:
+    YahooProvider        yfinance, alle symboler i ett kall
+    LocalFileProvider    Parquet/CSV-filer i en katalog (avspilling uten nett)
+    SyntheticProvider    deterministisk tilfeldig gange, samme barer hver gang
+
+Standardkilden velges med miljøvariabelen SIGMABOTT_PROVIDER ("yahoo",
+"synthetic", "synthetic:<seed>" eller "local:<katalog>"), se provider_from_spec.
+Yahoo går da gjennom DownloadScheduler (struping, nye forsøk og batching).
+"""
+import math
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import get_instrumentation, timed
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _yf_download(*args, **kwargs):
+    """yf.download, men yfinance importeres først ved første nedlasting."""
+    import yfinance as yf
+
+    return yf.download(*args, **kwargs)
+
+
+def _utc(ts) -> pd.Timestamp | None:
+    """Tidsstempel som tz-aware UTC (naive tolkes som UTC)."""
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _between(data: pd.DataFrame, start, end) -> pd.DataFrame:
+    """Radene i [start, end)."""
+    mask = np.ones(len(data), dtype=bool)
+    if start is not None:
+        mask &= data.index >= start
+    if end is not None:
+        mask &= data.index < end
+    return data[mask]
+
+
+class DataProvider:
+    """
+    Grunnklasse for datakilder.
+
+    Underklasser implementerer _download; fetch normaliserer argumentene og
+    måler tid og bytes under steget "<name>.fetch".
+
+    Attributter:
+        name: Navn i målinger og cache-nøkler
+        kind: Måletype for hentingen ("network", "disk" eller "compute")
+        cacheable: Om download_yf skal legge barene i bar-lageret
+        max_history: Intervall -> hvor langt tilbake kilden har barer
+            (pd.Timedelta); intervaller som mangler har ingen grense
+    """
+
+    name = "provider"
+    kind = "compute"
+    cacheable = False
+    max_history: dict = {}
+
+    @property
+    def key(self) -> str:
+        """Identifiserer kilden i delte cache-nøkler."""
+        return self.name
+
+    def fetch(self, symbols, start=None, end=None, interval="1d") -> dict[str, pd.DataFrame]:
+        """
+        Henter barer for flere symboler i ett kall.
+
+        Args:
+            symbols (str | list[str]): Ticker eller liste av tickere
+            start (Timestamp | None): Første tidsstempel (None = så langt tilbake som mulig)
+            end (Timestamp | None): Tidsstempel det hentes frem til, eksklusivt (None = nå)
+            interval (str): Tidsintervall, f.eks. "1m", "1h", "1d"
+        Returns:
+            dict[str, pd.DataFrame]: symbol -> OHLCV med tz-aware DatetimeIndex;
+            symboler uten data er utelatt
+        """
+        symbols = [symbols] if isinstance(symbols, str) else list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        stage = f"{self.name}.fetch"
+        with timed(stage, kind=self.kind):
+            frames = self._download(symbols, _utc(start), _utc(end), interval)
+        get_instrumentation().add_bytes(
+            stage,
+            read=sum(int(frame.memory_usage(index=True).sum()) for frame in frames.values()),
+            kind=self.kind,
+        )
+        return frames
+
+    def _download(self, symbols, start, end, interval) -> dict[str, pd.DataFrame]:
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
+    """Yahoo Finance via yfinance; alle symbolene hentes i ett kall."""
+
+    name = "yahoo"
+    kind = "network"
+    cacheable = True
+    # Yahoo gir intradagsbarer bare et stykke tilbake (med en dags margin)
+    max_history = {
+        "1m": pd.Timedelta(days=6),
+        **{interval: pd.Timedelta(days=59) for interval in ("2m", "5m", "15m", "30m", "90m")},
+        "60m": pd.Timedelta(days=729),
+        "1h": pd.Timedelta(days=729),
+    }
+
+    def __init__(self, downloader=None):
+        # Erstatning for yf.download (samme signatur), f.eks. i tester
+        self.downloader = downloader
+
+    def _download(self, symbols, start, end, interval):
+        window = {"period": "max"} if start is None else {"start": start}
+        if end is not None:
+            window["end"] = end
+        data = (self.downloader or _yf_download)(
+            symbols, interval=interval, group_by="ticker", progress=False, **window
+        )
+        if data is None or data.empty:
+            return {}
+
+        if isinstance(data.columns, pd.MultiIndex):
+            tickers = data.columns.get_level_values(0).unique()
+            frames = {
+                symbol: data[symbol].dropna(how="all")
+                for symbol in symbols if symbol in tickers
+            }
+        else:
+            frames = {symbols[0]: data}
+        return {symbol: frame for symbol, frame in frames.items() if not frame.empty}
+
+
+class LocalFileProvider(DataProvider):
+    """
+    Leser barer fra Parquet- eller CSV-filer i en katalog.
+
+    Filer slås opp som <root>/<symbol>_<interval>.parquet|.csv og deretter
+    <root>/<symbol>.parquet|.csv. Første kolonne i en CSV er tidsstempelet.
+    """
+
+    name = "local"
+    kind = "disk"
+
+    def __init__(self, root: str | Path = "data/replay"):
+        self.root = Path(root)
+
+    @property
+    def key(self) -> str:
+        return f"local:{self.root}"
+
+    def path(self, symbol: str, interval: str) -> Path | None:
+        """Filen for symbol/intervall, eller None hvis den ikke finnes."""
+        for name in dict.fromkeys([symbol, quote(symbol, safe="")]):
+            for stem in (f"{name}_{interval}", name):
+                for suffix in (".parquet", ".csv"):
+                    candidate = self.root / f"{stem}{suffix}"
+                    if candidate.exists():
+                        return candidate
+        return None
+
+    def write(self, symbol: str, interval: str, data: pd.DataFrame) -> Path:
+        """Lagrer barer som Parquet, f.eks. for å spille av en nedlasting senere."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{quote(symbol, safe='')}_{interval}.parquet"
+        data.to_parquet(path)
+        return path
+
+    def _download(self, symbols, start, end, interval):
+        frames = {}
+        for symbol in symbols:
+            path = self.path(symbol, interval)
+            if path is None:
+                continue
+            if path.suffix == ".csv":
+                data = pd.read_csv(path, index_col=0)
+                data.index = pd.to_datetime(data.index, utc=True)
+            else:
+                data = pd.read_parquet(path)
+                if data.index.tz is None:
+                    data.index = data.index.tz_localize("UTC")
+            data = _between(data.sort_index(), start, end)
+            if not data.empty:
+                frames[symbol] = data
+        return frames
+
+
+# Syntetiske barer ligger på faste tidspunkter EPOCH + k * intervall
+EPOCH = pd.Timestamp("2000-01-01", tz="UTC")
+BLOCK = 1024
+_STEP_UNITS = {"m": "min", "h": "h", "d": "D", "wk": "W"}
+
+
+def interval_step(interval: str) -> pd.Timedelta:
+    """Lengden på ett intervall ("1m", "4h", "1d", "1wk", ...)."""
+    match = re.fullmatch(r"(\d+)(m|h|d|wk)", interval)
+    if match is None:
+        raise ValueError(f"Intervallet støttes ikke: {interval}")
+    return pd.Timedelta(int(match.group(1)), _STEP_UNITS[match.group(2)])
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Deterministisk tilfeldig gange per symbol, uten nett eller disk.
+
+    Hver bar har en fast plass (EPOCH + k * intervall), og prisen i den er
+    den samme uansett hvilket vindu som hentes: blokker på BLOCK barer er
+    Brownske broer mellom endepunkter fra en tilfeldig gange over blokkene,
+    med egen seed per (seed, symbol, blokk).
+    """
+
+    name = "synthetic"
+
+    def __init__(self, seed: int = 0, volatility: float = 0.001, history_bars: int = 5000):
+        self.seed = seed
+        self.volatility = volatility
+        # Antall barer når start er None
+        self.history_bars = history_bars
+
+    @property
+    def key(self) -> str:
+        return f"synthetic:{self.seed}"
+
+    def _download(self, symbols, start, end, interval):
+        step = interval_step(interval)
+        end = end or pd.Timestamp.now(tz="UTC")
+        # Barene k_start <= k < k_end har tidsstempel i [start, end)
+        k_end = math.ceil((end - EPOCH) / step)
+        if start is None:
+            k_start = k_end - self.history_bars
+        else:
+            k_start = math.ceil((start - EPOCH) / step)
+        k_start = max(k_start, 1)
+        if k_end <= k_start:
+            return {}
+        return {symbol: self._bars(symbol, k_start, k_end, step) for symbol in symbols}
+
+    def _bars(self, symbol: str, k_start: int, k_end: int, step: pd.Timedelta) -> pd.DataFrame:
+        symbol_seed = zlib.crc32(symbol.encode())
+        # Med baren før, så Open kan være forrige Close
+        positions = np.arange(k_start - 1, k_end)
+        first_block, last_block = positions[0] // BLOCK, positions[-1] // BLOCK
+
+        # Endepunktene til alle blokker frem til den siste
+        walk = np.random.default_rng([self.seed, symbol_seed])
+        levels = np.concatenate([
+            [0.0],
+            np.cumsum(walk.normal(0, self.volatility * math.sqrt(BLOCK), last_block + 1)),
+        ])
+
+        log_close, spread, volume = [], [], []
+        for block in range(first_block, last_block + 1):
+            rng = np.random.default_rng([self.seed, symbol_seed, block])
+            steps = np.concatenate([[0.0], np.cumsum(rng.normal(0, self.volatility, BLOCK))])
+            fraction = np.arange(BLOCK) / BLOCK
+            bridge = steps[:-1] - steps[-1] * fraction
+            log_close.append(levels[block] + (levels[block + 1] - levels[block]) * fraction + bridge)
+            spread.append(np.abs(rng.normal(0, self.volatility / 2, BLOCK)))
+            volume.append(rng.integers(1, 10_000, BLOCK))
+
+        offset = positions[0] - first_block * BLOCK
+        window = slice(offset, offset + len(positions))
+        close = 100 * np.exp(np.concatenate(log_close)[window])
+        spread = np.concatenate(spread)[window][1:] * close[1:]
+        open_, close = close[:-1], close[1:]
+        return pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": np.concatenate(volume)[window][1:].astype(np.float64),
+        }, index=pd.DatetimeIndex(EPOCH + positions[1:] * step, name="Datetime"))
+
+
+def provider_from_spec(spec: str) -> DataProvider:
+    """
+    Lager en kilde fra en tekst: "yahoo", "synthetic", "synthetic:<seed>"
+    eller "local:<katalog>". Yahoo pakkes inn i en DownloadScheduler.
+
+    Raises:
+        ValueError: Ved ukjent kilde
+    """
+    name, _, argument = spec.partition(":")
+    if name == "yahoo" and not argument:
+        from .scheduler import DownloadScheduler
+
+        return DownloadScheduler(YahooProvider())
+    if name == "synthetic":
+        return SyntheticProvider(seed=int(argument or 0))
+    if name == "local":
+        return LocalFileProvider(argument or "data/replay")
+    raise ValueError(f"Ukjent datakilde: {spec}")
+
+
+_default: DataProvider | None = None
+_default_lock = threading.Lock()
+
+
+def get_default_provider() -> DataProvider:
+    """Kilden fra SIGMABOTT_PROVIDER (standard "yahoo"), opprettet ved første kall."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = provider_from_spec(os.environ.get("SIGMABOTT_PROVIDER", "yahoo"))
+        return _default
+
+
+def set_default_provider(provider: DataProvider | None) -> None:
+    """Bytter standardkilden (None leser SIGMABOTT_PROVIDER på nytt ved neste kall)."""
+    global _default
+    with _default_lock:
+        _default = provider
@@ -0,0 +1,139 @@
+"""
+Avleder grovere OHLCV-intervaller fra finere barer.
+
+download_yf henter 4h, 1d og 1wk som 1h-barer (som caches i bar-lageret)
+og aggregerer dem her, så lenge perioden ligger innenfor historikken kilden
+har for 1h. Å bytte intervall på en side gir da bare en rask aggregering,
+ingen ny nedlasting.
+
+Aggregering per intervall, i børsens tidssone (tidssonen på indeksen):
+    timer (4h)  sesjonsforankret: blokker på 4 timer fra dagens første bar
+    1d          kalenderdag, merket med midnatt lokal tid
+    1wk         uke fra mandag, merket med mandag midnatt lokal tid
+
+Open er første, High høyeste, Low laveste og Close siste bar i blokken,
+Volume summeres. Døgnåpne markeder (krypto) har første bar ved midnatt,
+så 4h-blokkene der blir 00-04, 04-08 osv. Den siste blokken kan være
+ufullstendig, slik den også er hos Yahoo mens dagen eller uken pågår.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Intervallet som hentes og caches for hvert avledet intervall
+DERIVED_FROM = {"2h": "1h", "4h": "1h", "1d": "1h", "1wk": "1h"}
+
+# Tikk per sekund for oppløsningen på indeksen
+_TICKS_PER_S = {"s": 1, "ms": 10**3, "us": 10**6, "ns": 10**9}
+_AGGREGATIONS = {
+    "Open": "first", "High": "max", "Low": "min", "Close": "last", "Adj Close": "last", "Volume": "sum",
+}
+# 1970-01-01 var en torsdag; dag + 3 gir uker som starter mandag
+_MONDAY_SHIFT = 3
+
+
+def source_interval(interval: str, start, now, max_history: dict) -> str | None:
+    """
+    Intervallet som interval skal avledes fra, eller None for å hente det direkte.
+
+    Args:
+        interval (str): Ønsket intervall, f.eks. "4h"
+        start (pd.Timestamp | None): Starten på perioden (None = "max")
+        now (pd.Timestamp): Nåtid
+        max_history (dict): Kildeintervall -> hvor langt tilbake kilden har
+            barer (pd.Timedelta); intervaller som mangler har ingen grense
+    """
+    source = DERIVED_FROM.get(interval)
+    if source is None or start is None:
+        return None
+    limit = max_history.get(source)
+    if limit is not None and now - start > limit:
+        return None
+    return source
+
+
+def block_fetch_start(start: pd.Timestamp) -> pd.Timestamp:
+    """
+    Hvor kildebarene må leses fra for at blokkene fra og med start skal bli
+    hele: midnatt UTC dagen før, som ligger før starten på døgnet start er i
+    uansett børsens tidssone (så 4h-blokkene forankres på dagens første bar).
+    """
+    return (start - pd.Timedelta(days=1)).floor("D")
+
+
+def _bins(index: pd.DatetimeIndex, interval: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Første rad i hver blokk og blokkens start (UTC) for en sortert indeks,
+    i indeksens egen oppløsning.
+    """
+    ticks = _TICKS_PER_S[index.unit]
+    day_ticks = 86_400 * ticks
+    utc = index.asi8
+    # Veggklokke i børsens tidssone, som tikk siden epoke
+    local = index.tz_localize(None).asi8 if index.tz is not None else utc
+    day = local // day_ticks
+
+    hours = re.fullmatch(r"(\d+)h", interval)
+    if hours:
+        rule = int(hours.group(1)) * 3_600 * ticks
+        day_start = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+        first_of_day = np.repeat(day_start, np.diff(np.r_[day_start, len(day)]))
+        # Tid siden dagens første bar, i faktisk forløpt tid (riktig over sommertid)
+        session_start = utc[first_of_day]
+        block = (utc - session_start) // rule
+        key_change = np.r_[True, (day[1:] != day[:-1]) | (block[1:] != block[:-1])]
+        first = np.flatnonzero(key_change)
+        return first, session_start[first] + block[first] * rule
+
+    if interval == "1d":
+        period_start = day * day_ticks
+    elif interval == "1wk":
+        week = (day + _MONDAY_SHIFT) // 7
+        period_start = (week * 7 - _MONDAY_SHIFT) * day_ticks
+    else:
+        raise ValueError(f"Kan ikke aggregere til intervallet {interval}")
+    first = np.flatnonzero(np.r_[True, period_start[1:] != period_start[:-1]])
+    # Lokal midnatt som UTC: første bar minus avstanden fra midnatt
+    return first, utc[first] - (local[first] - period_start[first])
+
+
+def resample_ohlcv(data: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregerer OHLCV-barer til et grovere intervall.
+
+    Args:
+        data (pd.DataFrame): Barer med Open/High/Low/Close(/Volume) og DatetimeIndex
+        interval (str): Målintervall: "<n>h", "1d" eller "1wk"
+    Returns:
+        pd.DataFrame: Én rad per blokk, indeksert på blokkens start i samme tidssone
+    """
+    if data.empty:
+        return data
+    data = data[data["Close"].notna()].sort_index()
+    if data.empty:
+        return data
+
+    first, starts = _bins(data.index, interval)
+    last = np.r_[first[1:], len(data)] - 1
+
+    # Andre kolonner (utbytte, splitter) tas ikke med
+    columns = {}
+    for column in data.columns.intersection(_AGGREGATIONS, sort=False):
+        values = data[column].to_numpy(dtype=np.float64)
+        how = _AGGREGATIONS[column]
+        if how == "first":
+            columns[column] = values[first]
+        elif how == "last":
+            columns[column] = values[last]
+        elif how == "max":
+            columns[column] = np.fmax.reduceat(values, first)
+        elif how == "min":
+            columns[column] = np.fmin.reduceat(values, first)
+        else:
+            columns[column] = np.add.reduceat(np.nan_to_num(values), first)
+
+    index = pd.DatetimeIndex(starts.astype(f"M8[{data.index.unit}]"), name=data.index.name)
+    if data.index.tz is not None:
+        index = index.tz_localize("UTC").tz_convert(data.index.tz)
+    return pd.DataFrame(columns, index=index)
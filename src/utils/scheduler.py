@@ -0,0 +1,329 @@
+"""
+Planlegger for nedlastinger: struping, nye forsøk, batching og sammenslåing.
+
+DownloadScheduler pakker inn en DataProvider (standard for "yahoo") og
+sender alle hentinger gjennom én kø:
+
+    struping      token-bøtte med rate symboler per sekund og burst i reserve
+    nye forsøk    feil prøves på nytt med eksponentiell backoff og jitter;
+                  symboler som mangler i svaret prøves én gang til
+    batching      forespørsler som kommer innen batch_window_s med samme
+                  intervall og slutt slås sammen til ett kall mot kilden, fra
+                  den tidligste starten (hver kaller får sitt eget vindu)
+    sammenslåing  samtidige forespørsler for samme symbol venter på samme
+                  henting i stedet for å laste ned på nytt
+
+Feil telles per symbol (stats()). Symboler som har feilet FAILURE_THRESHOLD
+ganger på rad får ikke nye forsøk før cooldown_s har gått, så ugyldige
+tickere ikke holder igjen resten av køen.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from src.instrumentation import get_instrumentation
+
+from .providers import DataProvider, _utc
+
+logger = logging.getLogger(__name__)
+
+# Feil på rad før et symbol settes i karantene
+FAILURE_THRESHOLD = 3
+
+
+class DownloadError(RuntimeError):
+    """Nedlastingen feilet også etter nye forsøk."""
+
+    def __init__(self, symbol: str, cause: BaseException):
+        super().__init__(str(cause))
+        self.symbol = symbol
+        self.cause = cause
+
+
+class TokenBucket:
+    """Token-bøtte: rate tokens per sekund, opptil capacity i reserve."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Venter til tokens er tilgjengelige og trekker dem.
+
+        Mer enn capacity på én gang venter på full bøtte og låner resten,
+        så gjennomsnittsraten holder også for store batcher.
+
+        Returns:
+            float: sekunder ventet
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                needed = min(tokens, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return waited
+                delay = (needed - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+@dataclass
+class SymbolStats:
+    """Nedlastingshistorikk for ett symbol."""
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    last_success: Optional[float] = None
+    last_failure: Optional[float] = None
+
+
+class _Batch:
+    """Åpen eller pågående batch for ett (intervall, slutt)."""
+
+    def __init__(self, start: Optional[pd.Timestamp]):
+        self.start = start
+        self.futures: Dict[str, Future] = {}
+        self.full = threading.Event()
+
+
+class DownloadScheduler(DataProvider):
+    def __init__(
+        self,
+        provider: DataProvider,
+        rate: float = 2.0,
+        burst: int = 20,
+        max_retries: int = 4,
+        backoff_s: float = 1.0,
+        max_backoff_s: float = 30.0,
+        batch_window_s: float = 0.05,
+        max_batch: int = 20,
+        cooldown_s: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.provider = provider
+        self.bucket = TokenBucket(rate, burst, clock, sleep)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.batch_window_s = batch_window_s
+        self.max_batch = max_batch
+        self.cooldown_s = cooldown_s
+        self.clock = clock
+        self.sleep = sleep
+        self.batches = 0
+        self.coalesced = 0
+        self._stats: Dict[str, SymbolStats] = {}
+        # (intervall, slutt, uten start) -> batch som samler forespørsler
+        self._open: Dict[tuple, _Batch] = {}
+        # Batcher som er sendt til kilden, for sammenslåing
+        self._inflight: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    # Kilden bestemmer navn, cache og historikk
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    @property
+    def kind(self) -> str:
+        return self.provider.kind
+
+    @property
+    def cacheable(self) -> bool:
+        return self.provider.cacheable
+
+    @property
+    def max_history(self) -> dict:
+        return self.provider.max_history
+
+    @property
+    def key(self) -> str:
+        return self.provider.key
+
+    def fetch(self, symbols, start=None, end=None, interval="1d") -> dict[str, pd.DataFrame]:
+        """
+        Som DataProvider.fetch, gjennom køen.
+
+        Raises:
+            DownloadError: Hvis et symbol feilet også etter nye forsøk
+        """
+        symbols = [symbols] if isinstance(symbols, str) else list(dict.fromkeys(symbols))
+        start, end = _utc(start), _utc(end)
+        key = (interval, end, start is None)
+        futures, leading = {}, []
+        for symbol in symbols:
+            futures[symbol], batch = self._submit(key, symbol, start)
+            if batch is not None:
+                leading.append(batch)
+        for batch in leading:
+            self._dispatch(key, batch)
+
+        frames = {}
+        for symbol, future in futures.items():
+            data = future.result()
+            if data is None:
+                continue
+            if start is not None:
+                data = data[data.index >= start]
+            if not data.empty:
+                frames[symbol] = data
+        return frames
+
+    def stats(self) -> Dict[str, dict]:
+        """symbol -> SymbolStats som dict."""
+        with self._lock:
+            return {symbol: asdict(stats) for symbol, stats in self._stats.items()}
+
+    def _submit(self, key: tuple, symbol: str, start) -> tuple[Future, Optional[_Batch]]:
+        """
+        Legger symbolet i en batch, eller henger seg på en som allerede henter det.
+
+        Returns:
+            (future for symbolet, batchen hvis kalleren åpnet den og skal sende den)
+        """
+        with self._lock:
+            for batch in self._inflight.get(key, []):
+                if symbol in batch.futures and (start is None or batch.start <= start):
+                    self.coalesced += 1
+                    return batch.futures[symbol], None
+
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch(start)
+            elif start is not None and start < batch.start:
+                batch.start = start
+            if symbol in batch.futures:
+                self.coalesced += 1
+                return batch.futures[symbol], None
+            future = batch.futures[symbol] = Future()
+            if len(batch.futures) >= self.max_batch:
+                # Full batch: neste forespørsel åpner en ny
+                batch.full.set()
+                del self._open[key]
+        return future, batch if leader else None
+
+    def _dispatch(self, key: tuple, batch: _Batch) -> None:
+        """Venter batch_window_s på flere forespørsler og sender batchen."""
+        batch.full.wait(self.batch_window_s)
+        with self._lock:
+            if self._open.get(key) is batch:
+                del self._open[key]
+            self._inflight.setdefault(key, []).append(batch)
+        try:
+            self._run(key, batch)
+        except BaseException as e:
+            # Ingen som venter skal henge på en uventet feil
+            for symbol, future in batch.futures.items():
+                if not future.done():
+                    future.set_exception(DownloadError(symbol, e))
+            raise
+        finally:
+            with self._lock:
+                self._inflight[key].remove(batch)
+                if not self._inflight[key]:
+                    del self._inflight[key]
+
+    def _run(self, key: tuple, batch: _Batch) -> None:
+        """Henter batchen med struping og nye forsøk, og løser alle futures."""
+        interval, end, _ = key
+        pending = list(batch.futures)
+        missing_retried = set()
+        attempt = 0
+        with self._lock:
+            self.batches += 1
+
+        while pending:
+            waited = self.bucket.acquire(len(pending))
+            if waited:
+                get_instrumentation().record(f"{self.name}.throttle", waited, kind="network")
+            try:
+                frames = self.provider.fetch(pending, start=batch.start, end=end, interval=interval)
+            except Exception as e:
+                retry = [symbol for symbol in pending if self._may_retry(symbol)]
+                if attempt >= self.max_retries or not retry:
+                    for symbol in pending:
+                        self._failed(symbol, e)
+                        batch.futures[symbol].set_exception(DownloadError(symbol, e))
+                    return
+                logger.warning("Nedlasting feilet (%s), forsøk %d: %s", interval, attempt + 1, e)
+                for symbol in set(pending) - set(retry):
+                    self._failed(symbol, e)
+                    batch.futures[symbol].set_exception(DownloadError(symbol, e))
+                pending = retry
+                self.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            for symbol, data in frames.items():
+                if symbol in batch.futures and not batch.futures[symbol].done():
+                    self._succeeded(symbol)
+                    batch.futures[symbol].set_result(data)
+
+            # Manglende symboler kan skyldes struping; prøv dem én gang til
+            missing = [symbol for symbol in pending if symbol not in frames]
+            retry = [
+                symbol for symbol in missing
+                if symbol not in missing_retried and self._may_retry(symbol)
+            ]
+            for symbol in set(missing) - set(retry):
+                self._failed(symbol, "Ingen data")
+                batch.futures[symbol].set_result(None)
+            missing_retried.update(retry)
+            pending = retry
+            if pending:
+                self.sleep(self._backoff(attempt))
+                attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Eksponentiell backoff med full jitter."""
+        return random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2**attempt))
+
+    def _may_retry(self, symbol: str) -> bool:
+        """Usant for symboler i karantene etter gjentatte feil."""
+        with self._lock:
+            stats = self._stats.get(symbol)
+            return stats is None or not (
+                stats.consecutive_failures >= FAILURE_THRESHOLD
+                and self.clock() - stats.last_failure < self.cooldown_s
+            )
+
+    def _succeeded(self, symbol: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(symbol, SymbolStats())
+            stats.requests += 1
+            stats.consecutive_failures = 0
+            stats.last_success = self.clock()
+
+    def _failed(self, symbol: str, error) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(symbol, SymbolStats())
+            stats.requests += 1
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_error = str(error)
+            stats.last_failure = self.clock()
@@ -0,0 +1,156 @@
+"""
+Prosessvid cache for markedsdata, delt mellom alle Streamlit-sesjoner og sider.
+
+Oppføringer lever så lenge intervallet tilsier (1m-data utløper etter sekunder,
+1d-data etter en time) og kastes ut minst-nylig-brukt når de cachede rammene
+passerer max_bytes. Samtidige oppslag på samme nøkkel slås sammen til én
+henting: den første kalleren laster, de andre venter på samme resultat.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+# Levetid i sekunder per yfinance-intervall
+TTL_BY_INTERVAL = {
+    "1m": 30,
+    "2m": 60,
+    "5m": 120,
+    "15m": 300,
+    "30m": 600,
+    "60m": 900,
+    "90m": 900,
+    "1h": 900,
+    "4h": 1800,
+    "1d": 3600,
+    "5d": 6 * 3600,
+    "1wk": 6 * 3600,
+    "1mo": 24 * 3600,
+    "3mo": 24 * 3600,
+}
+DEFAULT_TTL_S = 600
+
+
+def ttl_for(interval: str) -> float:
+    """Levetid i sekunder for data med gitt intervall."""
+    return TTL_BY_INTERVAL.get(interval, DEFAULT_TTL_S)
+
+
+def _nbytes(value: Any) -> int:
+    """Omtrentlig minnebruk for en cacheverdi (rammer, serier og dict av disse)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+    def __init__(
+        self,
+        max_bytes: int = 512 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        # nøkkel -> (verdi, utløpstid, bytes)
+        self._entries: "OrderedDict[Tuple, Tuple[Any, float, int]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, ...], loader: Callable[[], Any], ttl_s: float) -> Any:
+        """
+        Returnerer cachet verdi for key, eller laster den med loader().
+
+        Første element i key er symbolet (brukes av invalidate). Verdien deles
+        mellom alle kallere og må ikke endres. Feil fra loader caches ikke,
+        men sendes til alle som ventet på samme henting.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            call = self._inflight.get(key)
+            owner = call is None
+            if owner:
+                call = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.collapsed += 1
+
+        if not owner:
+            return call.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            try:
+                with self._lock:
+                    # Invalidert underveis: nøkkelen kan tilhøre en nyere henting
+                    if self._inflight.get(key) is call:
+                        del self._inflight[key]
+            finally:
+                call.set_exception(e)
+            raise
+
+        size = _nbytes(value)
+        with self._lock:
+            # Ble nøkkelen invalidert mens vi hentet, er det ikke vår sak å cache
+            if self._inflight.pop(key, None) is call:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[2]
+                self._entries[key] = (value, self.clock() + ttl_s, size)
+                self._bytes += size
+                self._evict()
+        call.set_result(value)
+        return value
+
+    def invalidate(self, symbol: Optional[Hashable] = None) -> int:
+        """
+        Fjerner oppføringer for ett symbol, eller alt hvis symbol er None.
+
+        Returns:
+            int: antall oppføringer fjernet
+        """
+        with self._lock:
+            keys = [k for k in self._entries if symbol is None or k[0] == symbol]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[2]
+            # Pågående hentinger fullføres for ventende kallere, men caches ikke
+            for key in [k for k in self._inflight if symbol is None or k[0] == symbol]:
+                del self._inflight[key]
+            return len(keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        # Behold alltid den nyeste oppføringen, selv om den alene er over grensen
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+
+_default_cache = SharedCache()
+
+
+def get_shared_cache() -> SharedCache:
+    """Cachen som deles av alle sesjoner i denne prosessen."""
+    return _default_cache
@@ -1,67 +1,347 @@
-import yfinance as yf
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
-from . import parquet_cache
+from src.instrumentation import get_instrumentation, timed
+from .bar_store import BarStore
+from .providers import DataProvider, get_default_provider
+from .resample import DERIVED_FROM, block_fetch_start, resample_ohlcv, source_interval
+from .scheduler import DownloadError
+from .shared_cache import SharedCache, ttl_for
+
+logger = logging.getLogger(__name__)
+
+# Hvor gammel cachen kan være før vi henter nye barer
+CACHE_MAX_AGE_S = 600
+
+
+def _period_start(period: str, end: pd.Timestamp) -> pd.Timestamp | None:
+    """
+    Regner ut starttidspunkt for en yfinance-periode ("6mo", "200d", "ytd", ...).
+
+    Returns:
+        pd.Timestamp | None  (None for "max")
+    """
+    if period == "max":
+        return None
+    if period == "ytd":
+        return end.normalize().replace(month=1, day=1)
+
+    units = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[: -len(suffix)].isdigit():
+            return end - pd.DateOffset(**{unit: int(period[: -len(suffix)])})
+    raise ValueError(f"Ukjent periode: {period}")
+
+
+def _fetch(provider: DataProvider, symbols, interval, start) -> dict[str, pd.DataFrame]:
+    """Barer for symbolene fra og med start i ett kall; tomt DataFrame for symboler uten barer."""
+    frames = provider.fetch(symbols, start=start, interval=interval)
+    return {symbol: frames.get(symbol, pd.DataFrame()) for symbol in symbols}
 
 
+@timed("download_yf", kind="io")
 def download_yf(
-    symbols, period="6mo", interval="1h", price_type="Close", cache=True, outdir="data"
+    symbols,
+    period="6mo",
+    interval="1h",
+    price_type="Close",
+    cache=True,
+    outdir="data",
+    max_age_s=CACHE_MAX_AGE_S,
+    provider: DataProvider | None = None,
 ) -> pd.DataFrame:
     """
-    Henter historiske data fra Yahoo Finance for én eller flere tickere.
-    Rydder opp i MultiIndex og returnerer et rent DataFrame.
+    Henter historiske data for én eller flere tickere fra en datakilde
+    (standard Yahoo Finance, se providers.get_default_provider).
+
+    Barer fra kilder med cacheable satt caches i et partisjonert BarStore
+    under outdir. Er cachen fersk leses bare vinduet for perioden, er den
+    utdatert hentes kun barene etter siste cachede tidsstempel og legges til.
+    Ved flere tickere hentes alle som mangler i cachen i ett kall, og alle
+    utdaterte haler i ett kall.
+
+    4h, 1d og 1wk avledes fra 1h-barer når perioden ligger innenfor kildens
+    1h-historikk (se resample.py), så alle intervallene deler samme cache.
 
     Args:
         symbols (str | list[str]): Ticker eller liste av tickere, f.eks. "BTC-USD" eller ["BTC-USD", "ETH-USD"]
         period (str): Hvor langt tilbake, f.eks. "1y", "6mo", "3mo"
         interval (str): Tidsintervall, f.eks. "1h", "4h", "1d"
         price_type (str): Felt som beholdes ved flere tickere ("Close", "Open", osv.)
-        save_csv (bool): Lagre CSV automatisk
-        outdir (str): Katalog for CSV-filer
+        cache (bool): Les fra og skriv til bar-lageret
+        outdir (str): Rotkatalog for bar-lageret
+        max_age_s (int): Maks alder på cachen i sekunder før nye barer hentes
+        provider (DataProvider | None): Datakilden (None gir standardkilden)
     Returns:
-        pd.DataFrame: Data med kolonner = tickere, rader = tidsstempel
+        pd.DataFrame: Én ticker gir OHLCV-kolonner, flere gir kolonner = tickere
     """
+    provider = provider or get_default_provider()
+    now = pd.Timestamp.now(tz="UTC")
+    start = _period_start(period, now)
+    names = list(dict.fromkeys(symbols)) if isinstance(symbols, list) else [symbols]
 
-    # Normaliser filnavn
-    fname = "-".join(symbols) if isinstance(symbols, list) else symbols
-    filepath = outdir + "\\" + f"{fname}_{interval}"
-    data = parquet_cache.read_parquet_cache(filepath, max_age_s=600)
+    frames = {}
+    direct = names
+    if start is not None and interval in DERIVED_FROM:
+        # Kildebarene leses fra dagen før, så blokkene i starten av perioden
+        # blir hele og forankret likt uansett når perioden starter (i alle
+        # tidssoner); blokker som begynner før perioden tas ikke med
+        source_start = block_fetch_start(start)
+        source = source_interval(interval, source_start, now, provider.max_history)
+        if source is not None:
+            bars = _download(names, source_start, source, cache, outdir, max_age_s, provider, now)
+            for symbol, data in bars.items():
+                if not data.empty:
+                    derived = resample_ohlcv(data, interval)
+                    frames[symbol] = derived[derived.index >= start]
+            # Uten intradagsdata hentes intervallet direkte
+            direct = [symbol for symbol in names if symbol not in frames]
 
-    # Hent data
-    data = yf.download(
-        symbols, period=period, interval=interval, group_by="ticker", progress=False
-    )
-    if data is None:
-        raise NameError(f"Ticker: {symbols} error")
-
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.droplevel(0)
-
-    # Lagre til parquet cache
-    parquet_cache.write_parquet_cache(
-        data,
-        filepath,
-        symbols=symbols,
-        interval=interval,
-        period=period,
+    if direct:
+        frames.update(_download(direct, start, interval, cache, outdir, max_age_s, provider, now))
+    if not isinstance(symbols, list):
+        return frames[symbols]
+    return pd.concat({symbol: frames[symbol][price_type] for symbol in names}, axis=1)
+
+
+def _download(symbols, start, interval, cache, outdir, max_age_s, provider, now):
+    """
+    Barer for symbolene fra og med start, via bar-lageret for kilder som kan caches.
+
+    Returns:
+        dict[str, pd.DataFrame]: symbol -> barer (tomt DataFrame hvis kilden ikke har noen)
+    """
+    if not (cache and provider.cacheable):
+        return _fetch(provider, symbols, interval, start)
+
+    store = BarStore(outdir)
+    metas = {symbol: store.meta(symbol, interval) for symbol in symbols}
+
+    # Dekker cachen hele det etterspurte vinduet?
+    missing = [symbol for symbol in symbols if not _covers(metas[symbol], start)]
+    for symbol in symbols:
+        get_instrumentation().cache_access(
+            "bar_store",
+            hit=symbol not in missing and not _is_stale(metas[symbol], now, max_age_s),
+        )
+
+    frames = _fetch(provider, missing, interval, start) if missing else {}
+    for symbol, data in frames.items():
+        if data.empty:
+            continue
+        store.append(symbol, interval, data)
+        store.update_meta(
+            symbol, interval,
+            since=start.isoformat() if start is not None else None,
+            last_fetch=now.isoformat(),
+        )
+
+    cached = {symbol: metas[symbol] for symbol in symbols if symbol not in frames}
+    _refresh_tails(store, provider, interval, cached, now, max_age_s)
+    for symbol in cached:
+        frames[symbol] = store.read(symbol, interval, start=start)
+    return frames
+
+
+def _covers(meta, start) -> bool:
+    """Sant hvis bar-lageret har barer fra og med start (start None = "max")."""
+    return bool(meta.get("last_ts")) and (
+        meta.get("since") is None
+        or (start is not None and start >= pd.Timestamp(meta["since"]))
     )
 
-    return data
+
+def _is_stale(meta, now, max_age_s) -> bool:
+    """Sant hvis siste henting mangler eller er eldre enn max_age_s."""
+    last_fetch = meta.get("last_fetch")
+    return not last_fetch or (now - pd.Timestamp(last_fetch)).total_seconds() > max_age_s
 
 
-def get_symbol_data(symbol, period, interval):
+def _refresh_tails(store, provider, interval, metas, now, max_age_s):
+    """
+    Henter barene etter siste cachede tidsstempel for symbolene med utdatert
+    cache, i ett kall. Feiler hentingen brukes de cachede barene som de er.
+
+    Args:
+        metas (dict): symbol -> metadata fra bar-lageret
+    """
+    stale = {
+        symbol: pd.Timestamp(meta["last_ts"])
+        for symbol, meta in metas.items()
+        if _is_stale(meta, now, max_age_s)
+    }
+    if not stale:
+        return
+    # Hent halen fra og med siste bar (den kan ha vært ufullstendig), for
+    # alle fra den eldste; hvert symbol lagrer bare sin egen hale
     try:
-        data = download_yf(symbol, period=period, interval=interval)
-        if not data.empty:
-            latest = data.iloc[-1]
-            previous = data.iloc[-2] if len(data) > 1 else data.iloc[-1]
-            change = ((latest["Close"] - previous["Close"]) / previous["Close"] * 100)
-            return {
-                "price": latest["Close"],
-                "change": change,
-                "high": data["High"].max(),
-                "low": data["Low"].min(),
-                "data": data
-            }
-    except Exception:
-        pass
-    return None
\ No newline at end of file
+        tails = _fetch(provider, list(stale), interval, min(stale.values()))
+    except DownloadError as e:
+        logger.warning("Bruker cachede barer for %s (%s): %s", ", ".join(stale), interval, e)
+        return
+    for symbol, last_ts in stale.items():
+        tail = tails[symbol]
+        if not tail.empty:
+            store.append(symbol, interval, tail[tail.index >= last_ts])
+        store.update_meta(symbol, interval, last_fetch=now.isoformat())
+
+
+def download_since(
+    symbol,
+    interval,
+    since,
+    outdir="data",
+    max_age_s=CACHE_MAX_AGE_S,
+    provider: DataProvider | None = None,
+) -> pd.DataFrame:
+    """
+    Henter bare barene fra og med since for ett symbol, til live-oppdatering.
+
+    Bar-lageret oppdateres med halen når det er eldre enn max_age_s; kilder
+    uten bar-lager spørres direkte. Baren ved since selv tas med, siden den
+    kan ha blitt revidert.
+
+    Args:
+        symbol (str): Ticker som allerede er lastet med download_yf
+        interval (str): Tidsintervall, f.eks. "1m", "1h"
+        since (pd.Timestamp): Tidsstempel for siste bar den som kaller har
+        outdir (str): Rotkatalog for bar-lageret
+        max_age_s (int): Maks alder på cachen i sekunder før nye barer hentes
+        provider (DataProvider | None): Datakilden (None gir standardkilden)
+    Returns:
+        pd.DataFrame: OHLCV-barer med tidsstempel >= since
+    Raises:
+        ValueError: Hvis symbolet ikke finnes i bar-lageret
+    """
+    provider = provider or get_default_provider()
+    store = BarStore(outdir)
+
+    # Avledede intervaller bygges fra kildebarene fra og med since når de
+    # dekker since; since er starten på en blokk, så første blokk blir komplett
+    source = DERIVED_FROM.get(interval)
+    if source is not None and (
+        not provider.cacheable or _covers(store.meta(symbol, source), pd.Timestamp(since))
+    ):
+        bars = download_since(symbol, source, since, outdir, max_age_s, provider)
+        return resample_ohlcv(bars, interval)
+
+    if not provider.cacheable:
+        return _fetch(provider, [symbol], interval, pd.Timestamp(since))[symbol]
+    meta = store.meta(symbol, interval)
+    if not meta.get("last_ts"):
+        raise ValueError(f"Ingen cachede barer for {symbol} ({interval})")
+    now = pd.Timestamp.now(tz="UTC")
+    _refresh_tails(store, provider, interval, {symbol: meta}, now, max_age_s)
+    return store.read(symbol, interval, start=pd.Timestamp(since))
+
+
+def _summarize(data: pd.DataFrame):
+    """Lager nøkkeltallene som sidene viser for ett symbol."""
+    if data.empty:
+        return None
+    latest = data.iloc[-1]
+    previous = data.iloc[-2] if len(data) > 1 else data.iloc[-1]
+    change = ((latest["Close"] - previous["Close"]) / previous["Close"] * 100)
+    return {
+        "price": latest["Close"],
+        "change": change,
+        "high": data["High"].max(),
+        "low": data["Low"].min(),
+        "data": data
+    }
+
+
+def _load_summary(
+    symbol,
+    period,
+    interval,
+    shared_cache: SharedCache | None = None,
+    provider: DataProvider | None = None,
+    **kwargs,
+):
+    """Nøkkeltall for ett symbol, gjennom den delte cachen hvis den er gitt."""
+    provider = provider or get_default_provider()
+
+    def load():
+        return _summarize(
+            download_yf(symbol, period=period, interval=interval, provider=provider, **kwargs)
+        )
+
+    if shared_cache is None:
+        return load()
+    # max_age_s styrer bare hvor ferske barene er, ikke hvilke barer det er
+    options = {name: value for name, value in kwargs.items() if name != "max_age_s"}
+    key = (symbol, period, interval, provider.key, *sorted(options.items()))
+    return shared_cache.get(key, load, ttl_for(interval))
+
+
+def get_symbol_data(
+    symbol,
+    period,
+    interval,
+    shared_cache: SharedCache | None = None,
+    provider: DataProvider | None = None,
+):
+    """
+    Nøkkeltall for ett symbol (pris, endring, høy, lav og barene).
+
+    Returns:
+        dict | None  (None hvis kilden ikke har data for symbolet)
+    Raises:
+        DownloadError: Hvis nedlastingen feilet også etter nye forsøk
+    """
+    return _load_summary(symbol, period, interval, shared_cache, provider)
+
+
+def fetch_many(
+    symbols,
+    period,
+    interval,
+    max_workers=8,
+    shared_cache: SharedCache | None = None,
+    provider: DataProvider | None = None,
+    **kwargs,
+):
+    """
+    Henter nøkkeltall for en hel overvåkningsliste samtidig.
+
+    Duplikater fjernes før nedlasting, og cache-oppslag og nedlastinger kjøres
+    på en begrenset trådpool.
+
+    Args:
+        symbols (list[str]): Tickere, f.eks. fra en overvåkningsliste
+        period (str): Hvor langt tilbake, f.eks. "1y", "6mo"
+        interval (str): Tidsintervall, f.eks. "1h", "1d"
+        max_workers (int): Maks antall samtidige oppslag
+        shared_cache (SharedCache | None): Delt cache for nøkkeltallene; like
+            samtidige oppslag fra flere sesjoner gir da én nedlasting
+        provider (DataProvider | None): Datakilden (None gir standardkilden)
+        **kwargs: Sendes videre til download_yf
+    Returns:
+        tuple[dict, dict]: (symbol -> nøkkeltall som get_symbol_data, symbol -> feilmelding)
+    """
+    unique = list(dict.fromkeys(symbols))
+    results, errors = {}, {}
+    if not unique:
+        return results, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+        futures = {
+            pool.submit(
+                _load_summary, symbol, period, interval, shared_cache, provider, **kwargs
+            ): symbol
+            for symbol in unique
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                errors[symbol] = str(e)
+                continue
+            if summary is None:
+                errors[symbol] = "Ingen data"
+            else:
+                results[symbol] = summary
+    return results, errors
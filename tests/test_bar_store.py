@@ -0,0 +1,120 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.utils import bar_store
+from src.utils.bar_store import BarStore
+
+
+def bars(start, periods, value):
+    index = pd.date_range(start, periods=periods, freq="h", tz="UTC", name="Datetime")
+    return pd.DataFrame({"Close": np.full(periods, float(value))}, index=index)
+
+
+class BarStoreMetaTest(unittest.TestCase):
+    def test_concurrent_meta_updates_stay_readable(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = BarStore(root)
+            errors = []
+
+            def writer(n):
+                try:
+                    for i in range(50):
+                        store.update_meta("BTC-USD", "1h", **{f"writer_{n}": i})
+                        store.meta("BTC-USD", "1h")
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            meta = store.meta("BTC-USD", "1h")
+            self.assertTrue(any(key.startswith("writer_") for key in meta))
+            leftovers = list(store._dir("BTC-USD", "1h").glob("*.tmp"))
+            self.assertEqual(leftovers, [])
+
+    def test_concurrent_meta_updates_keep_every_key(self):
+        with tempfile.TemporaryDirectory() as root:
+            threads = [
+                # Egne instanser, slik download_yf lager dem per kall
+                threading.Thread(
+                    target=BarStore(root).update_meta,
+                    args=("BTC-USD", "1h"),
+                    kwargs={f"writer_{n}": n},
+                )
+                for n in range(16)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            meta = BarStore(root).meta("BTC-USD", "1h")
+            self.assertEqual(meta, {f"writer_{n}": n for n in range(16)})
+
+
+class BarStoreCompactTest(unittest.TestCase):
+    def parts(self, store):
+        return sorted(store._dir("BTC-USD", "1h").glob("month=*/part-*.parquet"))
+
+    def test_compact_merges_parts_and_keeps_latest_rows(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = BarStore(root)
+            store.append("BTC-USD", "1h", bars("2024-01-31 20:00", 10, 1))
+            store.append("BTC-USD", "1h", bars("2024-02-01 02:00", 10, 2))
+            before = store.read("BTC-USD", "1h")
+
+            store.compact("BTC-USD", "1h")
+
+            self.assertEqual(len(self.parts(store)), 2)  # én per måned
+            pd.testing.assert_frame_equal(store.read("BTC-USD", "1h"), before)
+            self.assertEqual(before.loc["2024-02-01 02:00", "Close"], 2.0)
+
+    def test_append_compacts_crowded_month(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = BarStore(root)
+            with mock.patch.object(bar_store, "COMPACT_PARTS", 3):
+                for i in range(4):
+                    store.append("BTC-USD", "1h", bars("2024-01-01", 5 + i, i))
+
+            self.assertEqual(len(self.parts(store)), 1)
+            df = store.read("BTC-USD", "1h")
+            self.assertEqual(len(df), 8)
+            self.assertTrue((df["Close"] == 3.0).all())
+
+    def test_failed_unlink_after_compact_keeps_data(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = BarStore(root)
+            for i in range(3):
+                store.append("BTC-USD", "1h", bars(f"2024-01-01 0{3 * i}:00", 5, i))
+            before = store.read("BTC-USD", "1h")
+
+            # Prosessen dør etter å ha fjernet én gammel partfil
+            unlink = Path.unlink
+            removed = []
+
+            def dying_unlink(path, missing_ok=False):
+                if path.name.startswith("part-"):
+                    if removed:
+                        raise OSError("killed")
+                    removed.append(path)
+                unlink(path, missing_ok=missing_ok)
+
+            with mock.patch.object(Path, "unlink", dying_unlink):
+                with self.assertRaises(OSError):
+                    store.compact("BTC-USD", "1h")
+
+            pd.testing.assert_frame_equal(store.read("BTC-USD", "1h"), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.signals.correlation import CorrelationEngine
+
+
+class CorrelationEngineTest(unittest.TestCase):
+    def test_revised_last_bar_matches_pandas(self):
+        rng = np.random.default_rng(0)
+        index = pd.date_range("2024-01-01", periods=120, freq="h", tz="UTC")
+        returns = pd.DataFrame(rng.normal(size=(120, 3)), index=index, columns=["a", "b", "c"])
+        engine = CorrelationEngine(["a", "b", "c"], window=20)
+        engine.update(returns.iloc[:100])
+
+        # The in-progress bar changes on refresh, then two new bars arrive
+        returns.iloc[99] = rng.normal(size=3)
+        self.assertEqual(engine.update(returns.iloc[:100]), 0)
+        returns.iloc[101] = rng.normal(size=3)
+        self.assertEqual(engine.update(returns.iloc[:102]), 2)
+
+        current = returns.iloc[:102]
+        pd.testing.assert_frame_equal(engine.returns, current)
+        np.testing.assert_allclose(engine.correlation().values, current.corr().values)
+        np.testing.assert_allclose(
+            engine.rolling_correlation().values, current.iloc[-20:].corr().values
+        )
+        np.testing.assert_allclose(
+            engine.pair_history("a", "b").values,
+            current["a"].rolling(20).corr(current["b"]).values,
+        )
+
+
+    def test_adjusted_history_rebuilds_the_sums(self):
+        rng = np.random.default_rng(1)
+        index = pd.date_range("2024-01-01", periods=80, freq="h", tz="UTC")
+        returns = pd.DataFrame(rng.normal(size=(80, 2)), index=index, columns=["a", "b"])
+        engine = CorrelationEngine(["a", "b"], window=10)
+        engine.update(returns.iloc[:70])
+
+        # A split adjustment rewrites old rows; two new bars arrive with it
+        returns.iloc[:40, 0] *= 0.5
+        self.assertEqual(engine.update(returns.iloc[:72]), 2)
+        current = returns.iloc[:72]
+        pd.testing.assert_frame_equal(engine.returns, current)
+        np.testing.assert_allclose(engine.correlation().values, current.corr().values)
+
+    def test_expired_rows_leave_the_window_without_new_bars(self):
+        rng = np.random.default_rng(2)
+        index = pd.date_range("2024-01-01", periods=30, freq="h", tz="UTC")
+        returns = pd.DataFrame(rng.normal(size=(30, 2)), index=index, columns=["a", "b"])
+        engine = CorrelationEngine(["a", "b"], window=20)
+        engine.update(returns)
+
+        self.assertEqual(engine.update(returns.iloc[15:]), 0)
+        current = returns.iloc[15:]
+        np.testing.assert_allclose(engine.correlation().values, current.corr().values)
+        np.testing.assert_allclose(engine.rolling_correlation().values, current.corr().values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+
+from src.event_manager import EventManager, EventQueue, Observer
+
+
+class Recorder(Observer):
+    def __init__(self, gate=None):
+        self.events = []
+        self.gate = gate
+
+    def update(self, event, data):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.events.append((event, data))
+
+
+class EventQueueTest(unittest.TestCase):
+    def test_coalesce_keeps_every_event_while_there_is_room(self):
+        queue = EventQueue(maxsize=10, policy="coalesce")
+        manager = EventManager(queue)
+        recorder = Recorder()
+        manager.subscribe(recorder)
+
+        manager.notify("signal_generated", {"strategy": "EMA"}, source="EMA")
+        manager.notify("signal_generated", {"strategy": "RSI"}, source="RSI")
+        manager.notify("signal_generated", {"strategy": "EMA", "n": 2}, source="EMA")
+        self.assertTrue(queue.join(5))
+
+        self.assertEqual(len(recorder.events), 3)
+        self.assertEqual(queue.coalesced, 0)
+
+    def test_coalesce_replaces_same_source_when_full(self):
+        gate = threading.Event()
+        queue = EventQueue(maxsize=2, policy="coalesce")
+        manager = EventManager(queue)
+        recorder = Recorder(gate)
+        manager.subscribe(recorder)
+
+        # The worker holds the first event until the gate opens
+        manager.notify("signal_generated", 0, source="EMA")
+        while queue.qsize():
+            threading.Event().wait(0.01)
+        manager.notify("signal_generated", 1, source="EMA")
+        manager.notify("signal_generated", 2, source="RSI")
+        manager.notify("signal_generated", 3, source="EMA")
+        gate.set()
+        self.assertTrue(queue.join(5))
+
+        self.assertEqual([data for _, data in recorder.events], [0, 3, 2])
+        self.assertEqual(queue.coalesced, 1)
+        self.assertEqual(queue.dropped, 0)
+
+
+    def test_slow_observer_does_not_hold_up_the_others(self):
+        release = threading.Event()
+        queue = EventQueue(maxsize=100, policy="block", observer_timeout=0.05)
+        manager = EventManager(queue)
+        slow, fast = Recorder(release), Recorder()
+        manager.subscribe(slow)
+        manager.subscribe(fast)
+        try:
+            for i in range(10):
+                manager.notify("tick", i)
+            self.assertTrue(queue.join(5))
+
+            self.assertEqual([data for _, data in fast.events], list(range(10)))
+            # The slow call times out once; later events skip it until it returns
+            self.assertEqual(queue.timeouts, 1)
+            self.assertEqual(queue.skipped, 9)
+            release.set()
+        finally:
+            queue.close()
+
+    def test_close_stops_delivery(self):
+        queue = EventQueue(observer_timeout=1.0)
+        manager = EventManager(queue)
+        manager.subscribe(Recorder())
+        manager.notify("tick")
+        self.assertTrue(queue.join(5))
+        queue.close()
+        with self.assertRaises(RuntimeError):
+            manager.notify("tick")
+
+
+if __name__ == "__main__":
+    unittest.main()
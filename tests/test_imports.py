@@ -0,0 +1,27 @@
+import subprocess
+import sys
+import unittest
+
+from src.benchmark import LAZY_IMPORTS, check_imports
+
+
+class ImportBudgetTest(unittest.TestCase):
+    def test_imports_stay_within_budget(self):
+        _, violations = check_imports()
+        self.assertEqual(violations, [])
+
+    def test_main_does_not_load_heavy_modules(self):
+        # A fresh interpreter, since other tests may have imported them already
+        loaded = subprocess.run(
+            [
+                sys.executable, "-c",
+                "import sys, src.main; "
+                f"print(' '.join(m for m in {LAZY_IMPORTS!r} if m in sys.modules))",
+            ],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        self.assertEqual(loaded, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
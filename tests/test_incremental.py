@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from src.kernels import ema, rolling_mean, rsi
+from src.signals.incremental import IncrementalEMA, IncrementalRSI, IncrementalSMA
+
+
+def prices_with_gaps(n: int = 2000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # A leading gap, single missing bars and a longer outage
+    close[:3] = np.nan
+    close[rng.choice(np.arange(10, n), 20, replace=False)] = np.nan
+    close[500:530] = np.nan
+    return close
+
+
+def replay(indicator, close: np.ndarray) -> np.ndarray:
+    return np.array([indicator.update(price) for price in close])
+
+
+class IncrementalIndicatorTest(unittest.TestCase):
+    def assert_matches(self, actual, expected):
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+    def test_nan_gaps_match_batch_indicators(self):
+        close = prices_with_gaps()
+        for window in (2, 14, 50):
+            with self.subTest(window=window):
+                self.assert_matches(replay(IncrementalEMA(window), close), ema(close, window))
+                self.assert_matches(replay(IncrementalRSI(window), close), rsi(close, window))
+                self.assert_matches(
+                    replay(IncrementalSMA(window), close), rolling_mean(close, window)
+                )
+
+    def test_snapshot_restore_continues_identically(self):
+        close = prices_with_gaps(600, seed=1)
+        for cls in (IncrementalEMA, IncrementalRSI, IncrementalSMA):
+            with self.subTest(indicator=cls.__name__):
+                indicator = cls(14)
+                replay(indicator, close[:510])
+                restored = cls.restore(indicator.snapshot())
+                self.assert_matches(replay(restored, close[510:]), replay(indicator, close[510:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
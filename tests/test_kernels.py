@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from src.kernels import HAVE_NUMBA
+
+# Worst relative error allowed against ta and pandas
+TOLERANCE = 1e-9
+
+_CHECK = (
+    "import json; from src.kernels import HAVE_NUMBA; from src.kernels.parity import check_parity; "
+    "print(json.dumps({'numba': HAVE_NUMBA, 'errors': check_parity(n=20_000)}))"
+)
+
+
+def parity(disable_numba: bool) -> dict:
+    """check_parity in a fresh interpreter, with or without numba."""
+    env = dict(os.environ)
+    env.pop("SIGMABOTT_DISABLE_NUMBA", None)
+    if disable_numba:
+        env["SIGMABOTT_DISABLE_NUMBA"] = "1"
+    out = subprocess.run(
+        [sys.executable, "-c", _CHECK], capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(out)
+
+
+class KernelParityTest(unittest.TestCase):
+    def assert_parity(self, result: dict, numba: bool):
+        self.assertEqual(result["numba"], numba)
+        failed = {name: error for name, error in result["errors"].items() if not error <= TOLERANCE}
+        self.assertEqual(failed, {})
+
+    @unittest.skipUnless(HAVE_NUMBA, "numba is not installed")
+    def test_numba_kernels_match_ta(self):
+        self.assert_parity(parity(disable_numba=False), numba=True)
+
+    def test_numpy_fallback_matches_ta(self):
+        self.assert_parity(parity(disable_numba=True), numba=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
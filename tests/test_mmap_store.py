@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.utils.mmap_store import MmapStore
+
+
+def prices(n: int) -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=n, freq="h", tz="Europe/Oslo", name="Datetime")
+    close = np.linspace(100.0, 110.0, n)
+    return pd.DataFrame({"Open": close - 0.5, "Close": close}, index=index)
+
+
+class MmapStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = MmapStore(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def versions(self):
+        return sorted(self.store._dir("BTC-USD", "1h").glob("v-*"))
+
+    def test_unchanged_data_reuses_the_version(self):
+        first = self.store.write("BTC-USD", "1h", prices(100))
+        again = self.store.write("BTC-USD", "1h", prices(100))
+        self.assertEqual(first, again)
+        self.assertEqual(len(self.versions()), 1)
+
+    def test_changed_data_writes_a_new_current_version(self):
+        short = self.store.write("BTC-USD", "1h", prices(100))
+        revised = prices(100)
+        revised.iloc[-1, 1] += 1.0
+        changed = self.store.write("BTC-USD", "1h", revised)
+        self.assertNotEqual(short, changed)
+        np.testing.assert_array_equal(self.store.open("BTC-USD", "1h")["Close"], revised["Close"])
+
+        # Going back to earlier data reuses its version and makes it current
+        self.assertEqual(self.store.write("BTC-USD", "1h", prices(100)), short)
+        self.assertEqual(self.store.open("BTC-USD", "1h").path, short)
+        self.assertEqual(len(self.versions()), 2)
+
+    def test_round_trip(self):
+        frame = prices(50)
+        path = self.store.write("BTC-USD", "1h", frame)
+        # The index is stored as nanoseconds
+        frame.index = frame.index.as_unit("ns")
+        pd.testing.assert_frame_equal(MmapStore.open_path(path).to_frame(), frame, check_freq=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
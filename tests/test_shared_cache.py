@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from src.utils.shared_cache import SharedCache
+
+
+class SharedCacheTest(unittest.TestCase):
+    def test_failed_load_invalidated_while_loading(self):
+        cache = SharedCache()
+        loading = threading.Event()
+        release = threading.Event()
+        errors = {}
+
+        def loader():
+            loading.set()
+            release.wait(5)
+            raise RuntimeError("429 Too Many Requests")
+
+        def call(name, load):
+            try:
+                cache.get(("BTC",), load, ttl_s=60)
+            except BaseException as e:
+                errors[name] = e
+
+        owner = threading.Thread(target=call, args=("owner", loader), daemon=True)
+        owner.start()
+        self.assertTrue(loading.wait(5))
+        waiter = threading.Thread(target=call, args=("waiter", lambda: None), daemon=True)
+        waiter.start()
+        while cache.collapsed == 0:
+            waiter.join(0.01)
+
+        cache.invalidate("BTC")
+        release.set()
+        owner.join(5)
+        waiter.join(5)
+
+        self.assertFalse(owner.is_alive())
+        self.assertFalse(waiter.is_alive())
+        self.assertIsInstance(errors["owner"], RuntimeError)
+        self.assertIsInstance(errors["waiter"], RuntimeError)
+
+    def test_failed_load_keeps_newer_inflight_call(self):
+        cache = SharedCache()
+        newer_loading = threading.Event()
+        release_newer = threading.Event()
+
+        def failing():
+            cache.invalidate("BTC")
+            # En ny kaller starter en egen henting etter invalideringen
+            threading.Thread(target=cache.get, args=(("BTC",), newer, 60), daemon=True).start()
+            self.assertTrue(newer_loading.wait(5))
+            raise RuntimeError("feil")
+
+        def newer():
+            newer_loading.set()
+            release_newer.wait(5)
+            return "ny"
+
+        with self.assertRaises(RuntimeError):
+            cache.get(("BTC",), failing, ttl_s=60)
+        self.assertIn(("BTC",), cache._inflight)
+        release_newer.set()
+        self.assertEqual(cache.get(("BTC",), lambda: "annen", ttl_s=60), "ny")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from src.backtest_engine import BacktestConfig, BacktestEngine
+from src.utils.providers import SyntheticProvider
+
+
+class WalkForwardTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_step_longer_than_test_window_skips_gaps(self):
+        engine = BacktestEngine(provider=SyntheticProvider(seed=7))
+        config = BacktestConfig(
+            symbol="TEST", period="1mo", interval="1h",
+            use_ema=True, ema_window=20, use_rsi=True, rsi_window=14,
+            rsi_oversold=30, rsi_overbought=70,
+        )
+        result = engine.run_walk_forward(
+            config, train_bars=200, test_bars=50, step=100,
+            ema_windows=[10, 20], rsi_windows=[14],
+        )
+
+        folds = result.folds
+        self.assertGreater(len(folds), 1)
+        self.assertEqual(len(result.equity), 50 * len(folds))
+        for _, fold in folds.iterrows():
+            window = result.equity.loc[fold["test_start"]:fold["test_end"]]
+            self.assertEqual(len(window), 50)
+        self.assertTrue(result.equity.index.is_monotonic_increasing)
+
+
+if __name__ == "__main__":
+    unittest.main()
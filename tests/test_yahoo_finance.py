@@ -0,0 +1,202 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.utils.providers import YahooProvider
+from src.utils.yahoo_finance import download_yf
+
+
+class StubDownloader:
+    """Stands in for yf.download: hourly bars from a fixed history, calls recorded."""
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, symbols, interval, group_by, progress, start=None, end=None, period=None):
+        self.calls.append({"interval": interval, "start": start})
+        data = self.bars
+        if start is not None:
+            data = data[data.index >= start]
+        if end is not None:
+            data = data[data.index < end]
+        return data.copy()
+
+
+class MultiStubDownloader:
+    """Like StubDownloader, for several symbols: columns grouped by ticker, as yf.download does."""
+
+    def __init__(self, bars: dict):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, symbols, interval, group_by, progress, start=None, end=None, period=None):
+        self.calls.append({"symbols": list(symbols), "interval": interval, "start": start})
+        frames = {}
+        for symbol in symbols:
+            data = self.bars[symbol]
+            if start is not None:
+                data = data[data.index >= start]
+            frames[symbol] = data
+        return pd.concat(frames, axis=1)
+
+
+def hourly_bars(tz: str, session_hours, days: int = 30) -> pd.DataFrame:
+    """Hourly bars for the last ``days`` local days, at ``session_hours`` (local h:m) each day."""
+    today = pd.Timestamp.now(tz=tz).normalize()
+    stamps = [
+        day + pd.Timedelta(hours=h, minutes=m)
+        for day in pd.date_range(end=today, periods=days, freq="D")
+        for h, m in session_hours
+    ]
+    index = pd.DatetimeIndex(stamps, name="Datetime")
+    index = index[index <= pd.Timestamp.now(tz=tz)]
+    volume = np.arange(1, len(index) + 1, dtype=np.float64)
+    close = 100 + volume / 10
+    return pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+class DerivedIntervalTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.outdir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def download(self, bars, interval, period="5d"):
+        provider = YahooProvider(downloader=StubDownloader(bars))
+        return download_yf("TEST", period=period, interval=interval, outdir=self.outdir, provider=provider)
+
+    def check_whole_blocks(self, bars, tz, anchors):
+        start = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=5)
+        for interval, step in (("4h", pd.Timedelta(hours=4)), ("1d", pd.Timedelta(days=1))):
+            derived = self.download(bars, interval)
+            self.assertGreaterEqual(derived.index[0], start)
+            # Every block but the running one holds all of its hourly bars
+            for label, row in derived.iloc[:-1].iterrows():
+                block = bars[(bars.index >= label) & (bars.index < label + step)]
+                self.assertEqual(row["Volume"], block["Volume"].sum(), (interval, label))
+                self.assertEqual(row["Open"], block["Open"].iloc[0], (interval, label))
+            local = derived.index.tz_convert(tz)
+            expected = anchors if interval == "4h" else {(0, 0)}
+            self.assertLessEqual(set(zip(local.hour, local.minute)), expected, interval)
+
+    def test_exchange_session_blocks_are_whole_and_aligned(self):
+        session = [(9, 30), (10, 30), (11, 30), (12, 30), (13, 30), (14, 30), (15, 30)]
+        bars = hourly_bars("America/New_York", session)
+        self.check_whole_blocks(bars, "America/New_York", {(9, 30), (13, 30)})
+
+    def test_round_the_clock_blocks_are_whole_and_aligned(self):
+        bars = hourly_bars("UTC", [(h, 0) for h in range(24)])
+        self.check_whole_blocks(bars, "UTC", {(h, 0) for h in range(0, 24, 4)})
+
+
+
+class BarCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.outdir = self._tmp.name
+        self.downloader = StubDownloader(hourly_bars("UTC", [(h, 0) for h in range(24)], days=100))
+        self.provider = YahooProvider(downloader=self.downloader)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def download(self, period="1mo", max_age_s=600):
+        return download_yf(
+            "TEST", period=period, interval="1h", outdir=self.outdir,
+            max_age_s=max_age_s, provider=self.provider,
+        )
+
+    def test_fresh_cache_does_not_refetch(self):
+        first = self.download()
+        self.assertEqual(len(self.downloader.calls), 1)
+        cached = self.download()
+        self.assertEqual(len(self.downloader.calls), 1)
+        pd.testing.assert_frame_equal(cached, first, check_freq=False, check_index_type=False)
+
+    def test_stale_cache_fetches_only_the_tail(self):
+        first = self.download()
+        self.download(max_age_s=0)
+        self.assertEqual(len(self.downloader.calls), 2)
+        # From the last cached bar, which may have been revised since
+        self.assertEqual(self.downloader.calls[1]["start"], first.index[-1])
+
+    def test_longer_period_refetches(self):
+        self.download(period="1mo")
+        longer = self.download(period="2mo")
+        self.assertEqual(len(self.downloader.calls), 2)
+        self.assertLess(self.downloader.calls[1]["start"], self.downloader.calls[0]["start"])
+        self.assertLess(longer.index[0], pd.Timestamp.now(tz="UTC") - pd.DateOffset(months=1))
+
+
+class ManySymbolsTest(unittest.TestCase):
+    SYMBOLS = ["AAA", "BBB", "CCC"]
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.outdir = self._tmp.name
+        bars = hourly_bars("UTC", [(h, 0) for h in range(24)], days=60)
+        # The last symbol's history ends a day earlier, so its tail starts first
+        self.bars = {
+            "AAA": bars,
+            "BBB": bars * 2,
+            "CCC": bars[bars.index < bars.index[-1] - pd.Timedelta(days=1)],
+        }
+        self.downloader = MultiStubDownloader(self.bars)
+        self.provider = YahooProvider(downloader=self.downloader)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def download(self, symbols, interval="1h", max_age_s=600):
+        return download_yf(
+            symbols, period="1mo", interval=interval, outdir=self.outdir,
+            max_age_s=max_age_s, provider=self.provider,
+        )
+
+    def test_uncached_symbols_are_fetched_in_one_call(self):
+        closes = self.download(self.SYMBOLS)
+        self.assertEqual(len(self.downloader.calls), 1)
+        self.assertEqual(self.downloader.calls[0]["symbols"], self.SYMBOLS)
+        self.assertEqual(list(closes.columns), self.SYMBOLS)
+        for symbol in self.SYMBOLS:
+            expected = self.download(symbol)["Close"]
+            pd.testing.assert_series_equal(
+                closes[symbol].dropna(), expected, check_names=False, check_freq=False
+            )
+        # The single-symbol reads above came from the cache
+        self.assertEqual(len(self.downloader.calls), 1)
+
+    def test_stale_tails_are_fetched_in_one_call(self):
+        first = self.download(self.SYMBOLS)
+        self.download(self.SYMBOLS, max_age_s=0)
+        self.assertEqual(len(self.downloader.calls), 2)
+        self.assertEqual(self.downloader.calls[1]["symbols"], self.SYMBOLS)
+        # From the oldest last cached bar
+        self.assertEqual(self.downloader.calls[1]["start"], first["CCC"].last_valid_index())
+
+    def test_only_missing_symbols_are_fetched(self):
+        self.download(["AAA", "BBB"])
+        closes = self.download(self.SYMBOLS)
+        self.assertEqual([call["symbols"] for call in self.downloader.calls], [["AAA", "BBB"], ["CCC"]])
+        self.assertEqual(list(closes.columns), self.SYMBOLS)
+
+    def test_derived_interval_fetches_source_bars_in_one_call(self):
+        closes = self.download(self.SYMBOLS, interval="4h")
+        self.assertEqual(len(self.downloader.calls), 1)
+        self.assertEqual(self.downloader.calls[0]["interval"], "1h")
+        pd.testing.assert_series_equal(
+            closes["BBB"].dropna(), self.download("BBB", interval="4h")["Close"],
+            check_names=False, check_freq=False,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()